@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Batch Ticket Analysis
+Analyzes a directory or glob of exports in one run: exports are read on a thread pool and
+classified on one shared process pool, with a report per export and a combined rollup
+"""
+
+import glob
+import os
+import re
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+
+from ticket_aggregate import TicketAggregate
+
+EXPORT_EXTENSIONS = ('.xlsx', '.xls', '.csv')
+# Each reader thread holds one export in memory until its report is written
+READER_THREADS = 4
+
+def is_batch_path(path):
+    """True for a directory, or a glob pattern that is not itself an existing file"""
+    return os.path.isdir(path) or (not os.path.exists(path) and any(c in path for c in '*?['))
+
+def batch_files(path):
+    """Exports in a directory or matching a glob, in name order (Excel lock files are skipped)"""
+    candidates = [os.path.join(path, name) for name in os.listdir(path)] if os.path.isdir(path) else glob.glob(path)
+    return sorted(
+        candidate for candidate in candidates
+        if os.path.isfile(candidate) and os.path.splitext(candidate)[1].lower() in EXPORT_EXTENSIONS
+        and not os.path.basename(candidate).startswith('~$')
+    )
+
+def report_names(files):
+    """A unique name per export for its report: its path below the exports' common directory"""
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(file_path)) for file_path in files])
+    names = {file_path: re.sub(r'[^\w-]+', '_', os.path.splitext(os.path.relpath(os.path.abspath(file_path), root))[0])
+             for file_path in files}
+    # jan.csv and jan.xlsx side by side keep their extensions apart
+    repeated = Counter(names.values())
+    return {file_path: name if repeated[name] == 1 else f"{name}_{os.path.splitext(file_path)[1].lstrip('.').lower()}"
+            for file_path, name in names.items()}
+
+def analyze_export(file_path, output_file, workers=1, pool=None, columnar_cache=None, literals=None,
+                   compact_report=False):
+    """Read, classify and report one export on a reader thread; classification runs on the shared pool"""
+    from comprehensive_analysis import add_full_description, classify_tickets_batch
+    from description_dedupe import DescriptionDeduper
+    from report_generator import write_html_report
+    from ticket_loader import load_tickets
+
+    start = time.perf_counter()
+    df = load_tickets(file_path, columnar_cache)
+    read_seconds = time.perf_counter() - start
+
+    add_full_description(df)
+    deduper = DescriptionDeduper(literals) if literals is not False else None
+    df, _ = classify_tickets_batch(df, detailed=False, workers=workers, deduper=deduper, pool=pool)
+    aggregate = TicketAggregate()
+    aggregate.add_frame(df)
+
+    stats = aggregate.to_statistics()
+    if deduper is not None:
+        stats['dedupe_rows'] = deduper.rows
+        stats['dedupe_distinct'] = deduper.distinct
+    write_html_report(output_file, None, None, stats, type_index=aggregate, compact=compact_report)
+
+    return {
+        'aggregate': aggregate,
+        'stats': stats,
+        'output_file': output_file,
+        'read_seconds': read_seconds,
+        'seconds': time.perf_counter() - start
+    }
+
+def merge_results(results):
+    """Merge per-export aggregates into the rollup aggregate and its statistics, in name order"""
+    rollup = TicketAggregate()
+    for result in results:
+        rollup.merge(result['aggregate'])
+    stats = rollup.to_statistics()
+    if all('dedupe_rows' in result['stats'] for result in results):
+        stats['dedupe_rows'] = sum(result['stats']['dedupe_rows'] for result in results)
+        stats['dedupe_distinct'] = sum(result['stats']['dedupe_distinct'] for result in results)
+    return rollup, stats
+
+def analyze_batch(path, workers=1, readers=READER_THREADS, columnar_cache=None, dedupe=True, compact_report=False,
+                  output_dir=None):
+    """Analyze every export under a directory or glob; returns the rollup report path"""
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    from comprehensive_analysis import classifier_literals, print_summary
+    from report_generator import write_html_report
+
+    files = batch_files(path)
+    if not files:
+        print(f"❌ No {', '.join(EXPORT_EXTENSIONS)} exports found for {path}")
+        return None
+
+    start = time.perf_counter()
+    readers = max(1, min(readers, len(files)))
+    print(f"📦 Analyzing {len(files):,} exports from {path} "
+          f"({readers} reader threads, {'a shared pool of ' + str(workers) + ' workers' if workers > 1 else 'serial classification'})")
+
+    if columnar_cache:
+        from ticket_loader import usable_cache_dir
+        columnar_cache = usable_cache_dir(columnar_cache)
+
+    # Compiles the pattern engine once, before the reader threads share it
+    literals = classifier_literals() if dedupe else False
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    names = report_names(files)
+    output_path = lambda name: os.path.join(output_dir or '', f"ticket_analysis_{name}_{timestamp}.html")
+    # A different prefix, so no export (not even one called rollup.csv) can claim the rollup's name
+    rollup_file = os.path.join(output_dir or '', f"ticket_batch_rollup_{timestamp}.html")
+
+    pool = None
+    if workers > 1:
+        from parallel_classification import create_pool
+        pool = create_pool(workers)
+
+    results = {}
+    try:
+        with ThreadPoolExecutor(max_workers=readers) as executor:
+            futures = {
+                executor.submit(analyze_export, file_path, output_path(names[file_path]), workers, pool,
+                                columnar_cache, literals, compact_report): file_path
+                for file_path in files
+            }
+            for future in as_completed(futures):
+                file_path = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"   ❌ {file_path}: {e}")
+                    continue
+                results[file_path] = result
+                print(f"   ✅ {file_path}: {result['aggregate'].total_tickets:,} tickets in {result['seconds']:.2f}s "
+                      f"(read {result['read_seconds']:.2f}s) → {result['output_file']}")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    if pool is not None:
+        pool.print_throughput()
+
+    if not results:
+        print("❌ No export could be analyzed")
+        return None
+
+    # Name order, so the rollup matches one analysis of the exports concatenated in that order
+    ordered = [results[file_path] for file_path in files if file_path in results]
+    rollup, stats = merge_results(ordered)
+    write_html_report(rollup_file, None, None, stats, type_index=rollup, compact=compact_report)
+
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ Batch complete! Rollup report saved to: {rollup_file} (with one report per export)")
+    print(f"⏱️ {rollup.total_tickets:,} tickets from {len(ordered):,} exports in {elapsed:.2f}s "
+          f"({rollup.total_tickets / elapsed:,.0f} tickets/s)")
+    repeated = sum(len(result['aggregate'].ticket_numbers) for result in ordered) - len(rollup.ticket_numbers)
+    if repeated:
+        print(f"⚠️ {repeated:,} ticket numbers appear in more than one export; the rollup counts each copy")
+    if len(ordered) < len(files):
+        print(f"⚠️ {len(files) - len(ordered):,} of {len(files):,} exports failed and are left out of the rollup")
+    print_summary(stats)
+    return rollup_file
+
+def check_rollup(exports=8, largest=20000, workers=None, seed=42):
+    """Batch-analyze synthetic exports and compare the rollup with one analysis of them concatenated"""
+    import tempfile
+
+    import pandas as pd
+
+    from comprehensive_analysis import add_full_description, classify_tickets_batch
+    from report_generator import normalize_report, write_html_report
+    from synthetic_tickets import generate_ticket_rows
+
+    workers = workers or os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as directory:
+        # Sizes halve from the largest export down, like one big business unit and several small ones
+        frames = []
+        for export in range(exports):
+            frame = pd.DataFrame(generate_ticket_rows(max(largest >> export, 100), seed + export))
+            frame['Help Ticket Number'] = [f"{export}-{number}" for number in frame['Help Ticket Number']]
+            frame.to_csv(os.path.join(directory, f"unit_{export:02d}.csv"), index=False)
+            frames.append(frame)
+
+        rollup_file = analyze_batch(os.path.join(directory, '*.csv'), workers=workers, output_dir=directory)
+
+        combined = os.path.join(directory, 'combined.csv')
+        pd.concat(frames, ignore_index=True).to_csv(combined, index=False)
+        df, _ = classify_tickets_batch(add_full_description(pd.read_csv(combined)), detailed=False)
+        aggregate = TicketAggregate()
+        aggregate.add_frame(df)
+        expected_file = os.path.join(directory, 'expected.html')
+        write_html_report(expected_file, None, None, aggregate.to_statistics(), type_index=aggregate)
+
+        with open(rollup_file, encoding='utf-8') as f:
+            built = normalize_report(f.read())
+        with open(expected_file, encoding='utf-8') as f:
+            expected = normalize_report(f.read())
+
+    if built != expected:
+        print("❌ The rollup report differs from one analysis of the concatenated exports")
+        return False
+    print("✅ The rollup report matches one analysis of the concatenated exports")
+    return True
+
+if __name__ == "__main__":
+    exports = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    largest = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    sys.exit(0 if check_rollup(exports, largest) else 1)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Analysis Pipeline Benchmark
+Times load, classification, statistics and report generation on synthetic exports
+and flags stages that regressed against an earlier results file
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from comprehensive_analysis import (add_full_description, classifier_literals, classify_tickets_batch,
+                                   generate_statistics, pattern_fingerprint)
+from description_dedupe import DescriptionDeduper
+from pattern_definitions import SPECIFIC_PATTERNS, GENERAL_PATTERNS
+from report_generator import generate_html_report
+from synthetic_tickets import write_ticket_export
+from ticket_aggregate import TicketAggregate
+from ticket_loader import load_tickets
+
+RESULTS_VERSION = 1
+DEFAULT_SCALES = [1_000, 10_000, 50_000]
+DEFAULT_REPEATS = 3
+STAGES = ['load', 'classify', 'statistics', 'report']
+
+# A stage regresses when it is this much slower than the baseline...
+DEFAULT_THRESHOLD = 0.20
+# ...and slower by at least this many seconds, so timer noise on tiny stages is ignored
+NOISE_FLOOR_SECONDS = 0.005
+
+def time_stage(function, repeats):
+    """Run function repeats times; returns (best seconds, result of the last run)"""
+    best = None
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def benchmark_scale(export_path, repeats):
+    """Time each pipeline stage on one export, the way analyze_tickets runs them"""
+    timings = {}
+
+    timings['load'], df = time_stage(lambda: load_tickets(export_path), repeats)
+
+    def classify():
+        frame = add_full_description(df.copy())
+        frame, _ = classify_tickets_batch(frame, detailed=False, deduper=DescriptionDeduper(classifier_literals()))
+        return frame
+
+    timings['classify'], classified = time_stage(classify, repeats)
+    timings['statistics'], stats = time_stage(lambda: generate_statistics(classified, None), repeats)
+
+    def report():
+        aggregate = TicketAggregate()
+        aggregate.add_frame(classified)
+        return generate_html_report(classified, None, stats, type_index=aggregate)
+
+    timings['report'], html_content = time_stage(report, repeats)
+
+    return {
+        'tickets': len(df),
+        'unique_types': stats['unique_types'],
+        'report_bytes': len(html_content.encode('utf-8')),
+        'stages': timings,
+        'total': sum(timings.values())
+    }
+
+def run_benchmark(scales, repeats=DEFAULT_REPEATS, export_format='xlsx', seed=42):
+    """Benchmark every scale and return the results document"""
+    runs = []
+    print(f"{'Tickets':>10} | " + ' | '.join(f"{stage:>10}" for stage in STAGES) + f" | {'Total':>8}")
+    print('-' * (13 + 13 * len(STAGES) + 10))
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for ticket_count in scales:
+            export_path = os.path.join(workdir, f"tickets_{ticket_count}.{export_format}")
+            write_ticket_export(export_path, ticket_count, seed)
+            run = benchmark_scale(export_path, repeats)
+            runs.append(run)
+            print(f"{ticket_count:>10,} | " + ' | '.join(f"{run['stages'][stage]:>9.3f}s" for stage in STAGES)
+                  + f" | {run['total']:>7.3f}s")
+
+    return {
+        'version': RESULTS_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'pattern_fingerprint': pattern_fingerprint(),
+        'pattern_count': sum(len(p) for p in SPECIFIC_PATTERNS.values()) + sum(len(p) for p in GENERAL_PATTERNS.values()),
+        'format': export_format,
+        'seed': seed,
+        'repeats': repeats,
+        'runs': runs
+    }
+
+def find_regressions(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Compare stage timings at matching scales; returns (tickets, stage, old, new) for slowdowns"""
+    baseline_runs = {run['tickets']: run for run in baseline.get('runs', [])}
+    regressions = []
+
+    for run in results['runs']:
+        previous = baseline_runs.get(run['tickets'])
+        if previous is None:
+            continue
+        for stage in STAGES:
+            old = previous['stages'].get(stage)
+            new = run['stages'][stage]
+            if old is not None and new > old * (1 + threshold) and new - old > NOISE_FLOOR_SECONDS:
+                regressions.append((run['tickets'], stage, old, new))
+
+    return regressions
+
+def print_comparison(results, baseline, regressions):
+    """Print regressions against the baseline results file"""
+    if baseline.get('pattern_fingerprint') != results['pattern_fingerprint']:
+        print("ℹ️ Patterns changed since the baseline run")
+    if baseline.get('format') != results['format']:
+        print(f"ℹ️ Baseline loaded {baseline.get('format')} exports; load times are not comparable")
+
+    if not regressions:
+        print("✅ No stage regressed against the baseline")
+        return
+
+    for tickets, stage, old, new in regressions:
+        print(f"⚠️ Regression: {stage} at {tickets:,} tickets {old:.3f}s → {new:.3f}s (+{(new / old - 1) * 100:.0f}%)")
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the analysis pipeline on synthetic ticket exports",
+        epilog="Example: python benchmark_pipeline.py 1000 10000 --baseline benchmark_before.json"
+    )
+    parser.add_argument('scales', nargs='*', type=int, default=DEFAULT_SCALES,
+                        help="ticket counts to benchmark (default: 1,000 10,000 50,000)")
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS,
+                        help=f"runs per stage; the fastest is kept (default: {DEFAULT_REPEATS})")
+    parser.add_argument('--format', choices=['xlsx', 'csv'], default='xlsx',
+                        help="synthetic export format to load (default: xlsx)")
+    parser.add_argument('--seed', type=int, default=42, help="random seed for the synthetic tickets")
+    parser.add_argument('--output', metavar='PATH',
+                        help="results JSON file (default: benchmark_results_<timestamp>.json)")
+    parser.add_argument('--baseline', metavar='PATH',
+                        help="earlier results JSON to compare against; exits with status 1 on regressions")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f"relative slowdown that counts as a regression (default: {DEFAULT_THRESHOLD})")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = run_benchmark(args.scales, args.repeats, args.format, args.seed)
+
+    output_file = args.output or f"benchmark_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Results saved to: {output_file}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.threshold)
+        print_comparison(results, baseline, regressions)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Report Writer Benchmark
+Compares the original in-memory HTML report against streaming it to the output file
+"""
+
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+
+from comprehensive_analysis import find_pattern_match
+from pattern_definitions import get_automation_score
+from report_generator import (generate_insights_section, generate_summary_section, get_category_styles,
+                              get_css_styles, get_focus_area, get_javascript_functions, normalize_report,
+                              write_html_report)
+from synthetic_tickets import generate_descriptions
+
+DEFAULT_SCALES = [10_000, 100_000, 1_000_000]
+
+def build_analysis(ticket_count, seed=42):
+    """Build a synthetic detailed_analysis and stats dict for ticket_count tickets"""
+    rng = random.Random(seed)
+    # Classify a pool of distinct descriptions once and reuse them, so setup stays quick at 1M
+    pool = [(text, category, *find_pattern_match(text.lower(), category))
+            for text, category in generate_descriptions(min(ticket_count, 20_000), seed)]
+
+    detailed_analysis = {}
+    for idx in range(ticket_count):
+        text, category, detected_type, type_category = pool[idx % len(pool)]
+        detailed_analysis[idx] = {
+            'category': category,
+            'detected_type': detected_type,
+            'type_category': type_category,
+            'subject': text[:40],
+            'description': text,
+            'time_spent': rng.choice([0.25, 0.5, 1.0, 2.0, 3.75]),
+            'assigned_to': rng.choice(['John Smith', 'Jane Doe', 'IT Team']),
+            'status': rng.choice(['Closed', 'Open', 'In Progress']),
+            'ticket_number': f"IT-{idx:07d}",
+            'created_by': 'jane.doe@company.com'
+        }
+
+    type_counts = Counter(info['detected_type'] for info in detailed_analysis.values())
+    category_counts = Counter(info['type_category'] for info in detailed_analysis.values())
+    total_time = sum(info['time_spent'] for info in detailed_analysis.values())
+    specific_types = [t for t in type_counts if t.startswith('🎯')]
+
+    stats = {
+        'total_tickets': ticket_count,
+        'total_time': total_time,
+        'average_time': total_time / ticket_count,
+        'unique_types': len(type_counts),
+        'specific_patterns': len(specific_types),
+        'type_counts': type_counts,
+        'category_counts': category_counts,
+        'automation_candidates': sum(type_counts[t] for t in specific_types)
+    }
+    return detailed_analysis, stats
+
+# The pre-streaming report code, kept verbatim as the reference the streaming writer is measured against
+def legacy_html_report(df, detailed_analysis, stats):
+    """The report as generate_html_report built it before streaming: one string grown by +="""
+    
+    # Group tickets by type for detailed panels
+    tickets_by_type = {}
+    for idx, info in detailed_analysis.items():
+        ticket_type = info['detected_type']
+        if ticket_type not in tickets_by_type:
+            tickets_by_type[ticket_type] = []
+        tickets_by_type[ticket_type].append(info)
+    
+    # Sort types by count
+    sorted_types = stats['type_counts'].most_common(50)
+    sorted_categories = stats['category_counts'].most_common()
+    
+    html_content = f"""<!DOCTYPE html>
+<html>
+<head>
+    <title>IT Ticket Analysis Report - {datetime.now().strftime('%Y-%m-%d')}</title>
+    <style>
+        {get_css_styles()}
+    </style>
+    <script>
+        {get_javascript_functions()}
+    </script>
+</head>
+<body>
+    <div class="container">
+        <h1>🔍 IT Ticket Analysis Report</h1>
+        <p><strong>Generated:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+        
+        {generate_summary_section(stats)}
+        {legacy_category_section(sorted_categories, stats['total_tickets'])}
+        {legacy_ticket_types_section(sorted_types, stats['total_tickets'], tickets_by_type, detailed_analysis)}
+        {generate_insights_section(stats)}
+    </div>
+</body>
+</html>"""
+    
+    return html_content
+
+def legacy_category_section(sorted_categories, total_tickets):
+    """Generate category breakdown section"""
+    html = """
+        <h2>📊 Category Summary</h2>
+        <table style="width: 70%;">
+            <tr><th>Category</th><th>Count</th><th>%</th><th>Focus Area</th></tr>
+    """
+    
+    for category, count in sorted_categories:
+        percentage = (count / total_tickets * 100)
+        focus = get_focus_area(category, percentage)
+        html += f"<tr><td>{category}</td><td>{count:,}</td><td>{percentage:.1f}%</td><td>{focus}</td></tr>"
+    
+    html += "</table>"
+    return html
+
+def legacy_ticket_types_section(sorted_types, total_tickets, tickets_by_type, detailed_analysis):
+    """Generate detailed ticket types section"""
+    html = """
+        <h2>📊 All Ticket Types - Click for Deep Dive Details</h2>
+        <table>
+            <tr><th>Rank</th><th>Ticket Type</th><th>Category</th><th>Count</th><th>%</th><th>Automation</th></tr>
+    """
+    
+    category_styles = get_category_styles()
+    
+    for rank, (ticket_type, count) in enumerate(sorted_types, 1):
+        percentage = (count / total_tickets * 100)
+        safe_id = re.sub(r'[^a-zA-Z0-9]', '', ticket_type)
+        
+        # Get category for styling
+        sample_ticket = next((info for info in detailed_analysis.values() 
+                            if info['detected_type'] == ticket_type), None)
+        ticket_category = sample_ticket['type_category'] if sample_ticket else 'General IT Support'
+        
+        automation = get_automation_score(ticket_type)
+        row_class = category_styles.get(ticket_category, 'general')
+        
+        html += f"""
+            <tr class="{row_class}">
+                <td>{rank}</td>
+                <td class="clickable" onclick="toggleDetails('{ticket_type}')">{ticket_type}</td>
+                <td>{ticket_category}</td>
+                <td>{count:,}</td>
+                <td>{percentage:.1f}%</td>
+                <td><span class="automation-tag automation-{automation.lower()}">{automation}</span></td>
+            </tr>
+        """
+        
+        # Add detail panel for top 30 types
+        if rank <= 30:
+            html += legacy_detail_panel(ticket_type, count, percentage, 
+                                        tickets_by_type.get(ticket_type, []), safe_id)
+    
+    html += "</table>"
+    return html
+
+def legacy_detail_panel(ticket_type, count, percentage, tickets, safe_id):
+    """Generate expandable detail panel for a ticket type"""
+    html = f"""
+        <tr>
+            <td colspan="6">
+                <div id="details-{safe_id}" class="detail-panel">
+                    <button class="close-btn" onclick="closeDetails('{ticket_type}')">✕</button>
+                    <h4>{ticket_type} - {count:,} tickets ({percentage:.1f}%)</h4>
+    """
+    
+    # Show sample tickets
+    sample_tickets = sorted(tickets, key=lambda x: x['time_spent'], reverse=True)[:10]
+    
+    for i, ticket in enumerate(sample_tickets, 1):
+        desc_preview = ticket['description'][:200]
+        if len(ticket['description']) > 200:
+            desc_preview += '...'
+        
+        html += f"""
+            <div class="ticket-item">
+                <strong>#{i} - {ticket['ticket_number']}</strong> | 
+                <strong>{ticket['time_spent']:.1f}hrs</strong> | 
+                <strong>{ticket['status']}</strong> | 
+                <strong>{ticket['assigned_to']}</strong><br>
+                <strong>Subject:</strong> {ticket['subject']}<br>
+                <strong>Description:</strong> {desc_preview}
+            </div>
+        """
+    
+    html += "</div></td></tr>"
+    return html
+
+def in_memory_report(output_file, detailed_analysis, stats):
+    """Build the whole document as one string with the pre-streaming code, then write it in a single call"""
+    html_content = legacy_html_report(None, detailed_analysis, stats)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(html_content)
+
+def measure(function, output_file, detailed_analysis, stats):
+    """Return (seconds, peak traced bytes, output bytes) for one report run"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    function(output_file, detailed_analysis, stats)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, os.path.getsize(output_file)
+
+def run_benchmark(scales):
+    """Benchmark both report paths at each scale; returns False if their reports differ"""
+    print(f"{'Tickets':>10} | {'Path':<10} | {'Time (s)':>9} | {'Peak MB':>8} | {'Report KB':>9}")
+    print('-' * 58)
+
+    identical = True
+    with tempfile.TemporaryDirectory() as workdir:
+        for ticket_count in scales:
+            detailed_analysis, stats = build_analysis(ticket_count)
+            outputs = {}
+
+            for name, function in (('in-memory', in_memory_report),
+                                   ('streaming', lambda path, d, s: write_html_report(path, None, d, s))):
+                output_file = os.path.join(workdir, f"{name}_{ticket_count}.html")
+                elapsed, peak, size = measure(function, output_file, detailed_analysis, stats)
+                print(f"{ticket_count:>10,} | {name:<10} | {elapsed:>9.3f} | {peak / 1e6:>8.2f} | {size / 1024:>9.1f}")
+                with open(output_file, encoding='utf-8') as f:
+                    outputs[name] = normalize_report(f.read())
+
+            # The paths must differ only in the embedded generation timestamps
+            (reference_name, reference), *others = outputs.items()
+            for name, output in others:
+                if output != reference:
+                    offset = next((i for i, (a, b) in enumerate(zip(output, reference)) if a != b),
+                                  min(len(output), len(reference)))
+                    print(f"❌ The {name} report differs from the {reference_name} report at {ticket_count:,} tickets "
+                          f"(first difference at character {offset:,})")
+                    identical = False
+
+    if identical:
+        print("✅ Every writer produced the same report")
+    return identical
+
+if __name__ == "__main__":
+    scales = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SCALES
+    sys.exit(0 if run_benchmark(scales) else 1)
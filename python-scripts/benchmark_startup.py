@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+CLI Startup Benchmark
+Times comprehensive_analysis.py from process start to exit (--help, small .csv runs with and
+without --fast-csv, cache-hit runs) and its import cost from python -X importtime, checks that
+--fast-csv gives the pandas path's statistics, and flags measurements that regressed against an
+earlier results file
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from synthetic_tickets import write_ticket_export
+
+RESULTS_VERSION = 1
+DEFAULT_REPEATS = 5
+DEFAULT_TICKETS = 1_000
+TOP_IMPORTS = 10
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.join(SCRIPT_DIR, 'comprehensive_analysis.py')
+CASES = ['import', 'help', 'csv', 'fast_csv', 'fast_csv_cache_hit']
+
+# A case regresses when it is this much slower than the baseline...
+DEFAULT_THRESHOLD = 0.20
+# ...and slower by at least this many seconds; process start-up is noisy
+NOISE_FLOOR_SECONDS = 0.02
+
+def import_times(module='comprehensive_analysis'):
+    """Import module in a fresh interpreter under -X importtime; returns [(cumulative s, self s, name)]"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                            cwd=SCRIPT_DIR, capture_output=True, text=True, check=True)
+    entries = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        entries.append((int(cumulative_us) / 1e6, int(self_us) / 1e6, name.strip()))
+    return entries
+
+def run_seconds(arguments, repeats, workdir):
+    """Best wall time of repeats runs of the analyzer CLI with arguments"""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, SCRIPT, *arguments], cwd=workdir, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def run_benchmark(repeats=DEFAULT_REPEATS, tickets=DEFAULT_TICKETS, seed=42):
+    """Time every case and return the results document"""
+    timings = {}
+    imports = None
+    for _ in range(repeats):
+        entries = import_times()
+        # The top-level module is reported last, with the whole import tree as its cumulative time
+        if imports is None or entries[-1][0] < imports[-1][0]:
+            imports = entries
+    timings['import'] = imports[-1][0]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        export_path = os.path.join(workdir, f"tickets_{tickets}.csv")
+        cache_path = os.path.join(workdir, 'labels.db')
+        write_ticket_export(export_path, tickets, seed)
+
+        timings['help'] = run_seconds(['--help'], repeats, workdir)
+        timings['csv'] = run_seconds([export_path], repeats, workdir)
+        timings['fast_csv'] = run_seconds([export_path, '--fast-csv'], repeats, workdir)
+        # The first run fills the cache; every timed run is then all hits
+        run_seconds([export_path, '--fast-csv', '--cache', cache_path], 1, workdir)
+        timings['fast_csv_cache_hit'] = run_seconds([export_path, '--fast-csv', '--cache', cache_path], repeats, workdir)
+
+    return {
+        'version': RESULTS_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'tickets': tickets,
+        'repeats': repeats,
+        'timings': timings,
+        'pandas_on_import': any(name == 'pandas' for _, _, name in imports),
+        'slowest_imports': [
+            {'module': name, 'cumulative_seconds': cumulative, 'self_seconds': self_seconds}
+            for cumulative, self_seconds, name in sorted(imports, reverse=True)[:TOP_IMPORTS]
+        ]
+    }
+
+def check_fast_csv(tickets=DEFAULT_TICKETS, seed=42):
+    """Analyze one synthetic .csv with --fast-csv and with pandas; their statistics must be identical"""
+    import contextlib
+    import io
+
+    from comprehensive_analysis import add_full_description, analyze_csv_rows, classify_tickets_batch
+    from ticket_aggregate import TicketAggregate
+    from ticket_cube import DIMENSIONS
+    from ticket_loader import load_tickets
+
+    with tempfile.TemporaryDirectory() as workdir:
+        export_path = os.path.join(workdir, f"tickets_{tickets}.csv")
+        write_ticket_export(export_path, tickets, seed)
+        with contextlib.redirect_stdout(io.StringIO()):
+            fast = analyze_csv_rows(export_path).to_statistics()
+        df, _ = classify_tickets_batch(add_full_description(load_tickets(export_path)), detailed=False)
+        aggregate = TicketAggregate()
+        aggregate.add_frame(df)
+        full = aggregate.to_statistics()
+
+    # Exact equality: the report prints these figures, so even the last digit must agree
+    differing = [key for key in full if key != 'cube' and fast[key] != full[key]]
+    differing += [f"{dimension} slice" for dimension in DIMENSIONS
+                  if fast['cube'].rollup(dimension) != full['cube'].rollup(dimension)]
+    if differing:
+        print(f"❌ --fast-csv statistics differ from the pandas path on {tickets:,} tickets: {', '.join(differing)}")
+        return False
+    print(f"✅ --fast-csv and the pandas path give identical statistics on {tickets:,} tickets")
+    return True
+
+def print_results(results):
+    """Print the timing table and the slowest imports"""
+    print(f"⏱️ Startup timings ({results['tickets']:,}-ticket .csv, best of {results['repeats']}):")
+    for case in CASES:
+        print(f"   {case:<20} | {results['timings'][case]:>7.3f}s")
+    print(f"   • pandas imported by 'import comprehensive_analysis': {'yes' if results['pandas_on_import'] else 'no'}")
+
+    print(f"\n📦 Slowest imports (cumulative):")
+    for entry in results['slowest_imports']:
+        print(f"   {entry['module']:<40} | {entry['cumulative_seconds'] * 1000:>8.1f} ms")
+
+def find_regressions(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Compare case timings; returns (case, old, new) for slowdowns"""
+    regressions = []
+    for case in CASES:
+        old = baseline.get('timings', {}).get(case)
+        new = results['timings'][case]
+        if old is not None and new > old * (1 + threshold) and new - old > NOISE_FLOOR_SECONDS:
+            regressions.append((case, old, new))
+    return regressions
+
+def print_comparison(results, baseline, regressions):
+    """Print each case against the baseline and any regressions"""
+    print(f"\n📊 Against baseline from {baseline.get('created', 'unknown')}:")
+    for case in CASES:
+        old = baseline.get('timings', {}).get(case)
+        new = results['timings'][case]
+        if old:
+            print(f"   {case:<20} | {old:>7.3f}s → {new:>7.3f}s ({old / new:.1f}x)")
+
+    if not regressions:
+        print("✅ No startup case regressed against the baseline")
+        return
+
+    for case, old, new in regressions:
+        print(f"⚠️ Regression: {case} {old:.3f}s → {new:.3f}s (+{(new / old - 1) * 100:.0f}%)")
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Benchmark comprehensive_analysis.py start-up and small-run wall time",
+        epilog="Example: python benchmark_startup.py --baseline startup_before.json"
+    )
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS,
+                        help=f"runs per case; the fastest is kept (default: {DEFAULT_REPEATS})")
+    parser.add_argument('--tickets', type=int, default=DEFAULT_TICKETS,
+                        help=f"tickets in the synthetic .csv export (default: {DEFAULT_TICKETS:,})")
+    parser.add_argument('--seed', type=int, default=42, help="random seed for the synthetic tickets")
+    parser.add_argument('--output', metavar='PATH',
+                        help="results JSON file (default: startup_results_<timestamp>.json)")
+    parser.add_argument('--baseline', metavar='PATH',
+                        help="earlier results JSON to compare against; exits with status 1 on regressions")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f"relative slowdown that counts as a regression (default: {DEFAULT_THRESHOLD})")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    same_statistics = check_fast_csv(args.tickets, args.seed)
+    results = run_benchmark(args.repeats, args.tickets, args.seed)
+    print_results(results)
+
+    output_file = args.output or f"startup_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results saved to: {output_file}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.threshold)
+        print_comparison(results, baseline, regressions)
+        sys.exit(1 if regressions or not same_statistics else 0)
+    sys.exit(0 if same_statistics else 1)
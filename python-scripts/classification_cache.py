@@ -0,0 +1,111 @@
+"""
+Persistent Classification Cache
+Stores labels in SQLite keyed by a hash of the ticket text, category and pattern set
+"""
+
+import hashlib
+import sqlite3
+
+from ticket_aggregate import column_values
+
+# SQLite's default limit on bound parameters is 999
+LOOKUP_BATCH_SIZE = 900
+
+class ClassificationCache:
+    """On-disk map of ticket content hash -> (detected_type, type_category)"""
+
+    def __init__(self, path, fingerprint):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.hits = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS classifications (
+                key TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                detected_type TEXT NOT NULL,
+                type_category TEXT NOT NULL
+            ) WITHOUT ROWID
+        """)
+        # Labels from an older pattern set can never be hit again, so drop them
+        self.connection.execute("DELETE FROM classifications WHERE fingerprint != ?", (fingerprint,))
+        self.connection.commit()
+
+    def close(self):
+        """Close the underlying database"""
+        self.connection.close()
+
+    def ticket_key(self, text_lower, category):
+        """Hash the classifier inputs together with the pattern-set fingerprint"""
+        payload = '\x1f'.join((self.fingerprint, category, text_lower)).encode('utf-8')
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+    def lookup(self, keys):
+        """Return {key: (detected_type, type_category)} for the keys already cached"""
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        for start in range(0, len(unique_keys), LOOKUP_BATCH_SIZE):
+            batch = unique_keys[start:start + LOOKUP_BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+            rows = self.connection.execute(
+                f"SELECT key, detected_type, type_category FROM classifications WHERE key IN ({placeholders})",
+                batch
+            )
+            found.update((key, (detected_type, type_category)) for key, detected_type, type_category in rows)
+        return found
+
+    def store(self, entries):
+        """Save (key, detected_type, type_category) entries"""
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO classifications VALUES (?, ?, ?, ?)",
+            ((key, self.fingerprint, detected_type, type_category) for key, detected_type, type_category in entries)
+        )
+        self.connection.commit()
+
+    def label(self, df, label_function):
+        """Label a frame, running label_function only on the rows not already cached"""
+        import pandas as pd
+
+        keys = [
+            self.ticket_key(str(text).lower(), str(category))
+            for text, category in zip(df['full_description'], column_values(df, 'Category'))
+        ]
+        cached = self.lookup(keys)
+        missing = [key not in cached for key in keys]
+
+        self.misses += sum(missing)
+        self.hits += len(keys) - sum(missing)
+
+        ticket_types = pd.Series([cached.get(key, (None, None))[0] for key in keys], index=df.index, dtype=object)
+        ticket_categories = pd.Series([cached.get(key, (None, None))[1] for key in keys], index=df.index, dtype=object)
+
+        if any(missing):
+            new_types, new_categories = label_function(df[missing])
+            ticket_types[new_types.index] = new_types
+            ticket_categories[new_categories.index] = new_categories
+            self.store(
+                (key, detected_type, type_category)
+                for key, is_missing, detected_type, type_category in zip(keys, missing, ticket_types, ticket_categories)
+                if is_missing
+            )
+
+        return ticket_types, ticket_categories
+
+    def label_values(self, texts_lower, categories, label_function):
+        """Label lists of lowercased texts and categories, running label_function only on the uncached ones"""
+        keys = [self.ticket_key(text_lower, category) for text_lower, category in zip(texts_lower, categories)]
+        cached = self.lookup(keys)
+        missing = [row for row, key in enumerate(keys) if key not in cached]
+
+        self.misses += len(missing)
+        self.hits += len(keys) - len(missing)
+
+        labels = [cached.get(key) for key in keys]
+        if missing:
+            new_labels = label_function([texts_lower[row] for row in missing], [categories[row] for row in missing])
+            for row, label in zip(missing, new_labels):
+                labels[row] = label
+            self.store((keys[row], *labels[row]) for row in missing)
+
+        return labels
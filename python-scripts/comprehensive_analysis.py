@@ -4,162 +4,442 @@ IT Ticket Analyzer - Comprehensive Analysis Script
 Analyzes IT help desk tickets and generates detailed HTML reports
 """
 
-import pandas as pd
+import argparse
+import hashlib
+import json
+import os
 import re
-import sys
-from collections import Counter
 from datetime import datetime
-from pattern_definitions import SPECIFIC_PATTERNS, GENERAL_PATTERNS, CATEGORY_MAPPINGS
-from report_generator import generate_html_report
+from pattern_definitions import CATEGORY_MAPPINGS, FALLBACK_KEYWORDS
+from batch_analysis import READER_THREADS, analyze_batch, is_batch_path
+from description_dedupe import DescriptionDeduper
+from pattern_engine import fallback_match, get_pattern_engine, label_tickets
+from pipeline_profiler import NullProfiler, StageProfiler, build_profile, print_profile, write_profile
+from ticket_aggregate import TicketAggregate, load_snapshot, save_snapshot
+from ticket_cube import TicketCube, cube_statistics
 
-def analyze_tickets(file_path):
+# pandas, the export readers and the report generator are imported where they are first needed,
+# so --help and small --fast-csv runs start quickly
+
+# Rows per chunk in --stream mode; peak memory scales with this, not the export size
+STREAM_CHUNK_SIZE = 20000
+
+def analyze_tickets(file_path, workers=1, stream=False, chunk_size=STREAM_CHUNK_SIZE, cache_path=None,
+                    since=None, snapshot_path=None, columnar_cache=None, dedupe=True, profile=False,
+                    compact_report=False, fast_csv=False, database_path=None, cluster_fallback=False,
+                    preview=False, preview_margin=None):
     """Main analysis function"""
+    cache = None
+    database = None
+    profiler = StageProfiler() if profile else NullProfiler()
     try:
-        # Load Excel file
-        df = pd.read_excel(file_path)
-        print(f"📊 Loaded {len(df):,} tickets from {file_path}")
-        
-        # Combine description fields
-        df['full_description'] = (
-            df.get('Description, Description Additional Details, Additional Notes', '').fillna('') + 
-            ' ' + df.get('Subject', '').fillna('')
-        )
+        if cache_path:
+            from classification_cache import ClassificationCache
+            cache = ClassificationCache(cache_path, pattern_fingerprint())
         
-        # Classify tickets
-        df, detailed_analysis = classify_tickets(df)
+        if database_path:
+            from ticket_database import TicketDatabase
+            database = TicketDatabase(database_path, pattern_fingerprint())
         
-        # Generate statistics
-        stats = generate_statistics(df, detailed_analysis)
+        if columnar_cache:
+            from ticket_loader import usable_cache_dir
+            columnar_cache = usable_cache_dir(columnar_cache)
         
-        # Generate HTML report
-        output_file = f"ticket_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
-        html_content = generate_html_report(df, detailed_analysis, stats)
+        deduper = DescriptionDeduper(classifier_literals()) if dedupe else None
+        
+        if cluster_fallback:
+            from fallback_clusters import FallbackCollector
+            collector = FallbackCollector()
+        else:
+            collector = None
+        
+        aggregate = load_previous_aggregate(since) if since else None
+        snapshot_path = snapshot_path or since
+        
+        if preview and (stream or fast_csv or aggregate is not None):
+            print("ℹ️ --preview samples the whole export in memory, so not with --stream, --fast-csv or --since; running a full analysis")
+            preview = False
+        
+        if fast_csv and not fast_csv_supported(file_path, stream, workers, columnar_cache, profile):
+            print("ℹ️ --fast-csv needs a .csv export without --stream, --workers, --columnar-cache or --profile; using pandas")
+            fast_csv = False
+        
+        if fast_csv:
+            aggregate = analyze_csv_rows(file_path, cache, aggregate, deduper, database, collector)
+            stats = aggregate.to_statistics()
+            df = type_index = None
+        elif stream or aggregate is not None:
+            aggregate = analyze_ticket_stream(file_path, chunk_size if stream else None, workers, cache, aggregate,
+                                              columnar_cache=columnar_cache, deduper=deduper, profiler=profiler,
+                                              database=database, collector=collector)
+            with profiler.stage('statistics'):
+                stats = aggregate.to_statistics()
+            df = type_index = None
+        else:
+            from ticket_loader import load_tickets
+            
+            # Load Excel file (or its columnar cache from an earlier run)
+            with profiler.stage('load'):
+                df = load_tickets(file_path, columnar_cache)
+            print(f"📊 Loaded {len(df):,} tickets from {file_path}")
+            
+            with profiler.stage('full_description'):
+                add_full_description(df)
+            profiler.collect_texts(df['full_description'])
+            
+            # Classify tickets; the report reads its top tickets per type from the columnar TicketStore
+            with profiler.stage('classify'):
+                if preview:
+                    from ticket_preview import preview_tickets
+                    # One pool for every round, so workers start and compile the patterns once
+                    pool = None
+                    if workers > 1:
+                        from parallel_classification import create_pool
+                        pool = create_pool(workers)
+                    classify = lambda frame: classify_tickets_batch(frame, detailed=False, workers=workers, cache=cache,
+                                                                    deduper=deduper, pool=pool)[0]
+                    try:
+                        df, estimates = preview_tickets(df, classify, preview_margin)
+                    finally:
+                        if pool is not None:
+                            pool.shutdown()
+                    if pool is not None:
+                        pool.print_throughput()
+                else:
+                    df, type_index = classify_tickets_batch(df, detailed=True, workers=workers, cache=cache,
+                                                            deduper=deduper)
+            if df is None:
+                return save_preview(estimates)
+            with profiler.stage('type_index'):
+                if preview:
+                    from ticket_store import TicketStore
+                    type_index = TicketStore(df)
+                # The store already indexes every ticket, so the aggregate keeps samples only for a snapshot
+                aggregate = TicketAggregate() if snapshot_path else TicketAggregate(samples_per_type=0)
+                aggregate.add_frame(df)
+            if database is not None:
+                with profiler.stage('database'):
+                    database.add_frame(df)
+            if collector is not None:
+                collector.add_frame(df)
+            
+            # Generate statistics as slices of the aggregate's cube
+            with profiler.stage('statistics'):
+                stats = aggregate.to_statistics()
+        
+        if snapshot_path:
+            save_snapshot(aggregate, snapshot_path, pattern_fingerprint())
+            print(f"💾 Aggregate snapshot saved to: {snapshot_path}")
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        if database is not None:
+            print(f"🗄️ Stored {database.added:,} tickets in {database_path} ({database.total():,} in total; "
+                  f"query with python ticket_database.py {database_path})")
+        
+        if cache is not None:
+            stats['cache_hits'] = cache.hits
+            stats['cache_misses'] = cache.misses
+        
+        if deduper is not None:
+            stats['dedupe_rows'] = deduper.rows
+            stats['dedupe_distinct'] = deduper.distinct
+        
+        # Generate HTML report
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output_file = f"ticket_analysis_{timestamp}.html"
+        with profiler.stage('report'):
+            from report_generator import write_html_report
+            type_index = type_index if type_index is not None else aggregate
+            write_html_report(output_file, df, None, stats, type_index=type_index, compact=compact_report)
         
         print(f"✅ Analysis complete! Report saved to: {output_file}")
         print_summary(stats)
         
+        if collector is not None:
+            cluster_file = report_fallback_clusters(collector, timestamp)
+            print(f"\n🧩 Fallback clusters saved to: {cluster_file}")
+        
+        if profile:
+            profile_report = build_profile(profiler, get_pattern_engine().rules, file_path, stats['total_tickets'])
+            profile_file = f"ticket_profile_{timestamp}.json"
+            write_profile(profile_report, profile_file)
+            print_profile(profile_report)
+            print(f"\n⏱️ Profile saved to: {profile_file}")
+        
         return output_file
         
     except Exception as e:
         print(f"❌ Error analyzing tickets: {e}")
         return None
+    
+    finally:
+        if cache is not None:
+            cache.close()
+        if database is not None:
+            database.close()
 
-def classify_tickets(df):
-    """Classify tickets using pattern matching"""
-    ticket_types = []
-    ticket_categories = []
-    detailed_analysis = {}
-    
-    for idx, row in df.iterrows():
-        text = str(row['full_description'])
-        text_lower = text.lower()
-        category = str(row.get('Category', ''))
-        
-        # Find matching pattern
-        matched_type, matched_category = find_pattern_match(text_lower, category)
-        
-        ticket_types.append(matched_type)
-        ticket_categories.append(matched_category)
-        
-        # Store detailed info
-        detailed_analysis[idx] = {
-            'category': category,
-            'detected_type': matched_type,
-            'type_category': matched_category,
-            'subject': row.get('Subject', ''),
-            'description': text,
-            'time_spent': pd.to_numeric(row.get('Total Time Spent (Hours)', 0), errors='coerce') or 0,
-            'assigned_to': row.get('Assigned To', ''),
-            'status': row.get('Status', ''),
-            'ticket_number': row.get('Help Ticket Number', ''),
-            'created_by': row.get('Created By', '')
-        }
+def save_preview(estimates):
+    """Save the estimates of a preview stopped before every ticket was classified"""
+    if estimates is None:
+        print("⚠️ The preview stopped before its first round finished; nothing to save")
+        return None
+    
+    from ticket_preview import write_estimates
+    preview_file = f"ticket_preview_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    write_estimates(estimates, preview_file)
+    print(f"\n🔬 Preview estimates saved to: {preview_file} (run without --preview for the full report)")
+    return preview_file
+
+def report_fallback_clusters(collector, timestamp):
+    """Cluster the tickets only the keyword fallback labelled, print the biggest clusters and save them all"""
+    from fallback_clusters import cluster_tickets, print_clusters, write_clusters
+    
+    clusters, summary, _ = cluster_tickets(collector.texts, collector.times, collector.labels)
+    print_clusters(clusters, summary, collector.tickets)
+    cluster_file = f"fallback_clusters_{timestamp}.json"
+    write_clusters(clusters, summary, cluster_file)
+    return cluster_file
+
+def load_previous_aggregate(snapshot_path):
+    """Load a saved aggregate, or None if it is missing or was built with other patterns"""
+    if not os.path.exists(snapshot_path):
+        print(f"⚠️ No snapshot at {snapshot_path}; running a full analysis")
+        return None
+    
+    try:
+        aggregate, fingerprint = load_snapshot(snapshot_path)
+    except ValueError as e:
+        print(f"⚠️ {e}; running a full analysis")
+        return None
+    if fingerprint != pattern_fingerprint():
+        print(f"⚠️ Snapshot {snapshot_path} was built with different patterns; running a full analysis")
+        return None
+    
+    print(f"📂 Loaded snapshot with {aggregate.total_tickets:,} tickets from {snapshot_path}")
+    return aggregate
+
+def analyze_ticket_stream(file_path, chunk_size=STREAM_CHUNK_SIZE, workers=1, cache=None, aggregate=None,
+                          columnar_cache=None, deduper=None, profiler=None, database=None, collector=None):
+    """Classify an export chunk by chunk into a TicketAggregate, skipping tickets it already holds"""
+    from ticket_loader import iter_ticket_chunks
+    
+    aggregate = aggregate if aggregate is not None else TicketAggregate()
+    profiler = profiler or NullProfiler()
+    previous_total = aggregate.total_tickets
+    rows_read = 0
+    chunks = 0
+    
+    # One pool for every chunk, so workers start and compile the patterns once
+    pool = None
+    if workers > 1:
+        from parallel_classification import create_pool
+        pool = create_pool(workers)
+    
+    try:
+        for chunk in profiler.iterate('load', iter_ticket_chunks(file_path, chunk_size, columnar_cache)):
+            rows_read += len(chunk)
+            chunks += 1
+            chunk = aggregate.new_tickets(chunk)
+            if chunk.empty:
+                continue
+            with profiler.stage('full_description'):
+                chunk = add_full_description(chunk.copy())
+            profiler.collect_texts(chunk['full_description'])
+            with profiler.stage('classify'):
+                chunk, _ = classify_tickets_batch(chunk, detailed=False, workers=workers, cache=cache,
+                                                  deduper=deduper, pool=pool)
+            with profiler.stage('type_index'):
+                aggregate.add_frame(chunk)
+            if database is not None:
+                with profiler.stage('database'):
+                    database.add_frame(chunk)
+            if collector is not None:
+                collector.add_frame(chunk)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    
+    if pool is not None:
+        pool.print_throughput()
+    print(f"📊 Streamed {rows_read:,} tickets from {file_path} in {chunks:,} chunks")
+    if previous_total:
+        print(f"   • {aggregate.total_tickets - previous_total:,} new tickets merged into {previous_total:,} from the snapshot")
+    return aggregate
+
+def fast_csv_supported(file_path, stream, workers, columnar_cache, profile):
+    """True if the run can take the pandas-free .csv path"""
+    return (os.path.splitext(file_path)[1].lower() == '.csv' and not stream and workers <= 1
+            and not columnar_cache and not profile)
+
+def analyze_csv_rows(file_path, cache=None, aggregate=None, deduper=None, database=None, collector=None):
+    """Classify a .csv export into a TicketAggregate with the csv module instead of pandas (--fast-csv)"""
+    from ticket_loader import csv_number, read_csv_columns
+    from ticket_aggregate import is_missing, ticket_number_key
+    
+    aggregate = aggregate if aggregate is not None else TicketAggregate()
+    previous_total = aggregate.total_tickets
+    columns, row_count = read_csv_columns(file_path)
+    print(f"📊 Loaded {row_count:,} tickets from {file_path}")
+    
+    def column(name, default=''):
+        return columns.get(name, [default] * row_count)
+    
+    rows = range(row_count)
+    if aggregate.ticket_numbers and 'Help Ticket Number' in columns:
+        numbers = columns['Help Ticket Number']
+        rows = [row for row in rows
+                if is_missing(numbers[row]) or ticket_number_key(numbers[row]) not in aggregate.ticket_numbers]
+    
+    # Same text as add_full_description: missing parts are empty strings
+    descriptions = column('Description, Description Additional Details, Additional Notes', None)
+    subjects = column('Subject', None)
+    texts = [
+        (descriptions[row] if isinstance(descriptions[row], str) else '') + ' ' +
+        (subjects[row] if isinstance(subjects[row], str) else '')
+        for row in rows
+    ]
+    categories = [str(category) for category in column('Category')]
+    categories = [categories[row] for row in rows]
+    
+    labels = label_values([text.lower() for text in texts], categories, cache, deduper)
+    
+    raw_times = [csv_number(value) for value in column('Total Time Spent (Hours)', 0)]
+    subject_values, assigned_to, status = column('Subject'), column('Assigned To'), column('Status')
+    ticket_numbers, created_by = column('Help Ticket Number'), column('Created By')
+    created_on = column('Created On', None)
+    records = []
+    times = []
+    for position, row in enumerate(rows):
+        time_value = raw_times[row]
+        records.append({
+            'category': categories[position],
+            'detected_type': labels[position][0],
+            'type_category': labels[position][1],
+            'subject': subject_values[row],
+            'description': texts[position],
+            'time_spent': time_value or 0,
+            'assigned_to': assigned_to[row],
+            'status': status[row],
+            'ticket_number': ticket_numbers[row],
+            'created_by': created_by[row]
+        })
+        times.append(0.0 if time_value != time_value else time_value)
+    
+    aggregate.add_records(records, times, [created_on[row] for row in rows])
+    
+    if database is not None:
+        from ticket_database import ticket_row
+        raw_categories = column('Category', None)
+        database.add_rows(
+            ticket_row(ticket_numbers[row], labels[position][0], labels[position][1], raw_categories[row],
+                       assigned_to[row], status[row], created_by[row], created_on[row], times[position],
+                       subject_values[row], descriptions[row])
+            for position, row in enumerate(rows)
+        )
+    if collector is not None:
+        collector.add(texts, [label[0] for label in labels], times)
+    if previous_total:
+        print(f"   • {aggregate.total_tickets - previous_total:,} new tickets merged into {previous_total:,} from the snapshot")
+    return aggregate
+
+def label_values(texts_lower, categories, cache=None, deduper=None):
+    """Label lists of lowercased texts and categories, through the cache and deduper like classify_tickets_batch"""
+    def classify(texts, cats):
+        return [find_pattern_match(text, category) for text, category in zip(texts, cats)]
+    
+    if deduper is not None:
+        label_function = lambda texts, cats: deduper.label_values(texts, cats, classify)
+    else:
+        label_function = classify
+    
+    if cache is not None:
+        return cache.label_values(texts_lower, categories, label_function)
+    return label_function(texts_lower, categories)
+
+def add_full_description(df):
+    """Combine description fields into the text the classifier reads"""
+    df['full_description'] = (
+        df.get('Description, Description Additional Details, Additional Notes', '').fillna('') + 
+        ' ' + df.get('Subject', '').fillna('')
+    )
+    return df
+
+def classify_tickets_batch(df, detailed=True, workers=1, cache=None, deduper=None, pool=None):
+    """Classify tickets column-wise, resolving first-match priority with masks"""
+    if deduper is not None:
+        label_function = lambda frame: deduper.label(frame, lambda distinct: label_frame(distinct, workers, pool))
+    else:
+        label_function = lambda frame: label_frame(frame, workers, pool)
+    
+    if cache is not None:
+        ticket_types, ticket_categories = cache.label(df, label_function)
+    else:
+        ticket_types, ticket_categories = label_function(df)
+    return apply_classification(df, ticket_types, ticket_categories, detailed)
+
+def label_frame(df, workers=1, pool=None):
+    """Label a frame serially or, with several workers or a shared pool, on a process pool"""
+    if (workers > 1 or pool is not None) and len(df) > 0:
+        from parallel_classification import label_tickets_parallel
+        return label_tickets_parallel(df, workers, pool)
+    return label_tickets(df)
+
+def apply_classification(df, ticket_types, ticket_categories, detailed=True):
+    """Attach classification results to the frame and optionally build the detailed TicketStore"""
+    import pandas as pd
     
     df['detected_ticket_type'] = ticket_types
     df['ticket_category'] = ticket_categories
     
-    return df, detailed_analysis
+    # Parse the time column once; statistics reuse the filled version
+    time_spent = pd.to_numeric(df.get('Total Time Spent (Hours)', 0), errors='coerce')
+    df['time_numeric'] = time_spent.fillna(0) if isinstance(time_spent, pd.Series) else time_spent
+    
+    if not detailed:
+        return df, None
+    
+    from ticket_store import TicketStore
+    return df, TicketStore(df)
 
 def find_pattern_match(text, category):
     """Find the best pattern match for a ticket"""
     
-    # Check specific patterns first
-    for ticket_type, patterns in SPECIFIC_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                return f"🎯 {ticket_type}", get_category_for_type(ticket_type)
-    
-    # Check general patterns
-    for ticket_type, patterns in GENERAL_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, text):
-                return ticket_type, "General IT Support"
-    
-    # Fallback using category
-    mapped_category = CATEGORY_MAPPINGS.get(category, "General IT Support")
-    
-    # Create contextual type based on keywords
-    if any(term in text for term in ['setup', 'configure', 'install']):
-        return f"Setup/Configuration - {category}", mapped_category
-    elif any(term in text for term in ['access', 'permission', 'login']):
-        return f"Access Request - {category}", mapped_category
-    elif any(term in text for term in ['issue', 'problem', 'error', 'not work']):
-        return f"Technical Issue - {category}", mapped_category
-    elif any(term in text for term in ['request', 'need', 'want']):
-        return f"Service Request - {category}", mapped_category
-    else:
-        return f"Other - {category}", mapped_category
-
-def get_category_for_type(ticket_type):
-    """Map ticket type to category"""
-    if any(x in ticket_type for x in ['Billing', 'Financial']):
-        return "Financial & Billing"
-    elif any(x in ticket_type for x in ['Intune', 'MFA', '1Password', 'Security']):
-        return "Security & Access"
-    elif any(x in ticket_type for x in ['Email', 'Mailbox', 'Signature']):
-        return "Email & Communication"
-    elif any(x in ticket_type for x in ['License', 'Software', 'Office', 'Adobe']):
-        return "Software & Licensing"
-    elif any(x in ticket_type for x in ['User', 'Account', 'Group', 'Permission']):
-        return "User Management"
-    elif any(x in ticket_type for x in ['VPN', 'Network', 'Printer', 'WiFi']):
-        return "Infrastructure & Network"
-    elif any(x in ticket_type for x in ['Equipment', 'Hardware', 'Monitor', 'Phone']):
-        return "Hardware & Equipment"
-    elif any(x in ticket_type for x in ['Update', 'Backup', 'Disk']):
-        return "System Maintenance"
-    elif any(x in ticket_type for x in ['Mobile', 'Remote']):
-        return "Mobile & Remote"
-    elif any(x in ticket_type for x in ['EverAgCorp247SitePoller', 'Monitoring']):
-        return "Monitoring & Alerts"
-    elif any(x in ticket_type for x in ['Asset', 'Documentation', 'Training']):
-        return "Administrative Tasks"
-    else:
-        return "Specialized Applications"
+    # Check specific patterns first, then general patterns (first match wins)
+    match = get_pattern_engine().match(text)
+    if match:
+        return match
+    
+    # Fallback using category and keywords
+    return fallback_match(text, category, FALLBACK_KEYWORDS, CATEGORY_MAPPINGS)
+
+def pattern_fingerprint():
+    """Hash everything that decides a ticket's label, so cached labels expire when it changes"""
+    # Compiled str patterns always carry re.UNICODE; it is added here so rules need not be compiled
+    rules = [(rule.ticket_type, rule.type_category, rule.pattern, rule.flags | re.UNICODE)
+             for rule in get_pattern_engine().rules]
+    payload = json.dumps([rules, CATEGORY_MAPPINGS, FALLBACK_KEYWORDS], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+def classifier_literals():
+    """Every literal the classifier tests for, or None if some pattern is not plain words and '.*'"""
+    literals = set()
+    for rule in get_pattern_engine().rules:
+        if rule.literals is None:
+            return None
+        literals.update(rule.literals)
+    for _, terms in FALLBACK_KEYWORDS:
+        literals.update(term for term in terms if term)
+    return literals
 
 def generate_statistics(df, detailed_analysis):
-    """Generate analysis statistics"""
-    type_counts = Counter(df['detected_ticket_type'])
-    category_counts = Counter(df['ticket_category'])
-    
-    df['time_numeric'] = pd.to_numeric(df.get('Total Time Spent (Hours)', 0), errors='coerce').fillna(0)
-    total_time = df['time_numeric'].sum()
-    
-    specific_types = [t for t in type_counts.keys() if t.startswith('🎯')]
-    
-    return {
-        'total_tickets': len(df),
-        'total_time': total_time,
-        'average_time': total_time / len(df) if len(df) > 0 else 0,
-        'unique_types': len(type_counts),
-        'specific_patterns': len(specific_types),
-        'type_counts': type_counts,
-        'category_counts': category_counts,
-        'automation_candidates': sum(type_counts[t] for t in specific_types)
-    }
+    """Generate analysis statistics by building the aggregation cube in one pass and slicing it"""
+    import pandas as pd
+    
+    if 'time_numeric' not in df:
+        df['time_numeric'] = pd.to_numeric(df.get('Total Time Spent (Hours)', 0), errors='coerce').fillna(0)
+    
+    cube = TicketCube()
+    cube.add_frame(df)
+    return cube_statistics(cube)
 
 def print_summary(stats):
     """Print analysis summary to console"""
@@ -171,16 +451,94 @@ def print_summary(stats):
     print(f"   • Specific Patterns: {stats['specific_patterns']}")
     print(f"   • Automation Candidates: {stats['automation_candidates']:,} tickets")
     
+    if 'cache_hits' in stats:
+        lookups = stats['cache_hits'] + stats['cache_misses']
+        hit_rate = (stats['cache_hits'] / lookups * 100) if lookups else 0
+        print(f"   • Classification Cache: {stats['cache_hits']:,} hits, {stats['cache_misses']:,} misses ({hit_rate:.1f}% hit rate)")
+    
+    if stats.get('dedupe_distinct'):
+        ratio = stats['dedupe_rows'] / stats['dedupe_distinct']
+        print(f"   • Distinct Descriptions: {stats['dedupe_distinct']:,} of {stats['dedupe_rows']:,} classified ({ratio:.1f}x dedupe)")
+    
     print(f"\n🎯 Top Categories:")
     for category, count in stats['category_counts'].most_common(5):
         percentage = (count / stats['total_tickets'] * 100)
         print(f"   • {category}: {count:,} tickets ({percentage:.1f}%)")
+    
+    cube = stats.get('cube')
+    if cube is None or not cube.total_tickets:
+        return
+    
+    overall = cube.rollup()[None]
+    print(f"\n⏱️ Time per Ticket: p50 {overall['p50_time']:.2f} h, p90 {overall['p90_time']:.2f} h")
+    print(f"\n👥 Top Assignees by Time:")
+    assignees = sorted(cube.rollup('assignee').items(), key=lambda item: item[1]['total_time'], reverse=True)
+    for assignee, metrics in assignees[:5]:
+        print(f"   • {assignee}: {metrics['total_time']:.1f} hours over {metrics['count']:,} tickets (p90 {metrics['p90_time']:.2f} h)")
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Analyze IT help desk tickets and generate an HTML report",
+        epilog="Example: python comprehensive_analysis.py tickets.xlsx --workers 4"
+    )
+    parser.add_argument('file_path',
+                        help="Excel or .csv export of help desk tickets, or a directory or quoted glob of exports (batch mode)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="classify on N worker processes (default: 1, serial)")
+    parser.add_argument('--stream', action='store_true',
+                        help="read the export in bounded chunks so memory stays flat (.xlsx or .csv)")
+    parser.add_argument('--chunk-size', type=int, default=STREAM_CHUNK_SIZE,
+                        help=f"rows per chunk in --stream mode (default: {STREAM_CHUNK_SIZE:,})")
+    parser.add_argument('--cache', metavar='PATH',
+                        help="SQLite file of previously classified tickets; only new or edited tickets are classified")
+    parser.add_argument('--snapshot', metavar='PATH',
+                        help="save aggregate state (counts, time totals, top tickets per type) to PATH")
+    parser.add_argument('--since', metavar='SNAPSHOT',
+                        help="load a snapshot, classify only tickets not already in it, and update it")
+    parser.add_argument('--columnar-cache', metavar='DIR',
+                        help="keep a memory-mapped Arrow copy of each parsed export in DIR and reuse it while the file is unchanged")
+    parser.add_argument('--no-dedupe', dest='dedupe', action='store_false',
+                        help="classify every ticket separately instead of once per distinct normalized description")
+    parser.add_argument('--profile', action='store_true',
+                        help="time each stage and every pattern; prints tables and saves ticket_profile_<timestamp>.json")
+    parser.add_argument('--compact-report', action='store_true',
+                        help="embed the report data as one JSON payload and render tables and detail panels in the browser")
+    parser.add_argument('--fast-csv', action='store_true',
+                        help="read a .csv export with the csv module and classify without importing pandas")
+    parser.add_argument('--db', metavar='PATH',
+                        help="store every classified ticket in a SQLite database with full-text search (see ticket_database.py)")
+    parser.add_argument('--preview', action='store_true',
+                        help="classify a growing random sample stratified by Category, printing estimates with 95%% "
+                             "confidence intervals each round; Ctrl+C keeps the latest, letting it finish gives the full report")
+    parser.add_argument('--preview-margin', type=float, metavar='PCT',
+                        help="stop the preview once total hours are within ±PCT%% and every category share within ±PCT points")
+    parser.add_argument('--readers', type=int, default=READER_THREADS,
+                        help=f"exports read at once in batch mode (default: {READER_THREADS}); they share one pool of --workers")
+    parser.add_argument('--cluster-fallback', action='store_true',
+                        help="cluster tickets only the keyword fallback labelled and suggest patterns; saves fallback_clusters_<timestamp>.json")
+    return parser.parse_args(argv)
+
+def batch_ignored_options(args):
+    """Options that only apply to a single export"""
+    flags = {'--stream': args.stream, '--cache': args.cache, '--snapshot': args.snapshot, '--since': args.since,
+             '--profile': args.profile, '--fast-csv': args.fast_csv, '--db': args.db,
+             '--cluster-fallback': args.cluster_fallback, '--preview': args.preview or args.preview_margin is not None}
+    return [flag for flag, value in flags.items() if value]
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python comprehensive_analysis.py <excel_file>")
-        print("Example: python comprehensive_analysis.py tickets.xlsx")
-        sys.exit(1)
-    
-    file_path = sys.argv[1]
-    analyze_tickets(file_path)
+    args = parse_args()
+    if is_batch_path(args.file_path):
+        ignored = batch_ignored_options(args)
+        if ignored:
+            print(f"ℹ️ Ignoring single-export options in batch mode: {', '.join(ignored)}")
+        analyze_batch(args.file_path, workers=args.workers, readers=args.readers, columnar_cache=args.columnar_cache,
+                      dedupe=args.dedupe, compact_report=args.compact_report)
+    else:
+        analyze_tickets(args.file_path, workers=args.workers, stream=args.stream,
+                        chunk_size=args.chunk_size, cache_path=args.cache,
+                        since=args.since, snapshot_path=args.snapshot,
+                        columnar_cache=args.columnar_cache, dedupe=args.dedupe, profile=args.profile,
+                        compact_report=args.compact_report, fast_csv=args.fast_csv, database_path=args.db,
+                        cluster_fallback=args.cluster_fallback, preview=args.preview or args.preview_margin is not None,
+                        preview_margin=args.preview_margin)
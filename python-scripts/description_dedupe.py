@@ -0,0 +1,182 @@
+"""
+Within-Run Description Deduplication
+Classifies each distinct normalized description once and copies the label to its duplicates
+"""
+
+import random
+import re
+import sys
+
+from ticket_aggregate import column_values
+
+# Volatile spans in alert text, tried in this order; each is replaced by a one-character marker.
+# The markers are control characters no pattern literal contains, and none of them is a newline.
+VOLATILE_SPANS = [
+    ('\x01', r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}'),          # GUIDs
+    ('\x02', r'[0-9]{4}-[0-9]{2}-[0-9]{2}(?:[ t][0-9]{1,2}:[0-9]{2}(?::[0-9]{2})?)?'),   # ISO dates and timestamps
+    ('\x03', r'[0-9]{1,2}:[0-9]{2}(?::[0-9]{2})?(?: ?[ap]m)?'),                          # clock times
+    ('\x04', r'[0-9]+'),                                                                 # other digit runs
+    ('\x05', r'[ \t\r\f\v]{2,}|[\t\r\f\v]')                                              # whitespace other than one space
+]
+
+def volatile_regex(spans):
+    """Combine span patterns into one regex whose lastindex picks the marker"""
+    # The lookahead lets the scan skip positions where no span can start
+    return re.compile(r'(?=[0-9a-f\t\r\f\v]| [ \t\r\f\v])(?:' + '|'.join(f"({pattern})" for _, pattern in spans) + ')')
+
+VOLATILE_REGEX = volatile_regex(VOLATILE_SPANS)
+MARKERS = [marker for marker, _ in VOLATILE_SPANS]
+# GUIDs and ISO dates both need a hyphen; most text has none and takes this shorter regex
+UNHYPHENATED_REGEX = volatile_regex(VOLATILE_SPANS[2:])
+UNHYPHENATED_MARKERS = MARKERS[2:]
+
+class DescriptionDeduper:
+    """Groups tickets whose normalized text and category match, so each group is classified once
+
+    A volatile span is only masked when no classifier literal can overlap it. Every literal
+    occurrence outside the masked spans then survives unchanged and in order, and no new one
+    can appear (it would have to contain a marker), so a ticket and its normalized text always
+    get the same label. Non-ASCII text is grouped on the exact lowercased text only, because
+    re.IGNORECASE folds some non-ASCII characters onto ASCII letters.
+    """
+
+    def __init__(self, literals):
+        # literals is None when some pattern is not literal-only; then only exact duplicates are grouped
+        self.mask_spans = literals is not None
+        self.literals = sorted(set(literals or ()))
+        # Any literal crossing a span boundary contains the two characters on either side of it
+        self.literal_bigrams = {literal[i:i + 2] for literal in self.literals for i in range(len(literal) - 1)}
+        # frozenset of span characters -> literals short enough to fit inside such a span
+        self.inner_literals = {}
+        self.rows = 0
+        self.distinct = 0
+
+    def normalize(self, text_lower):
+        """Mask digit runs, GUIDs, timestamps and whitespace runs that no literal overlaps"""
+        if not self.mask_spans or not text_lower.isascii():
+            return text_lower
+
+        if '-' in text_lower:
+            regex, markers = VOLATILE_REGEX, MARKERS
+        else:
+            regex, markers = UNHYPHENATED_REGEX, UNHYPHENATED_MARKERS
+
+        pieces = []
+        last = 0
+        for match in regex.finditer(text_lower):
+            start, end = match.span()
+            if self.overlaps_literal(text_lower, start, end):
+                continue
+            pieces.append(text_lower[last:start])
+            pieces.append(markers[match.lastindex - 1])
+            last = end
+
+        if not pieces:
+            return text_lower
+        pieces.append(text_lower[last:])
+        return ''.join(pieces)
+
+    def overlaps_literal(self, text, start, end):
+        """True if a literal occurrence could share a character with text[start:end] (errs towards True)"""
+        if start > 0 and text[start - 1:start + 1] in self.literal_bigrams:
+            return True
+        if end < len(text) and text[end - 1:end + 1] in self.literal_bigrams:
+            return True
+
+        # Otherwise an overlapping occurrence would lie wholly inside the span
+        span = text[start:end]
+        span_chars = frozenset(span)
+        inner = self.inner_literals.get(span_chars)
+        if inner is None:
+            inner = [literal for literal in self.literals if span_chars.issuperset(literal)]
+            self.inner_literals[span_chars] = inner
+        return any(literal in span for literal in inner)
+
+    def group(self, texts_lower, categories):
+        """Return (group of each row, representative row of each group) for lowercased texts and categories"""
+        groups = {}
+        normalized = {}
+        positions = []
+        representatives = []
+
+        for row, (text_lower, category) in enumerate(zip(texts_lower, categories)):
+            if text_lower not in normalized:
+                normalized[text_lower] = self.normalize(text_lower)
+            key = (normalized[text_lower], category)
+            if key not in groups:
+                groups[key] = len(representatives)
+                representatives.append(row)
+            positions.append(groups[key])
+
+        self.rows += len(positions)
+        self.distinct += len(representatives)
+        return positions, representatives
+
+    def label(self, df, label_function):
+        """Label a frame, running label_function on one representative row per group"""
+        import pandas as pd
+
+        positions, representatives = self.group(
+            (str(text).lower() for text in df['full_description']),
+            (str(category) for category in column_values(df, 'Category'))
+        )
+
+        if len(representatives) == len(df):
+            return label_function(df)
+
+        ticket_types, ticket_categories = label_function(df.iloc[representatives])
+        ticket_types = ticket_types.tolist()
+        ticket_categories = ticket_categories.tolist()
+        return (
+            pd.Series([ticket_types[group] for group in positions], index=df.index, dtype=object),
+            pd.Series([ticket_categories[group] for group in positions], index=df.index, dtype=object)
+        )
+
+    def label_values(self, texts_lower, categories, label_function):
+        """Label lists of lowercased texts and categories; label_function maps such lists to (type, category) labels"""
+        positions, representatives = self.group(texts_lower, categories)
+        labels = label_function([texts_lower[row] for row in representatives], [categories[row] for row in representatives])
+        return [labels[group] for group in positions]
+
+def alert_description(rng):
+    """Generate alert-style text full of counters, GUIDs, timestamps and ragged whitespace"""
+    guid = '-'.join(''.join(rng.choice('0123456789abcdef') for _ in range(n)) for n in (8, 4, 4, 4, 12))
+    return rng.choice([
+        f"EverAgCorp247SitePoller: site {rng.randint(1, 40)} down at 2025-0{rng.randint(1, 9)}-1{rng.randint(0, 9)} 0{rng.randint(0, 9)}:15:02",
+        f"Site24x7 Alert Mailer\tmonitor {rng.randint(100, 999)}  is DOWN  (ref {guid})",
+        f"1{' ' * rng.randint(1, 3)}password vault {rng.randint(1, 9)} sync error {rng.randint(1, 12)}:0{rng.randint(0, 5)} pm",
+        f"office{' ' * rng.randint(1, 2)}{rng.choice(['365', '366', '2019'])} login issue #{rng.randint(1000, 99999)}",
+        f"not{rng.choice([' ', '  ', chr(9)])}work after update {rng.randint(1, 99)}"
+    ])
+
+def verify_dedupe(count, seed=42):
+    """Check that every synthetic ticket gets the same label as its normalized text"""
+    from comprehensive_analysis import classifier_literals, find_pattern_match
+    from synthetic_tickets import generate_descriptions
+
+    rng = random.Random(seed)
+    deduper = DescriptionDeduper(classifier_literals())
+    tickets = generate_descriptions(count, seed)
+    tickets += [(alert_description(rng), category) for _, category in tickets]
+
+    distinct = set()
+    mismatches = 0
+    for text, category in tickets:
+        text_lower = text.lower()
+        key = deduper.normalize(text_lower)
+        distinct.add((key, category))
+        if find_pattern_match(text_lower, category) != find_pattern_match(key, category):
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"❌ Label changed by normalization: {text!r} -> {key!r}")
+
+    print(f"📊 Checked {len(tickets):,} tickets, {len(distinct):,} distinct after normalization")
+    if mismatches:
+        print(f"❌ {mismatches:,} tickets changed label")
+        return False
+    print("✅ Normalization never changed a label")
+    return True
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    sys.exit(0 if verify_dedupe(count) else 1)
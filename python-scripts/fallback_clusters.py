@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Fallback Ticket Clustering
+Groups tickets that only the keyword fallback labelled into near-duplicate clusters with MinHash
+and locality-sensitive hashing, and proposes a candidate pattern for each cluster
+"""
+
+import json
+import math
+import re
+import sys
+import time
+import zlib
+from collections import Counter
+
+from pattern_definitions import FALLBACK_KEYWORDS
+
+# find_pattern_match labels unmatched tickets '<fallback prefix> - <category>'
+FALLBACK_PREFIXES = tuple(f"{prefix} - " for prefix, _ in FALLBACK_KEYWORDS) + ('Other - ',)
+
+# Signatures are NUM_PERMUTATIONS minimum hashes, split into BANDS bands of equal rows. Two
+# tickets become candidates when any band matches, which is likely above about (1/16)^(1/4) = 0.5
+# Jaccard similarity; a candidate pair is kept if its estimated similarity reaches the threshold.
+NUM_PERMUTATIONS = 64
+BANDS = 16
+SIMILARITY_THRESHOLD = 0.5
+# Single-link components can chain unrelated tickets together; a component whose commonest token is in
+# fewer than MIN_TOKEN_SHARE of its tickets is split again at a threshold THRESHOLD_STEP higher
+THRESHOLD_STEP = 0.1
+MAX_THRESHOLD = 0.9
+MIN_CLUSTER_SIZE = 5
+
+# A token must appear in this share of a cluster's tickets to describe it
+MIN_TOKEN_SHARE = 0.5
+TOP_TOKENS = 5
+SAMPLE_TEXTS = 3
+TOP_CLUSTERS = 10
+
+TOKEN = re.compile(r"[a-z][a-z0-9']*")
+MIN_TOKEN_LENGTH = 3
+# Words that say nothing about what a ticket is about
+STOPWORDS = frozenset("""
+    the and for you your our are was were has have had not but with this that from they them then
+    than there here what when where which who will would could should can cant please thanks thank
+    hello dear regards team today yesterday tomorrow again still after before just also any all
+    some get got its it's i'm i've we're don't doesn't didn't isn't asap urgent new need needs want
+    wants help able via per into out about been being does did how why com www http https regarding
+""".split())
+
+def ticket_tokens(text, shingle_size=1):
+    """The set of word shingles of a ticket's text, ignoring stopwords and words with digits"""
+    words = [word for word in TOKEN.findall(text.lower())
+             if len(word) >= MIN_TOKEN_LENGTH and word not in STOPWORDS and not any(c.isdigit() for c in word)]
+    if shingle_size == 1:
+        return frozenset(words)
+    return frozenset(' '.join(words[i:i + shingle_size]) for i in range(max(len(words) - shingle_size + 1, 1)))
+
+def is_fallback_label(ticket_type):
+    """True for a label from the keyword fallback rather than a pattern"""
+    return ticket_type.startswith(FALLBACK_PREFIXES)
+
+class FallbackCollector:
+    """Keeps the text, label and hours of every ticket that only the keyword fallback labelled"""
+
+    def __init__(self):
+        self.texts = []
+        self.labels = []
+        self.times = []
+        self.tickets = 0
+
+    def add(self, texts, ticket_types, times):
+        """Offer classified tickets; only fallback-labelled ones are kept"""
+        for text, ticket_type, time_value in zip(texts, ticket_types, times):
+            self.tickets += 1
+            if is_fallback_label(ticket_type):
+                self.texts.append(str(text))
+                self.labels.append(ticket_type)
+                self.times.append(0.0 if time_value != time_value else float(time_value))
+
+    def add_frame(self, df):
+        """Offer a classified frame (full_description, detected_ticket_type, time_numeric)"""
+        self.add(df['full_description'].tolist(), df['detected_ticket_type'].tolist(), df['time_numeric'].tolist())
+
+def minhash_signatures(token_sets, permutations=NUM_PERMUTATIONS, seed=42):
+    """MinHash signature rows (uint32) for non-empty token sets"""
+    import numpy as np
+
+    lengths = np.fromiter((len(tokens) for tokens in token_sets), dtype=np.int64, count=len(token_sets))
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    # crc32 rather than hash(), so signatures are the same in every process
+    ids = np.fromiter((zlib.crc32(token.encode('utf-8')) for tokens in token_sets for token in tokens),
+                      dtype=np.uint64, count=int(lengths.sum()))
+
+    # Multiply-shift hashing: the high 32 bits of a*x + b (mod 2^64) for random odd a
+    rng = np.random.default_rng(seed)
+    multipliers = rng.integers(1, 2 ** 63, size=permutations, dtype=np.uint64) | np.uint64(1)
+    increments = rng.integers(0, 2 ** 63, size=permutations, dtype=np.uint64)
+    shift = np.uint64(32)
+
+    signatures = np.empty((len(token_sets), permutations), dtype=np.uint32)
+    for column in range(permutations):
+        hashed = (ids * multipliers[column] + increments[column]) >> shift
+        signatures[:, column] = np.minimum.reduceat(hashed, offsets)
+    return signatures
+
+def similar_pairs(signatures, bands=BANDS, threshold=SIMILARITY_THRESHOLD):
+    """(left, right, similarity) arrays of candidate pairs from banding whose estimated similarity passes"""
+    import numpy as np
+
+    rows = signatures.shape[1] // bands
+    lefts = []
+    rights = []
+    similarities = []
+    for band in range(bands):
+        block = signatures[:, band * rows:(band + 1) * rows].astype(np.uint64)
+        keys = block[:, 0]
+        for column in range(1, rows):
+            keys = keys * np.uint64(0x9E3779B97F4A7C15) + block[:, column]
+
+        # Link every row of a bucket to the bucket's first row, so each band adds at most one pair per row
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        starts = np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1]))
+        first = order[starts][np.cumsum(starts) - 1]
+        left, right = order[~starts], first[~starts]
+
+        similarity = (signatures[left] == signatures[right]).mean(axis=1)
+        keep = similarity >= threshold
+        lefts.append(left[keep])
+        rights.append(right[keep])
+        similarities.append(similarity[keep])
+
+    return np.concatenate(lefts), np.concatenate(rights), np.concatenate(similarities)
+
+def connected_components(count, left, right):
+    """Component label (its smallest row) for each of count rows joined by the pairs"""
+    import numpy as np
+
+    labels = np.arange(count)
+    while True:
+        joined = np.minimum(labels[left], labels[right])
+        updated = labels.copy()
+        np.minimum.at(updated, left, joined)
+        np.minimum.at(updated, right, joined)
+        # Pointer jumping: follow labels to their own labels, so long chains collapse quickly
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+def coherent_components(token_sets, weights, left, right, similarity, threshold=SIMILARITY_THRESHOLD):
+    """Connected components, with incoherent ones split at rising thresholds; labels are the smallest row"""
+    import numpy as np
+
+    count = len(token_sets)
+    vocabulary = {}
+    token_rows = np.repeat(np.arange(count), [len(tokens) for tokens in token_sets])
+    token_ids = np.fromiter((vocabulary.setdefault(token, len(vocabulary)) for tokens in token_sets for token in tokens),
+                            dtype=np.int64, count=len(token_rows))
+
+    components = connected_components(count, left, right)
+    while True:
+        # Weight of each component's commonest token against the component's weight
+        keys = components[token_rows] * len(vocabulary) + token_ids
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        token_weights = np.bincount(inverse, weights=weights[token_rows])
+        commonest = np.zeros(count)
+        np.maximum.at(commonest, unique_keys // len(vocabulary), token_weights)
+        component_weights = np.bincount(components, weights=weights, minlength=count)
+        incoherent = np.flatnonzero((component_weights > 0) & (commonest < MIN_TOKEN_SHARE * component_weights))
+
+        threshold += THRESHOLD_STEP
+        if not len(incoherent) or threshold > MAX_THRESHOLD + 1e-9:
+            return components
+
+        # Links inside incoherent components are kept only at the higher threshold
+        split = np.isin(components, incoherent)
+        keep = split[left] & (similarity >= threshold - 1e-9)
+        relabelled = connected_components(count, left[keep], right[keep])
+        components = np.where(split, relabelled, components)
+        left, right, similarity = left[~split[left] | keep], right[~split[left] | keep], similarity[~split[left] | keep]
+
+def candidate_pattern(tokens, texts):
+    """Order a cluster's distinguishing tokens as they usually appear and join them like the pattern definitions"""
+    def position(token):
+        found = sorted(text.find(token) for text in texts if token in text)
+        return found[len(found) // 2] if found else 0
+
+    return '.*'.join(re.escape(token) for token in sorted(tokens, key=position))
+
+class LiteralIndex:
+    """Finds the distinct token sets holding a word that contains a literal"""
+
+    def __init__(self, token_sets):
+        self.postings = {}
+        for row, tokens in enumerate(token_sets):
+            for token in tokens:
+                self.postings.setdefault(token, []).append(row)
+        self.vocabulary = '\n' + '\n'.join(self.postings) + '\n'
+        self.rows = {}
+
+    def containing(self, literal):
+        """Rows with a token containing literal"""
+        if literal not in self.rows:
+            rows = set()
+            start = self.vocabulary.find(literal)
+            while start != -1:
+                word_start = self.vocabulary.rfind('\n', 0, start) + 1
+                word_end = self.vocabulary.find('\n', start)
+                rows.update(self.postings[self.vocabulary[word_start:word_end]])
+                start = self.vocabulary.find(literal, word_end)
+            self.rows[literal] = rows
+        return self.rows[literal]
+
+def cluster_tickets(texts, times=None, labels=None, threshold=SIMILARITY_THRESHOLD, min_size=MIN_CLUSTER_SIZE,
+                    shingle_size=1, seed=42):
+    """Cluster near-duplicate ticket texts
+
+    Returns (clusters sorted by hours, run summary, each ticket's position in clusters or -1).
+    """
+    import numpy as np
+
+    start = time.perf_counter()
+    times = times if times is not None else [0.0] * len(texts)
+    labels = labels if labels is not None else [''] * len(texts)
+
+    # Tickets with the same token set are one row, weighted by how many tickets share it
+    rows = {}
+    ticket_rows = []
+    for text in texts:
+        ticket_rows.append(rows.setdefault(ticket_tokens(text, shingle_size), len(rows)))
+    token_sets = list(rows)
+    ticket_rows = np.array(ticket_rows, dtype=np.int64)
+    weights = np.bincount(ticket_rows, minlength=len(token_sets))
+    hours = np.bincount(ticket_rows, weights=np.asarray(times, dtype=float), minlength=len(token_sets))
+
+    # Tickets without a usable word cannot be compared with anything
+    usable = np.array([bool(tokens) for tokens in token_sets])
+    usable_rows = np.flatnonzero(usable)
+    components = np.full(len(token_sets), -1)
+    if len(usable_rows):
+        signatures = minhash_signatures([token_sets[row] for row in usable_rows], seed=seed)
+        left, right, similarity = similar_pairs(signatures, threshold=threshold)
+        components[usable_rows] = usable_rows[coherent_components(
+            [token_sets[row] for row in usable_rows], weights[usable_rows], left, right, similarity, threshold)]
+
+    # Ticket share of every token across all fallback tickets
+    overall = Counter()
+    for tokens, weight in zip(token_sets, weights):
+        for token in tokens:
+            overall[token] += weight
+    total = len(texts)
+
+    texts_by_row = {}
+    for text, row in zip(texts, ticket_rows):
+        texts_by_row.setdefault(int(row), text.lower())
+    labels_by_row = {}
+    for label, row in zip(labels, ticket_rows):
+        labels_by_row.setdefault(int(row), Counter())[label] += 1
+
+    index = LiteralIndex(token_sets)
+    order = np.argsort(components, kind='stable')
+    boundaries = np.flatnonzero(np.diff(components[order])) + 1
+    clusters = []
+    cluster_rows = []
+    for members in np.split(order, boundaries):
+        if components[members[0]] < 0:
+            continue
+        size = int(weights[members].sum())
+        if size < min_size:
+            continue
+
+        counts = Counter()
+        for row in members:
+            for token in token_sets[row]:
+                counts[token] += int(weights[row])
+        # Distinguishing tokens are common in the cluster and much more common there than overall
+        scored = []
+        for token, count in counts.items():
+            share = count / size
+            lift = share / (overall[token] / total)
+            if share >= MIN_TOKEN_SHARE:
+                scored.append((share * math.log(lift) if lift > 1 else 0.0, token, share, lift))
+        scored.sort(key=lambda entry: (-entry[0], entry[1]))
+        if not scored:
+            continue
+
+        member_texts = [texts_by_row[int(row)] for row in members]
+        member_set = set(members.tolist())
+        # The best single token, or the best two in their usual order, whichever separates the cluster better
+        best = None
+        for tokens in ([scored[0][1]], [token for _, token, _, _ in scored[:2]]):
+            pattern = candidate_pattern(tokens, member_texts)
+            regex = re.compile(pattern)
+            covered = sum(int(weights[row]) for row, text in zip(members, member_texts) if regex.search(text))
+            # Fallback tickets outside the cluster that the candidate would also label
+            matching = set.intersection(*(index.containing(token) for token in tokens)) - member_set
+            other_matches = sum(int(weights[row]) for row in matching if regex.search(texts_by_row[row]))
+            f1 = 2 * covered / (size + covered + other_matches)
+            if best is None or f1 > best[0]:
+                best = (f1, pattern, covered / size, other_matches)
+        _, pattern, coverage, other_matches = best
+
+        fallback_labels = Counter()
+        for row in members:
+            fallback_labels.update(labels_by_row[int(row)])
+        samples = sorted(members.tolist(), key=lambda row: -weights[row])[:SAMPLE_TEXTS]
+
+        clusters.append({
+            'size': size,
+            'distinct_texts': len(members),
+            'total_time': float(hours[members].sum()),
+            'mean_time': float(hours[members].sum()) / size,
+            'candidate_pattern': pattern,
+            'coverage': coverage,
+            'other_matches': other_matches,
+            'top_tokens': [{'token': token, 'share': share, 'lift': lift}
+                           for _, token, share, lift in scored[:TOP_TOKENS]],
+            'fallback_labels': fallback_labels.most_common(3),
+            'samples': [texts_by_row[row] for row in samples]
+        })
+        cluster_rows.append(members)
+
+    ranking = sorted(range(len(clusters)), key=lambda position: (-clusters[position]['total_time'], -clusters[position]['size']))
+    row_cluster = np.full(len(token_sets), -1)
+    for rank, position in enumerate(ranking):
+        row_cluster[cluster_rows[position]] = rank
+    clusters = [clusters[position] for position in ranking]
+    summary = {
+        'fallback_tickets': len(texts),
+        'distinct_token_sets': len(token_sets),
+        'clusters': len(clusters),
+        'clustered_tickets': sum(cluster['size'] for cluster in clusters),
+        'seconds': time.perf_counter() - start
+    }
+    return clusters, summary, row_cluster[ticket_rows].tolist()
+
+def print_clusters(clusters, summary, total_tickets=None, limit=TOP_CLUSTERS):
+    """Print the run summary and the clusters with the most hours"""
+    share = f" of {total_tickets:,} ({summary['fallback_tickets'] / total_tickets * 100:.1f}%)" if total_tickets else ''
+    print(f"\n🧩 Fallback Clusters: {summary['fallback_tickets']:,} tickets{share} fell through to the keyword fallback")
+    if summary['fallback_tickets']:
+        print(f"   • {summary['clusters']:,} clusters of {MIN_CLUSTER_SIZE}+ tickets hold {summary['clustered_tickets']:,} of them "
+              f"({summary['clustered_tickets'] / summary['fallback_tickets'] * 100:.1f}%); "
+              f"{summary['distinct_token_sets']:,} distinct token sets clustered in {summary['seconds']:.2f}s")
+
+    for cluster in clusters[:limit]:
+        tokens = ', '.join(entry['token'] for entry in cluster['top_tokens'])
+        print(f"   {cluster['size']:>7,} tickets | {cluster['total_time']:>9.1f}h | r'{cluster['candidate_pattern']}' "
+              f"covers {cluster['coverage'] * 100:.0f}%, +{cluster['other_matches']:,} other | {tokens}")
+        print(f"   {'':>7}           e.g. {cluster['samples'][0][:80]!r}")
+
+def write_clusters(clusters, summary, path):
+    """Save every cluster to a JSON file"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'summary': summary, 'clusters': clusters}, f, indent=2, ensure_ascii=False)
+
+def planted_tickets(count, themes=40, seed=42):
+    """Synthetic fallback tickets: half from planted themes, half noise; returns (texts, theme per text or None)"""
+    import random
+
+    rng = random.Random(seed)
+    syllables = ['ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'ti', 'vo', 'xe', 'zu', 'bra', 'dre', 'fli', 'gro', 'plo', 'sku']
+    words = [a + b + c for a in syllables for b in syllables for c in syllables]
+    rng.shuffle(words)
+    # Themes get words of their own; noise tickets draw from the rest
+    theme_words = [words[4 * theme:4 * theme + 4] for theme in range(themes)]
+    vocabulary = words[4 * themes:]
+    filler = ['please', 'the', 'laptop', 'office', 'user', 'again', 'still', 'issue', 'error', 'request']
+
+    texts = []
+    truth = []
+    for _ in range(count):
+        if rng.random() < 0.5:
+            theme = rng.randrange(themes)
+            # Each ticket states three or four of its theme's words, with some filler
+            words = rng.sample(theme_words[theme], rng.choice([3, 4])) + rng.sample(filler, rng.randint(0, 2))
+            truth.append(theme)
+        else:
+            words = rng.sample(vocabulary, rng.randint(3, 6))
+            truth.append(None)
+        rng.shuffle(words)
+        texts.append(' '.join(words) + f" ticket {rng.randint(1, 99999)}")
+    return texts, truth
+
+def check_planted(count, themes=40, seed=42):
+    """Cluster planted themes; every theme should come back as one pure cluster"""
+    texts, truth = planted_tickets(count, themes, seed)
+    clusters, summary, assignments = cluster_tickets(texts, seed=seed)
+
+    recalls = []
+    purities = []
+    for theme in range(themes):
+        members = Counter(cluster for cluster, value in zip(assignments, truth) if value == theme)
+        cluster, found = max(members.items(), key=lambda item: (item[0] >= 0, item[1]))
+        recalls.append(found / sum(members.values()) if cluster >= 0 else 0.0)
+        purities.append(found / clusters[cluster]['size'] if cluster >= 0 else 0.0)
+    noise = sum(1 for cluster, value in zip(assignments, truth) if value is None and cluster >= 0)
+    coverage = sum(cluster['coverage'] for cluster in clusters) / len(clusters) if clusters else 0.0
+
+    print(f"⏱️ {count:,} fallback tickets clustered in {summary['seconds']:.2f}s "
+          f"({count / summary['seconds']:,.0f} tickets/s), {summary['clusters']:,} clusters")
+    print(f"   • planted themes: mean recall {sum(recalls) / themes * 100:.1f}%, worst {min(recalls) * 100:.1f}%; "
+          f"mean purity {sum(purities) / themes * 100:.1f}%, worst {min(purities) * 100:.1f}%")
+    print(f"   • noise tickets placed in a cluster: {noise:,}; mean candidate pattern coverage {coverage * 100:.1f}%")
+    return min(recalls) >= 0.9 and min(purities) >= 0.9
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    if not check_planted(count):
+        print("❌ Planted themes were not recovered")
+        sys.exit(1)
+    print("✅ Every planted theme was recovered as one cluster")
@@ -0,0 +1,98 @@
+"""
+Parallel Ticket Classification
+Splits a ticket frame into chunks and classifies them on a process pool
+"""
+
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from pattern_engine import get_pattern_engine, label_tickets
+
+# Only the columns the classifier reads are shipped to the workers
+CLASSIFICATION_COLUMNS = ['full_description', 'Category']
+CHUNKS_PER_WORKER = 4
+MIN_CHUNK_SIZE = 1000
+
+def init_worker():
+    """Compile the pattern engine once per worker process"""
+    get_pattern_engine()
+
+def classify_chunk(chunk):
+    """Label one chunk and report which worker did it and how long it took"""
+    start = time.perf_counter()
+    ticket_types, ticket_categories = label_tickets(chunk)
+    elapsed = time.perf_counter() - start
+    return ticket_types.tolist(), ticket_categories.tolist(), os.getpid(), len(chunk), elapsed
+
+def split_frame(df, workers):
+    """Split a frame into ordered chunks, a few per worker for load balancing"""
+    subset = df[[c for c in CLASSIFICATION_COLUMNS if c in df]]
+    chunk_size = max(MIN_CHUNK_SIZE, -(-len(subset) // (workers * CHUNKS_PER_WORKER)))
+    return [subset.iloc[start:start + chunk_size] for start in range(0, len(subset), chunk_size)]
+
+class ClassificationPool:
+    """A process pool shared by several frames, with worker throughput summed over all of them"""
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker)
+        self.throughput = defaultdict(lambda: [0, 0.0])
+        # Batch mode labels frames from several reader threads at once
+        self.lock = threading.Lock()
+
+    def label(self, df):
+        """Return (types, categories) lists for a frame, in row order"""
+        ticket_types = []
+        ticket_categories = []
+        # map() yields results in submission order, so chunks merge back in row order
+        for types, categories, pid, rows, elapsed in self.executor.map(classify_chunk, split_frame(df, self.workers)):
+            ticket_types.extend(types)
+            ticket_categories.extend(categories)
+            with self.lock:
+                self.throughput[pid][0] += rows
+                self.throughput[pid][1] += elapsed
+        return ticket_types, ticket_categories
+
+    def shutdown(self):
+        self.executor.shutdown()
+
+    def print_throughput(self):
+        if self.throughput:
+            print_worker_throughput(self.throughput)
+
+def create_pool(workers):
+    """A shared pool whose workers have the pattern engine compiled"""
+    return ClassificationPool(workers)
+
+def label_tickets_parallel(df, workers, pool=None):
+    """Return detected type and category Series, computed on a process pool
+
+    Without a pool one is started for this frame and its worker throughput printed; a
+    shared pool (streaming, batch mode) is left running for the caller's other frames.
+    """
+    owned = pool is None
+    if owned:
+        pool = create_pool(workers)
+    try:
+        ticket_types, ticket_categories = pool.label(df)
+    finally:
+        if owned:
+            pool.shutdown()
+
+    if owned:
+        pool.print_throughput()
+
+    return (pd.Series(ticket_types, index=df.index, dtype=object),
+            pd.Series(ticket_categories, index=df.index, dtype=object))
+
+def print_worker_throughput(throughput):
+    """Print tickets classified and tickets/second for each worker process"""
+    print(f"\n⚙️ Worker Throughput:")
+    for pid, (rows, elapsed) in sorted(throughput.items()):
+        rate = rows / elapsed if elapsed > 0 else 0
+        print(f"   • Worker {pid}: {rows:,} tickets in {elapsed:.2f}s ({rate:,.0f} tickets/s)")
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Compiled Pattern Artifact
+Compiles pattern_definitions.py once into a versioned JSON artifact that the Python engine loads
+and the web analyzer embeds, and checks that both analyzers label a corpus the same way
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+
+ARTIFACT_VERSION = 1
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFINITIONS_PATH = os.path.join(SCRIPT_DIR, 'pattern_definitions.py')
+ARTIFACT_PATH = os.path.join(SCRIPT_DIR, 'compiled_patterns.json')
+WEB_ANALYZER_PATH = os.path.join(SCRIPT_DIR, '..', 'web-analyzer', 'ticket_analyzer.html')
+
+# The web analyzer holds the artifact between these two lines
+ARTIFACT_BEGIN = '// BEGIN PATTERN ARTIFACT'
+ARTIFACT_END = '// END PATTERN ARTIFACT'
+EMBEDDED_ARTIFACT = re.compile(rf'^([ \t]*){re.escape(ARTIFACT_BEGIN)}\n.*?^[ \t]*{re.escape(ARTIFACT_END)}$',
+                               re.MULTILINE | re.DOTALL)
+
+# Runs the web analyzer's worker source on a corpus (argv: page, corpus JSON) and prints [type, category] per row
+NODE_PARITY_SCRIPT = r"""
+const fs = require('fs'), vm = require('vm');
+const [htmlPath, corpusPath] = process.argv.slice(2);
+const html = fs.readFileSync(htmlPath, 'utf8');
+const page = html.slice(html.lastIndexOf('<script>') + 8, html.lastIndexOf('</script>'));
+const element = { addEventListener() {}, style: {} };
+const pageContext = { document: { getElementById: () => element }, XLSX: {}, console };
+vm.createContext(pageContext);
+vm.runInContext(page, pageContext);
+
+const rows = JSON.parse(fs.readFileSync(corpusPath, 'utf8'));
+const messages = [];
+const workerContext = {
+    console,
+    importScripts() {},
+    FileReaderSync: function () { this.readAsArrayBuffer = () => new ArrayBuffer(0); },
+    XLSX: { read: () => ({ SheetNames: ['Tickets'], Sheets: { Tickets: {} } }), utils: { sheet_to_json: () => rows } },
+    self: { postMessage: message => messages.push(message) }
+};
+vm.createContext(workerContext);
+vm.runInContext(pageContext.analysisWorkerSource(), workerContext);
+workerContext.self.onmessage({ data: { file: {}, chunkSize: 5000 } });
+
+const done = messages.find(message => message.type !== 'progress');
+if (done.type !== 'done') {
+    console.error(done.message);
+    process.exit(1);
+}
+process.stdout.write(JSON.stringify(done.tickets.map(ticket => [ticket.detectedType, ticket.typeCategory])));
+"""
+
+def definitions_hash():
+    """Hash of pattern_definitions.py, so an artifact built from other definitions is recognized as stale"""
+    with open(DEFINITIONS_PATH, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+def build_artifact():
+    """Compile the pattern definitions into the artifact dict"""
+    from pattern_definitions import (SPECIFIC_PATTERNS, GENERAL_PATTERNS, CATEGORY_MAPPINGS, FALLBACK_KEYWORDS,
+                                     get_automation_score, get_category_for_type)
+    from pattern_engine import PatternEngine
+
+    engine = PatternEngine(SPECIFIC_PATTERNS, GENERAL_PATTERNS, get_category_for_type)
+    types = list(dict.fromkeys(rule.ticket_type for rule in engine.rules))
+    categories = {rule.ticket_type: rule.type_category for rule in engine.rules}
+
+    return {
+        'version': ARTIFACT_VERSION,
+        'source_hash': definitions_hash(),
+        # Rules in priority order: the first rule that matches a ticket labels it
+        'rules': [
+            {
+                'priority': priority,
+                'type': rule.ticket_type,
+                'pattern': rule.pattern,
+                'ignore_case': rule.ignore_case,
+                'literals': list(rule.literals) if rule.literals is not None else None
+            }
+            for priority, rule in enumerate(engine.rules)
+        ],
+        # [leading literal, ignore case, rule priorities]; rules outside the index are always candidates
+        'literal_index': [[literal, ignore_case, positions] for literal, ignore_case, positions in engine.literal_index],
+        'unindexed': engine.unindexed,
+        'type_categories': {ticket_type: categories[ticket_type] for ticket_type in types},
+        'automation_scores': {ticket_type: get_automation_score(ticket_type) for ticket_type in types},
+        'default_automation_score': 'LOW',
+        'fallback': {
+            'keywords': [[prefix, terms] for prefix, terms in FALLBACK_KEYWORDS],
+            'other_prefix': 'Other',
+            'category_mappings': CATEGORY_MAPPINGS,
+            'default_category': 'General IT Support'
+        }
+    }
+
+def artifact_json(artifact, indent=''):
+    """Serialize the artifact with one rule or table entry per line, so rebuilds diff cleanly"""
+    dumps = lambda value: json.dumps(value, ensure_ascii=False)
+    lines = []
+    for key, value in artifact.items():
+        if isinstance(value, list) and value and isinstance(value[0], (dict, list)):
+            entries = [f"{indent}    {dumps(item)}" for item in value]
+            lines.append(f"{indent}  {dumps(key)}: [\n" + ',\n'.join(entries) + f"\n{indent}  ]")
+        elif isinstance(value, dict) and key != 'fallback':
+            entries = [f"{indent}    {dumps(name)}: {dumps(item)}" for name, item in value.items()]
+            lines.append(f"{indent}  {dumps(key)}: {{\n" + ',\n'.join(entries) + f"\n{indent}  }}")
+        else:
+            lines.append(f"{indent}  {dumps(key)}: {dumps(value)}")
+    return '{\n' + ',\n'.join(lines) + f"\n{indent}}}"
+
+def load_artifact(path=ARTIFACT_PATH):
+    """Load the compiled artifact, or None if it is missing, from another version, or built from other definitions"""
+    if not os.path.exists(path):
+        return None
+
+    with open(path, encoding='utf-8') as f:
+        artifact = json.load(f)
+
+    if artifact.get('version') != ARTIFACT_VERSION or artifact.get('source_hash') != definitions_hash():
+        print(f"⚠️ {os.path.basename(path)} is out of date; using pattern_definitions.py (rebuild with python pattern_artifact.py)")
+        return None
+    return artifact
+
+def embed_artifact(html, artifact):
+    """Return the web analyzer page with its embedded artifact replaced"""
+    def replace(match):
+        indent = match.group(1)
+        # "</" would end the page's <script> element early
+        body = artifact_json(artifact, indent).replace('</', '<\\/')
+        return f"{indent}{ARTIFACT_BEGIN}\n{indent}const patternArtifact = {body};\n{indent}{ARTIFACT_END}"
+
+    updated, count = EMBEDDED_ARTIFACT.subn(replace, html, count=1)
+    if not count:
+        raise ValueError(f"no '{ARTIFACT_BEGIN}' block in the web analyzer")
+    return updated
+
+def embedded_artifact(html):
+    """Return the artifact embedded in the web analyzer page, or None"""
+    match = EMBEDDED_ARTIFACT.search(html)
+    if not match:
+        return None
+    body = match.group(0).split('const patternArtifact = ', 1)[1].rsplit(';', 1)[0]
+    return json.loads(body)
+
+def write_artifact(artifact, path=ARTIFACT_PATH, web_path=WEB_ANALYZER_PATH):
+    """Write the JSON artifact and embed it in the web analyzer"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(artifact_json(artifact) + '\n')
+
+    with open(web_path, encoding='utf-8') as f:
+        html = f.read()
+    with open(web_path, 'w', encoding='utf-8') as f:
+        f.write(embed_artifact(html, artifact))
+
+def stale_outputs(artifact, path=ARTIFACT_PATH, web_path=WEB_ANALYZER_PATH):
+    """Return the outputs whose artifact differs from a fresh build"""
+    stale = []
+    try:
+        with open(path, encoding='utf-8') as f:
+            current = json.load(f)
+    except FileNotFoundError:
+        current = None
+    if current != artifact:
+        stale.append(path)
+
+    with open(web_path, encoding='utf-8') as f:
+        if embedded_artifact(f.read()) != artifact:
+            stale.append(web_path)
+    return stale
+
+def parity_corpus(count, seed=42):
+    """Synthetic export rows plus the label the Python classifier gives each one"""
+    import random
+
+    from comprehensive_analysis import find_pattern_match
+    from synthetic_tickets import generate_descriptions
+
+    rng = random.Random(seed)
+    rows = []
+    expected = []
+    for position, (text, category) in enumerate(generate_descriptions(count, seed)):
+        # Some tickets are not ASCII, so the prefilter is bypassed, and some have no category
+        if rng.random() < 0.1:
+            text += rng.choice([' – café', ' Ünïcode', ' 日本語'])
+        if position and rng.random() < 0.05:
+            category = None
+
+        row = {'Description, Description Additional Details, Additional Notes': text, 'Subject': ''}
+        if category is not None:
+            row['Category'] = category
+        rows.append(row)
+        # Same text and category as the pipeline: description + ' ' + subject, missing category as 'nan'
+        expected.append(list(find_pattern_match((text + ' ').lower(), str(category if category is not None else float('nan')))))
+    return rows, expected
+
+def check_parity(count, seed=42, web_path=WEB_ANALYZER_PATH):
+    """Label one corpus with the Python classifier and the web analyzer's worker code under node"""
+    import shutil
+    import subprocess
+    import tempfile
+
+    node = shutil.which('node')
+    if node is None:
+        print("⚠️ node is not installed; skipping the web analyzer parity check")
+        return True
+
+    rows, expected = parity_corpus(count, seed)
+    with tempfile.TemporaryDirectory() as workdir:
+        corpus_path = os.path.join(workdir, 'corpus.json')
+        script_path = os.path.join(workdir, 'parity.js')
+        with open(corpus_path, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, ensure_ascii=False)
+        with open(script_path, 'w', encoding='utf-8') as f:
+            f.write(NODE_PARITY_SCRIPT)
+        result = subprocess.run([node, script_path, os.path.abspath(web_path), corpus_path],
+                                capture_output=True, text=True, encoding='utf-8')
+
+    if result.returncode != 0:
+        print(f"❌ The web analyzer failed on the corpus: {result.stderr.strip()}")
+        return False
+
+    actual = json.loads(result.stdout)
+    mismatches = [(row, want, got) for row, want, got in zip(rows, expected, actual) if want != got]
+    if mismatches or len(actual) != len(expected):
+        print(f"❌ {len(mismatches):,} of {len(expected):,} tickets are labelled differently by the web analyzer")
+        for row, want, got in mismatches[:10]:
+            text = row['Description, Description Additional Details, Additional Notes']
+            print(f"   • {text[:60]!r}: Python {want}, web {got}")
+        return False
+
+    print(f"✅ The web analyzer labels all {count:,} tickets like the Python classifier")
+    return True
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Compile pattern_definitions.py into compiled_patterns.json and the web analyzer",
+        epilog="Example: python pattern_artifact.py && python pattern_artifact.py --check --parity 20000"
+    )
+    parser.add_argument('--check', action='store_true',
+                        help="only check that both outputs match the definitions; exits with status 1 if not")
+    parser.add_argument('--parity', type=int, metavar='N',
+                        help="also label N synthetic tickets with both analyzers (needs node) and compare")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    artifact = build_artifact()
+    ok = True
+
+    if args.check:
+        for path in stale_outputs(artifact):
+            print(f"❌ {os.path.relpath(path)} does not match pattern_definitions.py")
+            ok = False
+        if ok:
+            print(f"✅ Compiled patterns are up to date ({len(artifact['rules'])} rules)")
+    else:
+        write_artifact(artifact)
+        print(f"💾 Compiled {len(artifact['rules'])} rules into {os.path.relpath(ARTIFACT_PATH)} "
+              f"and {os.path.relpath(WEB_ANALYZER_PATH)}")
+
+    if args.parity:
+        ok = check_parity(args.parity) and ok
+    sys.exit(0 if ok else 1)
@@ -240,6 +240,30 @@ CATEGORY_MAPPINGS = {
     'nan': 'General IT Support'
 }
 
+# Category of a specific pattern type: the first entry with a keyword in the type name wins
+TYPE_CATEGORY_KEYWORDS = [
+    ("Financial & Billing", ['Billing', 'Financial']),
+    ("Security & Access", ['Intune', 'MFA', '1Password', 'Security']),
+    ("Email & Communication", ['Email', 'Mailbox', 'Signature']),
+    ("Software & Licensing", ['License', 'Software', 'Office', 'Adobe']),
+    ("User Management", ['User', 'Account', 'Group', 'Permission']),
+    ("Infrastructure & Network", ['VPN', 'Network', 'Printer', 'WiFi']),
+    ("Hardware & Equipment", ['Equipment', 'Hardware', 'Monitor', 'Phone']),
+    ("System Maintenance", ['Update', 'Backup', 'Disk']),
+    ("Mobile & Remote", ['Mobile', 'Remote']),
+    ("Monitoring & Alerts", ['EverAgCorp247SitePoller', 'Monitoring']),
+    ("Administrative Tasks", ['Asset', 'Documentation', 'Training'])
+]
+DEFAULT_TYPE_CATEGORY = "Specialized Applications"
+
+# Keyword fallback for tickets no pattern matched, checked in order
+FALLBACK_KEYWORDS = [
+    ('Setup/Configuration', ['setup', 'configure', 'install']),
+    ('Access Request', ['access', 'permission', 'login']),
+    ('Technical Issue', ['issue', 'problem', 'error', 'not work']),
+    ('Service Request', ['request', 'need', 'want'])
+]
+
 # Automation potential scoring
 AUTOMATION_SCORING = {
     'HIGH': [
@@ -273,3 +297,10 @@ def get_automation_score(ticket_type):
         return 'HIGH'
     else:
         return 'LOW'
+
+def get_category_for_type(ticket_type):
+    """Map ticket type to category"""
+    for category, keywords in TYPE_CATEGORY_KEYWORDS:
+        if any(x in ticket_type for x in keywords):
+            return category
+    return DEFAULT_TYPE_CATEGORY
@@ -0,0 +1,285 @@
+"""
+Compiled Pattern Engine for IT Ticket Classification
+Precompiles the pattern definitions once and uses a literal prefilter to
+narrow each ticket down to its candidate patterns before running any regex
+"""
+
+import re
+import sys
+
+# Most patterns are plain words glued together with '.*', e.g. r'migrate.*billing'
+WILDCARD = '.*'
+REGEX_METACHARACTERS = set('.^$*+?{}[]\\|()')
+
+# The engine shared by the analyzer and the classification workers, built by get_pattern_engine()
+_pattern_engine = None
+
+class PatternRule:
+    """A single compiled pattern together with the label it produces"""
+
+    __slots__ = ('ticket_type', 'type_category', 'pattern', 'flags', '_regex', 'literals', 'ignore_case', 'exact')
+
+    def __init__(self, ticket_type, type_category, pattern, flags=0):
+        self.ticket_type = ticket_type
+        self.type_category = type_category
+        self.pattern = pattern
+        self.flags = flags
+        self.ignore_case = bool(flags & re.IGNORECASE)
+        self.literals = literal_segments(pattern)
+        # Plain 'word.*word' patterns always compile, so they wait until a ticket needs the regex;
+        # anything else is compiled now so a bad pattern still fails at startup
+        self._regex = re.compile(pattern, flags) if self.literals is None else None
+
+        if self.literals is not None and self.ignore_case:
+            self.literals = tuple(literal.lower() for literal in self.literals)
+
+        # A single literal segment is fully decided by the substring check
+        self.exact = self.literals is not None and len(self.literals) == 1
+
+    @property
+    def regex(self):
+        """The compiled pattern, built on first use"""
+        if self._regex is None:
+            self._regex = re.compile(self.pattern, self.flags)
+        return self._regex
+
+    def search(self, text, folded=None):
+        """Return True if the pattern matches, skipping the regex when a literal is missing"""
+        haystack = folded if self.ignore_case else text
+        if self.literals is None or haystack is None:
+            return self.regex.search(text) is not None
+
+        for literal in self.literals:
+            if literal not in haystack:
+                return False
+
+        return self.exact or self.regex.search(text) is not None
+
+class PatternEngine:
+    """Classifies ticket text against the specific and general pattern sets"""
+
+    def __init__(self, specific_patterns, general_patterns, category_for_type):
+        self.rules = []
+
+        # Specific patterns always come first and match case-insensitively
+        for ticket_type, patterns in specific_patterns.items():
+            label = f"🎯 {ticket_type}"
+            type_category = category_for_type(ticket_type)
+            for pattern in patterns:
+                self.rules.append(PatternRule(label, type_category, pattern, re.IGNORECASE))
+
+        for ticket_type, patterns in general_patterns.items():
+            for pattern in patterns:
+                self.rules.append(PatternRule(ticket_type, "General IT Support", pattern))
+
+        self.literal_index, self.unindexed = build_literal_index(self.rules)
+
+    @classmethod
+    def from_artifact(cls, artifact):
+        """Build the engine from a compiled pattern artifact (pattern_artifact.py) instead of the definitions"""
+        # The artifact already holds the resolved categories and the literal index, so __init__ is skipped
+        engine = cls.__new__(cls)
+        engine.rules = [
+            PatternRule(rule['type'], artifact['type_categories'][rule['type']], rule['pattern'],
+                        re.IGNORECASE if rule['ignore_case'] else 0)
+            for rule in sorted(artifact['rules'], key=lambda rule: rule['priority'])
+        ]
+        engine.literal_index = [(literal, ignore_case, positions)
+                                for literal, ignore_case, positions in artifact['literal_index']]
+        engine.unindexed = artifact['unindexed']
+        return engine
+
+    def type_groups(self):
+        """Return (ticket_type, type_category, pattern, flags, folded_pattern) per type, in priority order
+
+        Within one type it does not matter which pattern fires, so the patterns are
+        joined into a single alternation. folded_pattern is a case-sensitive form that
+        is equivalent on lowercased ASCII text, or None when no such form is known.
+        """
+        groups = []
+        for rule in self.rules:
+            if not groups or groups[-1][0] != rule.ticket_type:
+                groups.append((rule.ticket_type, rule.type_category, rule.flags, []))
+            groups[-1][3].append(rule)
+
+        result = []
+        for ticket_type, type_category, flags, rules in groups:
+            pattern = '|'.join(f'(?:{rule.pattern})' for rule in rules)
+            folded_pattern = None
+            if flags & re.IGNORECASE and all(rule.literals is not None for rule in rules):
+                folded_pattern = pattern.lower()
+            result.append((ticket_type, type_category, pattern, flags, folded_pattern))
+
+        return result
+
+    def match(self, text):
+        """Return (ticket_type, type_category) for the first matching pattern, or None"""
+        # Lowercasing is only a safe stand-in for re.IGNORECASE on ASCII text
+        folded = text.lower() if text.isascii() else None
+        candidates = self.rules if folded is None else [self.rules[i] for i in self.candidates(text, folded)]
+
+        for rule in candidates:
+            if rule.search(text, folded):
+                return rule.ticket_type, rule.type_category
+
+        return None
+
+    def candidates(self, text, folded):
+        """Return the positions of rules whose leading literal occurs in the text, in priority order"""
+        positions = list(self.unindexed)
+        for literal, ignore_case, rule_positions in self.literal_index:
+            if literal in (folded if ignore_case else text):
+                positions.extend(rule_positions)
+
+        positions.sort()
+        return positions
+
+    def candidate_types(self, text):
+        """Return the ticket types that survive the literal prefilter, in priority order"""
+        folded = text.lower() if text.isascii() else None
+        rules = self.rules if folded is None else [self.rules[i] for i in self.candidates(text, folded)]
+
+        candidates = []
+        for rule in rules:
+            if rule.ticket_type not in candidates:
+                candidates.append(rule.ticket_type)
+        return candidates
+
+def fallback_match(text, category, fallback_keywords, category_mappings, default_category='General IT Support',
+                   other_prefix='Other'):
+    """Label a ticket no pattern matched: a keyword prefix (or 'Other') and its category, mapped to a type category"""
+    mapped_category = category_mappings.get(category, default_category)
+
+    # Create contextual type based on keywords
+    for prefix, terms in fallback_keywords:
+        if any(term in text for term in terms):
+            return f"{prefix} - {category}", mapped_category
+
+    return f"{other_prefix} - {category}", mapped_category
+
+def get_pattern_engine():
+    """Return the shared compiled pattern engine, loaded from compiled_patterns.json or built on first use"""
+    global _pattern_engine
+    if _pattern_engine is None:
+        from pattern_artifact import load_artifact
+        from pattern_definitions import SPECIFIC_PATTERNS, GENERAL_PATTERNS, get_category_for_type
+        artifact = load_artifact()
+        if artifact is not None:
+            _pattern_engine = PatternEngine.from_artifact(artifact)
+        else:
+            _pattern_engine = PatternEngine(SPECIFIC_PATTERNS, GENERAL_PATTERNS, get_category_for_type)
+    return _pattern_engine
+
+def label_tickets(df):
+    """Return the detected type and category Series for a frame with a full_description column"""
+    import pandas as pd
+    from pattern_definitions import CATEGORY_MAPPINGS, FALLBACK_KEYWORDS
+    from ticket_aggregate import column_values
+    
+    # str() per value keeps missing categories as 'nan', exactly like the row-wise path
+    descriptions = pd.Series([str(v) for v in df['full_description']], index=df.index, dtype=object)
+    categories = pd.Series([str(v) for v in column_values(df, 'Category')], index=df.index, dtype=object)
+    text_lower = descriptions.str.lower()
+    is_ascii = pd.Series([text.isascii() for text in text_lower], index=df.index, dtype=bool)
+    
+    ticket_types = pd.Series(None, index=df.index, dtype=object)
+    ticket_categories = pd.Series(None, index=df.index, dtype=object)
+    unresolved = pd.Series(True, index=df.index)
+    
+    # Each type group only scans the rows no earlier group has claimed
+    for ticket_type, type_category, pattern, flags, folded_pattern in get_pattern_engine().type_groups():
+        remaining = text_lower[unresolved]
+        if remaining.empty:
+            break
+        if folded_pattern is not None:
+            # Lowercased ASCII rows can use the faster case-sensitive form of the group
+            ascii_rows = is_ascii[remaining.index]
+            matched = pd.Series(False, index=remaining.index)
+            matched[ascii_rows] = remaining[ascii_rows].str.contains(folded_pattern, regex=True)
+            matched[~ascii_rows] = remaining[~ascii_rows].str.contains(pattern, flags=flags, regex=True)
+        else:
+            matched = remaining.str.contains(pattern, flags=flags, regex=True)
+        hits = remaining.index[matched]
+        ticket_types[hits] = ticket_type
+        ticket_categories[hits] = type_category
+        unresolved[hits] = False
+    
+    # Keyword fallback on whatever is left, labelled with the source category
+    mapped_categories = categories.map(CATEGORY_MAPPINGS).fillna("General IT Support")
+    for prefix, terms in FALLBACK_KEYWORDS + [('Other', [''])]:
+        remaining = text_lower[unresolved]
+        if remaining.empty:
+            break
+        keyword_mask = pd.Series(False, index=remaining.index)
+        for term in terms:
+            keyword_mask |= remaining.str.contains(term, regex=False)
+        hits = remaining.index[keyword_mask]
+        ticket_types[hits] = prefix + ' - ' + categories[hits]
+        ticket_categories[hits] = mapped_categories[hits]
+        unresolved[hits] = False
+    
+    return ticket_types, ticket_categories
+
+def literal_segments(pattern):
+    """Split a 'word.*word' pattern into its literal segments, or None if it uses other regex syntax"""
+    segments = pattern.split(WILDCARD)
+    if any(not segment or REGEX_METACHARACTERS & set(segment) for segment in segments):
+        return None
+    return tuple(segments)
+
+def build_literal_index(rules):
+    """Group rule positions by leading literal so one pass over the literals finds every candidate"""
+    index = {}
+    unindexed = []
+
+    for position, rule in enumerate(rules):
+        if rule.literals is None:
+            unindexed.append(position)
+        else:
+            index.setdefault((rule.literals[0], rule.ignore_case), []).append(position)
+
+    return [(literal, ignore_case, positions) for (literal, ignore_case), positions in index.items()], unindexed
+
+def reference_match(text, specific_patterns, general_patterns, category_for_type):
+    """Uncompiled first-match-wins cascade the engine must reproduce exactly"""
+    for ticket_type, patterns in specific_patterns.items():
+        for pattern in patterns:
+            if re.search(pattern, text, re.IGNORECASE):
+                return f"🎯 {ticket_type}", category_for_type(ticket_type)
+
+    for ticket_type, patterns in general_patterns.items():
+        for pattern in patterns:
+            if re.search(pattern, text):
+                return ticket_type, "General IT Support"
+
+    return None
+
+def verify_engine(count=20000, seed=42):
+    """Check that the engine labels a synthetic corpus exactly like the reference cascade"""
+    from pattern_definitions import SPECIFIC_PATTERNS, GENERAL_PATTERNS, get_category_for_type
+    from synthetic_tickets import generate_descriptions
+
+    engine = PatternEngine(SPECIFIC_PATTERNS, GENERAL_PATTERNS, get_category_for_type)
+    mismatches = []
+
+    for text, _ in generate_descriptions(count, seed):
+        # The analyzer lowercases first, but the engine must also agree on raw text
+        for variant in (text.lower(), text):
+            expected = reference_match(variant, SPECIFIC_PATTERNS, GENERAL_PATTERNS, get_category_for_type)
+            actual = engine.match(variant)
+            if expected != actual:
+                mismatches.append((variant, expected, actual))
+
+    return mismatches
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    mismatches = verify_engine(count)
+
+    if mismatches:
+        print(f"❌ {len(mismatches):,} label mismatches against the reference cascade")
+        for text, expected, actual in mismatches[:10]:
+            print(f"   • {text!r}: expected {expected}, got {actual}")
+        sys.exit(1)
+
+    print(f"✅ Pattern engine labels match the reference cascade on {count:,} synthetic tickets")
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Pattern Linter for IT Ticket Classification
+Measures each pattern's worst-case regex cost, finds patterns that can never fire because an
+earlier pattern always wins, and proposes bounded rewrites verified to give identical labels
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import time
+
+try:
+    import re._parser as sre_parse
+except ImportError:
+    import sre_parse
+
+from comprehensive_analysis import add_full_description, get_pattern_engine
+from synthetic_tickets import FILLER_WORDS, generate_descriptions, pattern_to_text
+
+# Adversarial inputs double in length from the start until a search takes longer than the budget
+ADVERSARIAL_START_LENGTH = 256
+ADVERSARIAL_MAX_LENGTH = 2048
+TIME_BUDGET_SECONDS = 0.05
+# Searches slower than this are timed once; repeating only helps with timer noise on short ones
+REPEAT_BELOW_SECONDS = 0.002
+# A rewrite is only proposed when it cuts the worst case by at least this factor...
+IMPROVEMENT_FACTOR = 2.0
+# ...without making the search on ordinary tickets more than this much slower
+TYPICAL_SLOWDOWN_LIMIT = 1.5
+# A rewrite that turns a superlinear pattern linear may cost up to this much on an ordinary ticket;
+# ratios of sub-microsecond timings are too noisy to hold it to TYPICAL_SLOWDOWN_LIMIT
+LINEAR_TYPICAL_LIMIT_SECONDS = 5e-6
+# Growth exponents below this count as linear; timings at two lengths are too noisy for 1.0
+LINEAR_GROWTH = 1.5
+DEFAULT_CORPUS_SIZE = 20000
+TOP_PATTERNS = 15
+# Possessive repeats only exist from Python 3.11
+REPEAT_OPCODES = {sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT, getattr(sre_parse, 'POSSESSIVE_REPEAT', sre_parse.MAX_REPEAT)}
+
+def effective_literals(rule):
+    """The literal segments a rule looks for in lowercased ticket text, or None for other regex syntax"""
+    # PatternRule already lowercases the literals of case-insensitive rules
+    return rule.literals
+
+def wildcard_flags(pattern):
+    """Return (unbounded repeat count, True if an unbounded repeat contains another repeat)"""
+    unbounded = 0
+    nested = False
+    stack = [(sre_parse.parse(pattern), False)]
+
+    while stack:
+        items, inside_repeat = stack.pop()
+        for op, value in items:
+            if op in REPEAT_OPCODES:
+                low, high, subpattern = value
+                is_unbounded = high == sre_parse.MAXREPEAT
+                unbounded += is_unbounded
+                nested = nested or (inside_repeat and is_unbounded)
+                stack.append((subpattern, inside_repeat or is_unbounded))
+            elif op == sre_parse.SUBPATTERN:
+                stack.append((value[-1], inside_repeat))
+            elif op == sre_parse.BRANCH:
+                stack.extend((branch, inside_repeat) for branch in value[1])
+
+    return unbounded, nested
+
+def embeds(inner, outer):
+    """True if every text containing outer's segments in order also contains inner's in order
+
+    Taking each inner segment at its earliest position inside the outer segments is optimal,
+    so one greedy pass decides it.
+    """
+    position = 0
+    offset = 0
+    for segment in inner:
+        while position < len(outer):
+            found = outer[position].find(segment, offset)
+            if found != -1:
+                offset = found + len(segment)
+                break
+            position += 1
+            offset = 0
+        else:
+            return False
+    return True
+
+def find_unreachable(rules):
+    """Return {position: (reason, earlier position or None)} for rules that can never decide a label"""
+    unreachable = {}
+    for position, rule in enumerate(rules):
+        literals = effective_literals(rule)
+        if literals is None:
+            continue
+        if not rule.ignore_case and any(literal != literal.lower() for literal in literals):
+            unreachable[position] = ('uppercase', None)
+            continue
+        for earlier in range(position):
+            earlier_literals = effective_literals(rules[earlier])
+            if earlier in unreachable or earlier_literals is None:
+                continue
+            if embeds(earlier_literals, literals):
+                same_type = rules[earlier].ticket_type == rule.ticket_type
+                unreachable[position] = ('redundant' if same_type else 'shadowed', earlier)
+                break
+    return unreachable
+
+def adversarial_text(literals, length):
+    """Text that makes a wildcard pattern backtrack as much as possible without matching"""
+    if len(literals) > 1:
+        # Every segment but the last, over and over: each occurrence restarts the wildcard scans
+        unit = ' '.join(literals[:-1]) + ' '
+    else:
+        # Near misses of a single literal
+        unit = (literals[0][:-1] or 'x') + ' '
+    return (unit * (length // len(unit) + 1))[:length]
+
+def search_seconds(regex, text, repeats=3):
+    """Best-of-N time for one search; slow searches are not repeated"""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        regex.search(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        if best > REPEAT_BELOW_SECONDS:
+            break
+    return best
+
+def adversarial_lengths(regex, literals):
+    """Pick the adversarial input lengths for a pattern: double until the time budget is spent"""
+    lengths = []
+    length = ADVERSARIAL_START_LENGTH
+    while length <= ADVERSARIAL_MAX_LENGTH:
+        lengths.append(length)
+        if search_seconds(regex, adversarial_text(literals, length), repeats=1) > TIME_BUDGET_SECONDS:
+            break
+        length *= 2
+    return lengths
+
+def worst_case(regex, literals, lengths):
+    """Time a regex on adversarial inputs; returns seconds at the longest length and the growth exponent"""
+    lengths = lengths[-2:]
+    timings = [search_seconds(regex, adversarial_text(literals, length)) for length in lengths]
+    growth = None
+    if len(timings) > 1 and timings[-2] > 0 and timings[-1] > 0:
+        growth = math.log(timings[-1] / timings[-2]) / math.log(lengths[-1] / lengths[-2])
+    return {'length': lengths[-1], 'seconds': timings[-1], 'growth': growth}
+
+def typical_seconds(regex, corpus):
+    """Mean search time over the corpus"""
+    start = time.perf_counter()
+    for text in corpus:
+        regex.search(text)
+    return (time.perf_counter() - start) / max(len(corpus), 1)
+
+def candidate_rewrites(pattern):
+    """Proposed replacements for a 'word.*word' pattern, keyed by rewrite name"""
+    segments = [re.escape(segment) for segment in pattern.split('.*')]
+    if len(segments) < 2:
+        return {}
+    tempered = ''.join(f"(?:(?!{segment}).)*{segment}" for segment in segments[1:])
+    return {
+        # Stops at the first occurrence of the next segment instead of running to the end of the line
+        'lazy': '.*?'.join(segments),
+        'tempered': segments[0] + tempered,
+        # Only tries the first occurrence of the first segment on each line, so failures stay linear
+        'line-tempered': r'(?<![^\n])' + ''.join(f"(?:(?!{segment}).)*{segment}" for segment in segments[:1]) + tempered,
+        # Not equivalent in general; kept so the corpus check shows what it would change
+        'word-boundary': '.*'.join(rf"\b{segment}\b" for segment in segments)
+    }
+
+def first_match(searches, text):
+    """Position of the first rule whose search matches, or None if the fallback decides"""
+    for position, search in enumerate(searches):
+        if search(text):
+            return position
+    return None
+
+def label_changes(rules, position, candidate, corpus):
+    """Count corpus tickets whose label changes when one rule's regex is replaced"""
+    original = rules[position].regex
+    differing = [text for text in corpus if (original.search(text) is None) != (candidate.search(text) is None)]
+    if not differing:
+        return 0
+
+    searches = [rule.regex.search for rule in rules]
+    replaced = list(searches)
+    replaced[position] = candidate.search
+
+    def label(index):
+        return None if index is None else (rules[index].ticket_type, rules[index].type_category)
+
+    return sum(label(first_match(searches, text)) != label(first_match(replaced, text)) for text in differing)
+
+def probe_texts(rules, rng):
+    """Texts aimed at each pattern: its segments in order, reversed, split across lines and run together"""
+    texts = []
+    for rule in rules:
+        segments = rule.pattern.split('.*')
+        texts.append(pattern_to_text(rule.pattern, rng))
+        texts.append(' '.join(reversed(segments)))
+        texts.append('\n'.join(segments))
+        texts.append(''.join(segments))
+        texts.append(f"{segments[0]} {rng.choice(FILLER_WORDS)} {' '.join(segments)}")
+    return texts
+
+def build_corpus(rules, count, export_path=None, seed=42):
+    """Lowercased ticket text to verify rewrites on: synthetic tickets, per-pattern probes and an optional export"""
+    rng = random.Random(seed)
+    corpus = [text for text, _ in generate_descriptions(count, seed)]
+    corpus += probe_texts(rules, rng)
+
+    if export_path:
+        from ticket_loader import load_tickets
+        df = add_full_description(load_tickets(export_path))
+        corpus += [str(text) for text in df['full_description']]
+
+    return [text.lower() for text in corpus]
+
+def lint_patterns(corpus):
+    """Lint every rule in priority order and return one result dict per rule"""
+    rules = get_pattern_engine().rules
+    unreachable = find_unreachable(rules)
+    results = []
+
+    for position, rule in enumerate(rules):
+        literals = effective_literals(rule)
+        unbounded, nested = wildcard_flags(rule.pattern)
+        result = {
+            'priority': position,
+            'ticket_type': rule.ticket_type,
+            'pattern': rule.pattern,
+            'ignore_case': rule.ignore_case,
+            'unbounded_wildcards': unbounded,
+            'nested_wildcards': nested,
+            'typical_seconds': typical_seconds(rule.regex, corpus),
+            'worst_case': None,
+            'unreachable': None,
+            'rewrites': []
+        }
+
+        if position in unreachable:
+            reason, earlier = unreachable[position]
+            result['unreachable'] = {
+                'reason': reason,
+                'earlier_pattern': rules[earlier].pattern if earlier is not None else None,
+                'earlier_type': rules[earlier].ticket_type if earlier is not None else None
+            }
+
+        if literals is not None:
+            lengths = adversarial_lengths(rule.regex, literals)
+            result['worst_case'] = worst_case(rule.regex, literals, lengths)
+
+            flags = re.IGNORECASE if rule.ignore_case else 0
+            for name, rewrite in candidate_rewrites(rule.pattern).items():
+                candidate = re.compile(rewrite, flags)
+                result['rewrites'].append({
+                    'name': name,
+                    'pattern': rewrite,
+                    'worst_case': worst_case(candidate, literals, lengths),
+                    'typical_seconds': typical_seconds(candidate, corpus),
+                    'label_changes': label_changes(rules, position, candidate, corpus)
+                })
+
+        result['proposal'] = best_rewrite(result)
+        results.append(result)
+
+    return results
+
+def is_linear(worst):
+    """Whether a worst case grew no faster than linearly with the input length"""
+    return worst['growth'] is not None and worst['growth'] < LINEAR_GROWTH
+
+def growth_rank(worst):
+    """Growth exponent rounded to a whole power, so timer noise does not reorder n^1.9 and n^2.0"""
+    return round(worst['growth']) if worst['growth'] is not None else 0
+
+def best_rewrite(result):
+    """The label-preserving rewrite with the slowest growth, then the lowest worst case, if it beats the original by enough"""
+    if result['worst_case'] is None:
+        return None
+    # Making a superlinear pattern linear is worth a few microseconds more on ordinary tickets
+    unlocks_linear = not is_linear(result['worst_case'])
+
+    def cheap_enough(rewrite):
+        if unlocks_linear and is_linear(rewrite['worst_case']):
+            return rewrite['typical_seconds'] <= LINEAR_TYPICAL_LIMIT_SECONDS
+        return rewrite['typical_seconds'] <= result['typical_seconds'] * TYPICAL_SLOWDOWN_LIMIT
+
+    safe = [rewrite for rewrite in result['rewrites'] if rewrite['label_changes'] == 0 and cheap_enough(rewrite)]
+    if not safe:
+        return None
+    best = min(safe, key=lambda rewrite: (growth_rank(rewrite['worst_case']), rewrite['worst_case']['seconds']))
+    if best['worst_case']['seconds'] * IMPROVEMENT_FACTOR > result['worst_case']['seconds']:
+        return None
+    return best['name']
+
+def proposed_rewrite(result):
+    """The rewrite dict named by result['proposal']"""
+    return next(rewrite for rewrite in result['rewrites'] if rewrite['name'] == result['proposal'])
+
+def format_growth(growth):
+    """Render a growth exponent such as n^2.0"""
+    return f"n^{growth:.1f}" if growth is not None else 'n/a'
+
+def print_lint_report(results, corpus_size, top=TOP_PATTERNS):
+    """Print wildcard flags, the costliest patterns, unreachable patterns and proposed rewrites"""
+    multiple = [r for r in results if r['unbounded_wildcards'] > 1]
+    nested = [r for r in results if r['nested_wildcards']]
+    print(f"🔎 Linted {len(results)} patterns against {corpus_size:,} corpus tickets")
+    print(f"   • {sum(r['unbounded_wildcards'] > 0 for r in results)} use unbounded wildcards, "
+          f"{len(multiple)} use more than one, {len(nested)} nest them")
+
+    costly = sorted((r for r in results if r['worst_case']), key=lambda r: r['worst_case']['seconds'], reverse=True)
+    print(f"\n🐢 Costliest Patterns on Adversarial Input:")
+    print(f"   {'Pattern':<36} | {'Worst (ms)':>10} | {'Length':>6} | {'Growth':>7} | {'Typical (µs)':>12} | Proposal")
+    for r in costly[:top]:
+        worst = r['worst_case']
+        print(f"   {r['pattern'][:36]:<36} | {worst['seconds'] * 1000:>10.2f} | {worst['length']:>6,} | "
+              f"{format_growth(worst['growth']):>7} | {r['typical_seconds'] * 1e6:>12.2f} | {r['proposal'] or '-'}")
+
+    unreachable = [r for r in results if r['unreachable']]
+    print(f"\n🚫 Patterns That Can Never Fire ({len(unreachable)}):")
+    for r in unreachable:
+        reason = r['unreachable']
+        if reason['reason'] == 'uppercase':
+            print(f"   • {r['pattern']} ({r['ticket_type']}): case-sensitive with capitals, but ticket text is lowercased")
+        elif reason['reason'] == 'redundant':
+            print(f"   • {r['pattern']}: already covered by {reason['earlier_pattern']!r} of the same type (safe to delete)")
+        else:
+            print(f"   • {r['pattern']} ({r['ticket_type']}): always preceded by {reason['earlier_pattern']!r} "
+                  f"({reason['earlier_type']})")
+
+    proposals = sorted(
+        (r for r in results if r['proposal']),
+        key=lambda r: r['worst_case']['seconds'] - proposed_rewrite(r)['worst_case']['seconds'],
+        reverse=True
+    )
+    print(f"\n🛠️ Proposed Rewrites ({len(proposals)} patterns, identical labels on the corpus; largest savings first):")
+    for r in proposals[:top]:
+        rewrite = proposed_rewrite(r)
+        print(f"   • {r['pattern']!r} -> r'{rewrite['pattern']}'")
+        print(f"     worst {r['worst_case']['seconds'] * 1000:.2f} -> {rewrite['worst_case']['seconds'] * 1000:.2f} ms "
+              f"({format_growth(r['worst_case']['growth'])} -> {format_growth(rewrite['worst_case']['growth'])}), "
+              f"typical {r['typical_seconds'] * 1e6:.2f} -> {rewrite['typical_seconds'] * 1e6:.2f} µs")
+    if len(proposals) > top:
+        print(f"   • ...and {len(proposals) - top} more in the JSON results")
+
+    linear = [r for r in proposals if not is_linear(r['worst_case']) and is_linear(proposed_rewrite(r)['worst_case'])]
+    if linear:
+        print(f"   • {len(linear)} proposals make a superlinear pattern linear on any input, "
+              f"at up to {LINEAR_TYPICAL_LIMIT_SECONDS * 1e6:.0f} µs per ordinary ticket")
+    superlinear = [r for r in results if r['worst_case'] and not is_linear(r['worst_case'])
+                   and not (r['proposal'] and is_linear(proposed_rewrite(r)['worst_case']))]
+    if superlinear:
+        print(f"   • {len(superlinear)} patterns stay superlinear: " + ', '.join(repr(r['pattern']) for r in superlinear[:5])
+              + (' ...' if len(superlinear) > 5 else ''))
+
+    rejected = {}
+    for r in results:
+        for rewrite in r['rewrites']:
+            if rewrite['label_changes']:
+                rejected.setdefault(rewrite['name'], []).append(rewrite['label_changes'])
+    for name, changes in rejected.items():
+        print(f"   • {name} rewrites rejected for {len(changes)} patterns ({sum(changes):,} corpus labels would change)")
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Lint pattern_definitions.py for regex cost, unreachable patterns and safe rewrites",
+        epilog="Example: python pattern_lint.py --corpus tickets.xlsx --json pattern_lint.json"
+    )
+    parser.add_argument('--count', type=int, default=DEFAULT_CORPUS_SIZE,
+                        help=f"synthetic tickets in the verification corpus (default: {DEFAULT_CORPUS_SIZE:,})")
+    parser.add_argument('--corpus', metavar='EXPORT',
+                        help="also verify rewrites on the tickets of a real .xlsx/.csv export")
+    parser.add_argument('--json', metavar='PATH', help="save the full results as JSON")
+    parser.add_argument('--top', type=int, default=TOP_PATTERNS, help="costliest patterns to list")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    corpus = build_corpus(get_pattern_engine().rules, args.count, args.corpus)
+    results = lint_patterns(corpus)
+    print_lint_report(results, len(corpus), args.top)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Results saved to: {args.json}")
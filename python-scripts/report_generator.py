@@ -3,26 +3,77 @@ HTML Report Generator for IT Ticket Analysis
 Generates interactive HTML reports with detailed ticket breakdowns
 """
 
+import json
 import re
 from datetime import datetime
 from pattern_definitions import get_automation_score
+from ticket_aggregate import time_rank
+from ticket_cube import UNKNOWN_PERIOD
 
-def generate_html_report(df, detailed_analysis, stats):
+# Types listed in the report, and how many of them get a detail panel
+REPORT_TYPES = 50
+DETAIL_PANEL_TYPES = 30
+# Assignees listed in the time breakdown, by total hours
+BREAKDOWN_ASSIGNEES = 15
+COMPACT_PAYLOAD_VERSION = 1
+# The title date and the Generated time are the only parts of a report that change between runs
+REPORT_TIMESTAMP = re.compile(r'(?<=Report - )\d{4}-\d{2}-\d{2}|(?<=<strong>Generated:</strong> )\d{4}-\d{2}-\d{2} [0-9:]{8}')
+
+def normalize_report(html):
+    """Blank a report's generation timestamps so reports from separate runs can be compared"""
+    return REPORT_TIMESTAMP.sub('TIMESTAMP', html)
+
+def generate_html_report(df, detailed_analysis, stats, type_index=None, compact=False):
     """Generate comprehensive HTML report"""
-    
-    # Group tickets by type for detailed panels
-    tickets_by_type = {}
-    for idx, info in detailed_analysis.items():
-        ticket_type = info['detected_type']
-        if ticket_type not in tickets_by_type:
-            tickets_by_type[ticket_type] = []
-        tickets_by_type[ticket_type].append(info)
+    return ''.join(report_pieces(df, detailed_analysis, stats, type_index, compact))
+
+def write_html_report(output_file, df, detailed_analysis, stats, type_index=None, compact=False):
+    """Write the report section by section instead of building it in memory first"""
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.writelines(report_pieces(df, detailed_analysis, stats, type_index, compact))
+
+def report_pieces(df, detailed_analysis, stats, type_index=None, compact=False):
+    """Pick the full or the compact report generator"""
+    if compact:
+        return iter_compact_report(detailed_analysis, stats, type_index)
+    return iter_html_report(df, detailed_analysis, stats, type_index)
+
+def report_inputs(detailed_analysis, stats, type_index=None):
+    """Return (sorted_types, sorted_categories, tickets_by_type, type_categories) for either report
+
+    With a type_index (a TicketAggregate) the report only touches the top
+    types and their retained samples, so its cost does not grow with the
+    ticket count. A TicketStore passed as detailed_analysis serves as the
+    type index too; a dict of records is grouped in a single pass.
+    """
+    if type_index is None and hasattr(detailed_analysis, 'top_tickets'):
+        type_index = detailed_analysis
     
     # Sort types by count
-    sorted_types = stats['type_counts'].most_common(50)
+    sorted_types = stats['type_counts'].most_common(REPORT_TYPES)
     sorted_categories = stats['category_counts'].most_common()
     
-    html_content = f"""<!DOCTYPE html>
+    if type_index is not None:
+        tickets_by_type = {ticket_type: type_index.top_tickets(ticket_type) for ticket_type, _ in sorted_types[:DETAIL_PANEL_TYPES]}
+        type_categories = {ticket_type: type_index.type_category(ticket_type) for ticket_type, _ in sorted_types}
+    else:
+        # Group tickets by type for detailed panels
+        tickets_by_type = {}
+        type_categories = {}
+        for idx, info in detailed_analysis.items():
+            ticket_type = info['detected_type']
+            if ticket_type not in tickets_by_type:
+                tickets_by_type[ticket_type] = []
+                type_categories[ticket_type] = info['type_category']
+            tickets_by_type[ticket_type].append(info)
+    
+    return sorted_types, sorted_categories, tickets_by_type, type_categories
+
+def iter_html_report(df, detailed_analysis, stats, type_index=None):
+    """Yield the HTML report in pieces; joined, they form the complete document"""
+    sorted_types, sorted_categories, tickets_by_type, type_categories = report_inputs(detailed_analysis, stats, type_index)
+    
+    yield f"""<!DOCTYPE html>
 <html>
 <head>
     <title>IT Ticket Analysis Report - {datetime.now().strftime('%Y-%m-%d')}</title>
@@ -38,15 +89,19 @@ def generate_html_report(df, detailed_analysis, stats):
         <h1>🔍 IT Ticket Analysis Report</h1>
         <p><strong>Generated:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
         
-        {generate_summary_section(stats)}
-        {generate_category_section(sorted_categories, stats['total_tickets'])}
-        {generate_ticket_types_section(sorted_types, stats['total_tickets'], tickets_by_type, detailed_analysis)}
-        {generate_insights_section(stats)}
+        """
+    yield generate_summary_section(stats)
+    yield "\n        "
+    yield from iter_category_section(sorted_categories, stats['total_tickets'])
+    yield "\n        "
+    yield from iter_ticket_types_section(sorted_types, stats['total_tickets'], tickets_by_type, type_categories)
+    yield "\n        "
+    yield generate_breakdown_section(stats)
+    yield generate_insights_section(stats)
+    yield """
     </div>
 </body>
 </html>"""
-    
-    return html_content
 
 def generate_summary_section(stats):
     """Generate executive summary section"""
@@ -67,7 +122,11 @@ def generate_summary_section(stats):
 
 def generate_category_section(sorted_categories, total_tickets):
     """Generate category breakdown section"""
-    html = """
+    return ''.join(iter_category_section(sorted_categories, total_tickets))
+
+def iter_category_section(sorted_categories, total_tickets):
+    """Yield the category breakdown section row by row"""
+    yield """
         <h2>📊 Category Summary</h2>
         <table style="width: 70%;">
             <tr><th>Category</th><th>Count</th><th>%</th><th>Focus Area</th></tr>
@@ -76,14 +135,17 @@ def generate_category_section(sorted_categories, total_tickets):
     for category, count in sorted_categories:
         percentage = (count / total_tickets * 100)
         focus = get_focus_area(category, percentage)
-        html += f"<tr><td>{category}</td><td>{count:,}</td><td>{percentage:.1f}%</td><td>{focus}</td></tr>"
+        yield f"<tr><td>{category}</td><td>{count:,}</td><td>{percentage:.1f}%</td><td>{focus}</td></tr>"
     
-    html += "</table>"
-    return html
+    yield "</table>"
 
-def generate_ticket_types_section(sorted_types, total_tickets, tickets_by_type, detailed_analysis):
+def generate_ticket_types_section(sorted_types, total_tickets, tickets_by_type, type_categories):
     """Generate detailed ticket types section"""
-    html = """
+    return ''.join(iter_ticket_types_section(sorted_types, total_tickets, tickets_by_type, type_categories))
+
+def iter_ticket_types_section(sorted_types, total_tickets, tickets_by_type, type_categories):
+    """Yield the ticket types table row by row, with detail panels for the top 30 types"""
+    yield """
         <h2>📊 All Ticket Types - Click for Deep Dive Details</h2>
         <table>
             <tr><th>Rank</th><th>Ticket Type</th><th>Category</th><th>Count</th><th>%</th><th>Automation</th></tr>
@@ -96,14 +158,12 @@ def generate_ticket_types_section(sorted_types, total_tickets, tickets_by_type,
         safe_id = re.sub(r'[^a-zA-Z0-9]', '', ticket_type)
         
         # Get category for styling
-        sample_ticket = next((info for info in detailed_analysis.values() 
-                            if info['detected_type'] == ticket_type), None)
-        ticket_category = sample_ticket['type_category'] if sample_ticket else 'General IT Support'
+        ticket_category = type_categories.get(ticket_type, 'General IT Support')
         
         automation = get_automation_score(ticket_type)
         row_class = category_styles.get(ticket_category, 'general')
         
-        html += f"""
+        yield f"""
             <tr class="{row_class}">
                 <td>{rank}</td>
                 <td class="clickable" onclick="toggleDetails('{ticket_type}')">{ticket_type}</td>
@@ -115,16 +175,19 @@ def generate_ticket_types_section(sorted_types, total_tickets, tickets_by_type,
         """
         
         # Add detail panel for top 30 types
-        if rank <= 30:
-            html += generate_detail_panel(ticket_type, count, percentage, 
-                                        tickets_by_type.get(ticket_type, []), safe_id)
+        if rank <= DETAIL_PANEL_TYPES:
+            yield from iter_detail_panel(ticket_type, count, percentage, 
+                                         tickets_by_type.get(ticket_type, []), safe_id)
     
-    html += "</table>"
-    return html
+    yield "</table>"
 
 def generate_detail_panel(ticket_type, count, percentage, tickets, safe_id):
     """Generate expandable detail panel for a ticket type"""
-    html = f"""
+    return ''.join(iter_detail_panel(ticket_type, count, percentage, tickets, safe_id))
+
+def iter_detail_panel(ticket_type, count, percentage, tickets, safe_id):
+    """Yield an expandable detail panel one sample ticket at a time"""
+    yield f"""
         <tr>
             <td colspan="6">
                 <div id="details-{safe_id}" class="detail-panel">
@@ -132,15 +195,10 @@ def generate_detail_panel(ticket_type, count, percentage, tickets, safe_id):
                     <h4>{ticket_type} - {count:,} tickets ({percentage:.1f}%)</h4>
     """
     
-    # Show sample tickets
-    sample_tickets = sorted(tickets, key=lambda x: x['time_spent'], reverse=True)[:10]
-    
-    for i, ticket in enumerate(sample_tickets, 1):
-        desc_preview = ticket['description'][:200]
-        if len(ticket['description']) > 200:
-            desc_preview += '...'
+    for i, ticket in enumerate(sample_tickets(tickets), 1):
+        desc_preview = description_preview(ticket)
         
-        html += f"""
+        yield f"""
             <div class="ticket-item">
                 <strong>#{i} - {ticket['ticket_number']}</strong> | 
                 <strong>{ticket['time_spent']:.1f}hrs</strong> | 
@@ -151,8 +209,165 @@ def generate_detail_panel(ticket_type, count, percentage, tickets, safe_id):
             </div>
         """
     
-    html += "</div></td></tr>"
-    return html
+    yield "</div></td></tr>"
+
+def sample_tickets(tickets):
+    """The 10 most time-consuming tickets shown in a detail panel"""
+    return sorted(tickets, key=lambda x: time_rank(x['time_spent']), reverse=True)[:10]
+
+def description_preview(ticket):
+    """First 200 characters of a ticket description"""
+    desc_preview = ticket['description'][:200]
+    if len(ticket['description']) > 200:
+        desc_preview += '...'
+    return desc_preview
+
+def iter_compact_report(detailed_analysis, stats, type_index=None):
+    """Yield a report whose tables and detail panels are rendered in the browser from one JSON payload
+
+    The visible content matches iter_html_report; only the summary and insights are static HTML.
+    """
+    sorted_types, sorted_categories, tickets_by_type, type_categories = report_inputs(detailed_analysis, stats, type_index)
+    payload = build_report_payload(sorted_types, sorted_categories, stats['total_tickets'], tickets_by_type, type_categories)
+    
+    yield f"""<!DOCTYPE html>
+<html>
+<head>
+    <title>IT Ticket Analysis Report - {datetime.now().strftime('%Y-%m-%d')}</title>
+    <style>
+        {get_css_styles()}
+    </style>
+    <script>
+        {get_compact_javascript_functions()}
+    </script>
+</head>
+<body>
+    <div class="container">
+        <h1>🔍 IT Ticket Analysis Report</h1>
+        <p><strong>Generated:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+        
+        """
+    yield generate_summary_section(stats)
+    yield """
+        <h2>📊 Category Summary</h2>
+        <table id="category-table" style="width: 70%;"></table>
+        
+        <h2>📊 All Ticket Types - Click for Deep Dive Details</h2>
+        <table id="type-table"></table>
+        """
+    yield generate_breakdown_section(stats)
+    yield generate_insights_section(stats)
+    yield """
+    </div>
+    <script type="application/json" id="report-data">"""
+    # A JSON string can never contain "</script>" once every "</" is escaped
+    yield json.dumps(payload, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+    yield """</script>
+    <script>renderReport();</script>
+</body>
+</html>"""
+
+class StringTable:
+    """Gives every distinct string one index, so repeated values are stored once in the payload"""
+
+    def __init__(self):
+        self.strings = []
+        self.positions = {}
+
+    def add(self, value):
+        """Return the index of str(value), adding it on first use"""
+        value = str(value)
+        position = self.positions.get(value)
+        if position is None:
+            position = self.positions[value] = len(self.strings)
+            self.strings.append(value)
+        return position
+
+def build_report_payload(sorted_types, sorted_categories, total_tickets, tickets_by_type, type_categories):
+    """Build the compact report data: a string table, per-type aggregates and each panel's ticket indices
+
+    Decimals are formatted here, so they round exactly as in the full report.
+    """
+    table = StringTable()
+    category_styles = get_category_styles()
+    
+    categories = []
+    for category, count in sorted_categories:
+        percentage = (count / total_tickets * 100)
+        # [category, count, percentage, focus area]
+        categories.append([table.add(category), count, table.add(f"{percentage:.1f}"),
+                           table.add(get_focus_area(category, percentage))])
+    
+    types = []
+    tickets = []
+    for rank, (ticket_type, count) in enumerate(sorted_types, 1):
+        percentage = (count / total_tickets * 100)
+        ticket_category = type_categories.get(ticket_type, 'General IT Support')
+        
+        # Ticket rows are shared through one list; a type keeps only their indices
+        panel = None
+        if rank <= DETAIL_PANEL_TYPES:
+            panel = []
+            for ticket in sample_tickets(tickets_by_type.get(ticket_type, [])):
+                panel.append(len(tickets))
+                # [ticket number, hours, status, assigned to, subject, description preview]
+                tickets.append([
+                    table.add(ticket['ticket_number']),
+                    table.add(f"{ticket['time_spent']:.1f}"),
+                    table.add(ticket['status']),
+                    table.add(ticket['assigned_to']),
+                    table.add(ticket['subject']),
+                    table.add(description_preview(ticket))
+                ])
+        
+        # [type, category, row style, count, percentage, automation, ticket indices or null]
+        types.append([
+            table.add(ticket_type),
+            table.add(ticket_category),
+            table.add(category_styles.get(ticket_category, 'general')),
+            count,
+            table.add(f"{percentage:.1f}"),
+            table.add(get_automation_score(ticket_type)),
+            panel
+        ])
+    
+    return {
+        'version': COMPACT_PAYLOAD_VERSION,
+        'strings': table.strings,
+        'categories': categories,
+        'types': types,
+        'tickets': tickets
+    }
+
+def generate_breakdown_section(stats):
+    """Generate time breakdowns by assignee, status and month, sliced from the statistics' aggregation cube"""
+    cube = stats.get('cube')
+    if cube is None or not cube.total_tickets:
+        return ''
+    
+    assignees = sorted(cube.rollup('assignee').items(), key=lambda item: item[1]['total_time'], reverse=True)
+    statuses = sorted(cube.rollup('status').items(), key=lambda item: item[1]['count'], reverse=True)
+    periods = sorted(cube.rollup('period').items(), key=lambda item: (item[0] == UNKNOWN_PERIOD, item[0]))
+    
+    return f"""
+        <h2>⏱️ Time Breakdown</h2>
+        <h3>👥 By Assignee (top {BREAKDOWN_ASSIGNEES} by hours)</h3>
+        {breakdown_table('Assignee', assignees[:BREAKDOWN_ASSIGNEES])}
+        <h3>📋 By Status</h3>
+        {breakdown_table('Status', statuses)}
+        <h3>📅 By Month</h3>
+        {breakdown_table('Month', periods)}
+    """
+
+def breakdown_table(label, rows):
+    """One breakdown table: tickets, hours and time per ticket for each (value, metrics) row"""
+    cells = ''.join(
+        f"<tr><td>{value}</td><td>{metrics['count']:,}</td><td>{metrics['total_time']:.1f}</td>"
+        f"<td>{metrics['mean_time']:.2f}</td><td>{metrics['p50_time']:.2f}</td><td>{metrics['p90_time']:.2f}</td></tr>"
+        for value, metrics in rows
+    )
+    return (f'<table style="width: 70%;"><tr><th>{label}</th><th>Tickets</th><th>Hours</th>'
+            f'<th>Mean</th><th>p50</th><th>p90</th></tr>{cells}</table>')
 
 def generate_insights_section(stats):
     """Generate insights and recommendations section"""
@@ -262,3 +477,78 @@ def get_javascript_functions():
             panel.style.display = 'none';
         }
     """
+
+def get_compact_javascript_functions():
+    """Return JavaScript that renders the compact report's tables, and each detail panel when first opened"""
+    return """
+        var reportData = null;
+        
+        function renderReport() {
+            reportData = JSON.parse(document.getElementById('report-data').textContent);
+            
+            var categoryRows = ['<tr><th>Category</th><th>Count</th><th>%</th><th>Focus Area</th></tr>'];
+            reportData.categories.forEach(function (category) {
+                categoryRows.push('<tr><td>' + text(category[0]) + '</td><td>' + formatCount(category[1]) + '</td><td>' +
+                                  text(category[2]) + '%</td><td>' + text(category[3]) + '</td></tr>');
+            });
+            document.getElementById('category-table').innerHTML = categoryRows.join('');
+            
+            // Panel rows are created empty so the table keeps its layout; they are filled in toggleDetails
+            var typeRows = ['<tr><th>Rank</th><th>Ticket Type</th><th>Category</th><th>Count</th><th>%</th><th>Automation</th></tr>'];
+            reportData.types.forEach(function (type, index) {
+                var rank = index + 1;
+                var automation = reportData.strings[type[5]];
+                typeRows.push('<tr class="' + text(type[2]) + '"><td>' + rank + '</td>' +
+                              '<td class="clickable" onclick="toggleDetails(' + rank + ')">' + text(type[0]) + '</td>' +
+                              '<td>' + text(type[1]) + '</td><td>' + formatCount(type[3]) + '</td><td>' + text(type[4]) + '%</td>' +
+                              '<td><span class="automation-tag automation-' + automation.toLowerCase() + '">' + text(type[5]) + '</span></td></tr>');
+                if (type[6]) {
+                    typeRows.push('<tr><td colspan="6"><div id="details-' + rank + '" class="detail-panel"></div></td></tr>');
+                }
+            });
+            document.getElementById('type-table').innerHTML = typeRows.join('');
+        }
+        
+        function renderDetails(rank) {
+            var type = reportData.types[rank - 1];
+            var html = ['<button class="close-btn" onclick="closeDetails(' + rank + ')">✕</button>' +
+                        '<h4>' + text(type[0]) + ' - ' + formatCount(type[3]) + ' tickets (' + text(type[4]) + '%)</h4>'];
+            type[6].forEach(function (ticketIndex, i) {
+                var ticket = reportData.tickets[ticketIndex];
+                html.push('<div class="ticket-item"><strong>#' + (i + 1) + ' - ' + text(ticket[0]) + '</strong> | ' +
+                          '<strong>' + text(ticket[1]) + 'hrs</strong> | <strong>' + text(ticket[2]) + '</strong> | ' +
+                          '<strong>' + text(ticket[3]) + '</strong><br>' +
+                          '<strong>Subject:</strong> ' + text(ticket[4]) + '<br>' +
+                          '<strong>Description:</strong> ' + text(ticket[5]) + '</div>');
+            });
+            return html.join('');
+        }
+        
+        function toggleDetails(rank) {
+            var panel = document.getElementById('details-' + rank);
+            if (!panel) {
+                return;
+            }
+            if (!panel.hasChildNodes()) {
+                panel.innerHTML = renderDetails(rank);
+            }
+            if (panel.style.display === 'none' || panel.style.display === '') {
+                panel.style.display = 'block';
+            } else {
+                panel.style.display = 'none';
+            }
+        }
+        
+        function closeDetails(rank) {
+            var panel = document.getElementById('details-' + rank);
+            panel.style.display = 'none';
+        }
+        
+        function text(index) {
+            return reportData.strings[index].replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/"/g, '&quot;');
+        }
+        
+        function formatCount(count) {
+            return count.toLocaleString('en-US');
+        }
+    """
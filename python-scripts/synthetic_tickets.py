@@ -0,0 +1,107 @@
+"""
+Synthetic Ticket Generator for IT Ticket Analysis
+Builds realistic-looking ticket text and full export rows from the pattern definitions
+"""
+
+import random
+from datetime import datetime, timedelta
+from pattern_definitions import SPECIFIC_PATTERNS, GENERAL_PATTERNS, CATEGORY_MAPPINGS
+
+FILLER_WORDS = [
+    'please', 'the', 'for', 'my', 'our', 'team', 'today', 'urgent', 'thanks',
+    'john.doe@company.com', 'laptop', 'asap', 'hi', 'regarding', 'on', 'new',
+    'sales', 'office', 'user', 'again', 'still', 'after', 'yesterday'
+]
+
+FALLBACK_WORDS = [
+    'setup', 'configure', 'install', 'access', 'permission', 'login',
+    'issue', 'problem', 'error', 'not work', 'request', 'need', 'want'
+]
+
+NOISE_TOKENS = [
+    'ticket #48213', '2025-03-14 08:15:02', 'ref 7f3c2a9e-1b4d-4c8e-9a6f-0d2e5b7c1a34',
+    'café', 'straße', 'ſystem', 'KB', '\n', '\t', '  '
+]
+
+ASSIGNEES = ['John Smith', 'Jane Doe', 'IT Team', 'Network Team', None]
+STATUSES = ['Closed', 'Closed', 'Closed', 'Open', 'In Progress', 'Waiting on User']
+REQUESTERS = ['john.doe@company.com', 'jane.smith@company.com', 'EverAgCorp247SitePoller', 'site24x7@company.com']
+TIME_CHOICES = [0, 0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 4, 8]
+
+def pattern_to_text(pattern, rng):
+    """Turn a regex pattern into text that it matches"""
+    segments = pattern.split('.*')
+    text = segments[0]
+    for segment in segments[1:]:
+        filler = ' '.join(rng.choice(FILLER_WORDS) for _ in range(rng.randint(0, 3)))
+        text += f" {filler} {segment}" if filler else f" {segment}"
+    return text
+
+def random_case(text, rng):
+    """Randomly change the casing of a piece of text"""
+    choice = rng.random()
+    if choice < 0.2:
+        return text.upper()
+    elif choice < 0.4:
+        return text.title()
+    return text
+
+def generate_description(rng, all_patterns):
+    """Generate a single synthetic ticket description"""
+    parts = [rng.choice(FILLER_WORDS) for _ in range(rng.randint(1, 6))]
+    roll = rng.random()
+
+    if roll < 0.55:
+        parts.insert(rng.randint(0, len(parts)), pattern_to_text(rng.choice(all_patterns), rng))
+    elif roll < 0.75:
+        parts.insert(rng.randint(0, len(parts)), rng.choice(FALLBACK_WORDS))
+
+    # Split a few multi-word patterns across lines or mangle them so they only nearly match
+    if rng.random() < 0.15:
+        parts.insert(rng.randint(0, len(parts)), rng.choice(NOISE_TOKENS))
+    if rng.random() < 0.05:
+        parts.append(rng.choice(all_patterns).replace('.*', '\n'))
+
+    return random_case(' '.join(parts), rng)
+
+def generate_descriptions(count, seed=42):
+    """Generate (description, category) pairs for classification checks"""
+    rng = random.Random(seed)
+    all_patterns = [p for patterns in SPECIFIC_PATTERNS.values() for p in patterns]
+    all_patterns += [p for patterns in GENERAL_PATTERNS.values() for p in patterns]
+    categories = list(CATEGORY_MAPPINGS.keys()) + ['Software', 'Email']
+
+    return [(generate_description(rng, all_patterns), rng.choice(categories)) for _ in range(count)]
+
+def generate_ticket_rows(count, seed=42):
+    """Generate export rows with the same columns as a help desk Excel export"""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    rows = []
+
+    for idx, (description, category) in enumerate(generate_descriptions(count, seed)):
+        subject = description.split('\n')[0][:60]
+        rows.append({
+            'Help Ticket Number': 100000 + idx,
+            'Subject': subject if rng.random() < 0.9 else None,
+            'Description, Description Additional Details, Additional Notes': description if rng.random() < 0.97 else None,
+            'Category': category if rng.random() < 0.97 else None,
+            'Total Time Spent (Hours)': rng.choice(TIME_CHOICES),
+            'Status': rng.choice(STATUSES),
+            'Assigned To': rng.choice(ASSIGNEES),
+            'Created By': rng.choice(REQUESTERS),
+            'Created On': start + timedelta(minutes=rng.randint(0, 365 * 24 * 60))
+        })
+
+    return rows
+
+def write_ticket_export(path, count, seed=42):
+    """Write a synthetic export to .xlsx or .csv (by extension) and return its row count"""
+    import pandas as pd
+
+    df = pd.DataFrame(generate_ticket_rows(count, seed))
+    if path.lower().endswith('.csv'):
+        df.to_csv(path, index=False)
+    else:
+        df.to_excel(path, index=False)
+    return len(df)
@@ -0,0 +1,241 @@
+"""
+Ticket Aggregates for IT Ticket Analysis
+Running counters, time totals and bounded top-N sample tickets per type
+"""
+
+import gzip
+import heapq
+import json
+import math
+
+from ticket_cube import TicketCube, cube_statistics
+
+# generate_detail_panel shows the 10 most time-consuming tickets per type
+SAMPLES_PER_TYPE = 10
+SNAPSHOT_VERSION = 2
+
+def column_values(df, column, default=''):
+    """Return a column as a plain list, or the default repeated when the column is missing"""
+    return df[column].tolist() if column in df else [default] * len(df)
+
+def build_ticket_records(df, time_spent=None):
+    """Build the per-ticket detail records used by the report, keyed by row index"""
+    import pandas as pd
+
+    if time_spent is None:
+        time_spent = pd.to_numeric(df.get('Total Time Spent (Hours)', 0), errors='coerce')
+    if not isinstance(time_spent, pd.Series):
+        time_spent = [time_spent] * len(df)
+
+    records = {}
+    columns = zip(
+        df.index,
+        [str(v) for v in column_values(df, 'Category')],
+        df['detected_ticket_type'],
+        df['ticket_category'],
+        column_values(df, 'Subject'),
+        [str(v) for v in df['full_description']],
+        time_spent,
+        column_values(df, 'Assigned To'),
+        column_values(df, 'Status'),
+        column_values(df, 'Help Ticket Number'),
+        column_values(df, 'Created By')
+    )
+    for idx, category, matched_type, matched_category, subject, text, time_value, assigned_to, status, ticket_number, created_by in columns:
+        records[idx] = {
+            'category': category,
+            'detected_type': matched_type,
+            'type_category': matched_category,
+            'subject': subject,
+            'description': text,
+            'time_spent': time_value or 0,
+            'assigned_to': assigned_to,
+            'status': status,
+            'ticket_number': ticket_number,
+            'created_by': created_by
+        }
+
+    return records
+
+class TicketAggregate:
+    """An aggregation cube and top-N samples per type, folded in one classified chunk at a time
+
+    This doubles as the report's type index: category, count and the top tickets by
+    time for every type, without rescanning individual tickets. Counts and time
+    totals come from slices of the TicketCube. With samples_per_type=0 it keeps only
+    the cube, for callers that index the top tickets some other way.
+    """
+
+    def __init__(self, samples_per_type=SAMPLES_PER_TYPE):
+        self.samples_per_type = samples_per_type
+        self.total_tickets = 0
+        self.cube = TicketCube()
+        # type -> min-heap of (time, -sequence, sequence, record); the root is the first to evict
+        self.samples = {}
+        self.ticket_numbers = set()
+
+    @property
+    def total_time(self):
+        return self.cube.total_time
+
+    @property
+    def type_counts(self):
+        return self.cube.counts('type')
+
+    @property
+    def category_counts(self):
+        return self.cube.counts('category')
+
+    def add_frame(self, df):
+        """Fold a classified frame (detected_ticket_type, ticket_category, time_numeric) into the totals"""
+        import pandas as pd
+
+        if df.empty:
+            return
+
+        offset = self.total_tickets
+        self.total_tickets += len(df)
+        self.ticket_numbers.update(
+            ticket_number_key(value) for value in column_values(df, 'Help Ticket Number', None) if not is_missing(value)
+        )
+        # Cube codes follow first-seen order, so most_common() breaks ties like a single pass would
+        self.cube.add_frame(df)
+        if not self.samples_per_type:
+            return
+
+        # Only the chunk's own top-N per type can make it into the running samples; tickets
+        # without a readable time rank below zero-hour ones
+        raw_time = pd.to_numeric(df.get('Total Time Spent (Hours)', 0), errors='coerce')
+        rank = raw_time.fillna(-math.inf) if isinstance(raw_time, pd.Series) else df['time_numeric']
+        positioned = df.assign(_sequence=range(offset, offset + len(df)), _rank=rank)
+        candidates = (
+            positioned.sort_values('_rank', ascending=False, kind='stable')
+            .groupby('detected_ticket_type', sort=False)
+            .head(self.samples_per_type)
+        )
+        records = build_ticket_records(candidates)
+
+        for idx, time_value, sequence in zip(candidates.index, candidates['_rank'], candidates['_sequence']):
+            self.add_sample(records[idx], float(time_value), int(sequence))
+
+    def add_records(self, records, times, created_on=None):
+        """Fold in classified ticket records without pandas; the result matches add_frame on the same tickets
+
+        times holds each ticket's hours with blanks as 0, like the time_numeric column, and
+        created_on each ticket's Created On value (None when the export has no such column).
+        """
+        self.cube.add_values({
+            'type': [record['detected_type'] for record in records],
+            'category': [record['type_category'] for record in records],
+            'assignee': [record['assigned_to'] for record in records],
+            'status': [record['status'] for record in records],
+            'period': created_on
+        }, times)
+        for record in records:
+            sequence = self.total_tickets
+            self.total_tickets += 1
+            if not is_missing(record['ticket_number']) and record['ticket_number'] != '':
+                self.ticket_numbers.add(ticket_number_key(record['ticket_number']))
+            self.add_sample(record, time_rank(record['time_spent']), sequence)
+
+    def merge(self, other):
+        """Fold in another aggregate, as if its tickets had been added after this one's"""
+        offset = self.total_tickets
+        self.cube.merge(other.cube)
+        self.ticket_numbers.update(other.ticket_numbers)
+        for heap in other.samples.values():
+            for time_value, _, sequence, record in heap:
+                self.add_sample(record, time_value, offset + sequence)
+        self.total_tickets += other.total_tickets
+
+    def new_tickets(self, df):
+        """Return the rows whose Help Ticket Number is not already in the aggregate"""
+        if not self.ticket_numbers or 'Help Ticket Number' not in df:
+            return df
+        seen = [
+            not is_missing(value) and ticket_number_key(value) in self.ticket_numbers
+            for value in df['Help Ticket Number']
+        ]
+        return df[[not s for s in seen]]
+
+    def add_sample(self, record, time_value, sequence):
+        """Offer one ticket record to its type's bounded sample heap"""
+        if not self.samples_per_type:
+            return
+        heap = self.samples.setdefault(record['detected_type'], [])
+        entry = (time_value, -sequence, sequence, record)
+        if len(heap) < self.samples_per_type:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+
+    def top_tickets(self, ticket_type):
+        """Return a type's retained sample records, most time-consuming first"""
+        heap = self.samples.get(ticket_type, [])
+        return [record for _, _, _, record in sorted(heap, key=lambda entry: entry[:2], reverse=True)]
+
+    def type_category(self, ticket_type, default='General IT Support'):
+        """Return the category of a type (every counted type keeps at least one sample)"""
+        heap = self.samples.get(ticket_type)
+        return heap[0][3]['type_category'] if heap else default
+
+    def to_statistics(self):
+        """Return the same statistics dict generate_statistics builds from a full frame"""
+        return cube_statistics(self.cube)
+
+def is_missing(value):
+    """True for empty cells (None or NaN)"""
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+def time_rank(value):
+    """Sort key for a ticket's hours: a blank or unparsable time (NaN) ranks below every real one"""
+    return -math.inf if value != value else value
+
+def ticket_number_key(value):
+    """Normalize a ticket number so 123, 123.0 and '123' compare equal"""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+def json_value(value):
+    """Convert numpy scalars and timestamps in ticket records to JSON-friendly values"""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+def save_snapshot(aggregate, path, fingerprint):
+    """Write the aggregate state to a gzipped JSON snapshot"""
+    state = {
+        'version': SNAPSHOT_VERSION,
+        'fingerprint': fingerprint,
+        'samples_per_type': aggregate.samples_per_type,
+        'total_tickets': aggregate.total_tickets,
+        'cube': aggregate.cube.to_state(),
+        'samples': {
+            ticket_type: [[time_value, sequence, record] for time_value, _, sequence, record in heap]
+            for ticket_type, heap in aggregate.samples.items()
+        },
+        'ticket_numbers': sorted(aggregate.ticket_numbers)
+    }
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        json.dump(state, f, default=json_value, separators=(',', ':'))
+
+def load_snapshot(path):
+    """Read a snapshot; returns (aggregate, fingerprint)"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        state = json.load(f)
+
+    if state.get('version') != SNAPSHOT_VERSION:
+        raise ValueError(f"unsupported snapshot version {state.get('version')} in {path}")
+
+    aggregate = TicketAggregate(state['samples_per_type'])
+    aggregate.total_tickets = state['total_tickets']
+    aggregate.cube = TicketCube.from_state(state['cube'])
+    aggregate.ticket_numbers = set(state['ticket_numbers'])
+
+    for ticket_type, entries in state['samples'].items():
+        heap = [(time_value, -sequence, sequence, record) for time_value, sequence, record in entries]
+        heapq.heapify(heap)
+        aggregate.samples[ticket_type] = heap
+
+    return aggregate, state['fingerprint']
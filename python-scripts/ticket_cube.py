@@ -0,0 +1,343 @@
+"""
+Ticket Aggregation Cube for IT Ticket Analysis
+Ticket counts and time per (type × category × assignee × status × month), built in one pass and sliced on demand
+"""
+
+import math
+import re
+import sys
+from collections import Counter
+from datetime import date
+
+# Cube dimensions and the classified-frame columns they come from
+DIMENSION_COLUMNS = {
+    'type': 'detected_ticket_type',
+    'category': 'ticket_category',
+    'assignee': 'Assigned To',
+    'status': 'Status',
+    'period': 'Created On'
+}
+DIMENSIONS = list(DIMENSION_COLUMNS)
+PERCENTILES = {'p50_time': 0.5, 'p90_time': 0.9}
+BLANK_VALUE = '(blank)'
+UNKNOWN_PERIOD = 'Unknown'
+
+# Created On text as read from a .csv export: 2025-03-14 09:30:00 or 3/14/2025 9:30 AM
+ISO_DATE = re.compile(r'\s*(\d{4})-(\d{1,2})-\d{1,2}')
+US_DATE = re.compile(r'\s*(\d{1,2})/\d{1,2}/(\d{4})')
+
+class TicketCube:
+    """Ticket counts per (type, category, assignee, status, period) cell and per hours value
+
+    Each dimension value gets an integer code in first-seen order, and the cube keeps a
+    histogram of hours per cell: {(type, category, assignee, status, period codes, hours):
+    tickets}. Counts, totals, means and exact percentiles of any slice come from that
+    histogram, so slicing never goes back to the tickets, and chunks fold in one at a time.
+    """
+
+    def __init__(self):
+        self.labels = {dimension: [] for dimension in DIMENSIONS}
+        self.codes = {dimension: {} for dimension in DIMENSIONS}
+        self.cells = Counter()
+        self.total_tickets = 0
+        self._arrays = None
+        self._total_time = None
+
+    def encode(self, dimension, value):
+        """Return the code of a dimension value, adding it on first sight"""
+        codes = self.codes[dimension]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+            self.labels[dimension].append(value)
+        return code
+
+    def add_frame(self, df):
+        """Fold a classified frame (detected_ticket_type, ticket_category, time_numeric) into the cube"""
+        import pandas as pd
+
+        from ticket_aggregate import column_values
+
+        if df.empty:
+            return
+
+        cells = {}
+        for dimension, column in DIMENSION_COLUMNS.items():
+            local_codes, uniques = pd.factorize(pd.Series(column_values(df, column, None), dtype=object),
+                                                use_na_sentinel=False)
+            # Map the chunk's own codes onto the cube's, in first-seen order
+            mapping = [self.encode(dimension, dimension_value(dimension, value)) for value in uniques]
+            cells[dimension] = pd.Series(mapping, dtype='int64').to_numpy()[local_codes]
+        cells['time'] = df['time_numeric'].to_numpy(dtype='float64')
+
+        grouped = pd.DataFrame(cells).groupby(DIMENSIONS + ['time'], sort=False).size().reset_index(name='tickets')
+        keys = zip(*(grouped[column].tolist() for column in DIMENSIONS + ['time']))
+        self.cells.update(dict(zip(keys, grouped['tickets'].tolist())))
+        self.total_tickets += len(df)
+        self._arrays = self._total_time = None
+
+    def add_values(self, columns, times):
+        """Fold in plain value lists ({dimension: raw values}) without pandas; matches add_frame
+
+        times holds each ticket's hours with blanks as 0, like the time_numeric column.
+        """
+        codes = []
+        for dimension in DIMENSIONS:
+            seen = {}
+            values = columns.get(dimension) or [None] * len(times)
+            codes.append([
+                seen[value] if value in seen else seen.setdefault(value, self.encode(dimension, dimension_value(dimension, value)))
+                for value in values
+            ])
+
+        self.cells.update(zip(*codes, times))
+        self.total_tickets += len(times)
+        self._arrays = self._total_time = None
+
+    def merge(self, other):
+        """Fold in another cube, as if its tickets had been added after this cube's"""
+        # Re-code the other cube's values; values new here keep its first-seen order
+        mappings = [[self.encode(dimension, value) for value in other.labels[dimension]] for dimension in DIMENSIONS]
+        for key, tickets in other.cells.items():
+            self.cells[tuple(mapping[code] for mapping, code in zip(mappings, key)) + key[-1:]] += tickets
+        self.total_tickets += other.total_tickets
+        self._arrays = self._total_time = None
+
+    @property
+    def total_time(self):
+        """Hours over every ticket, summed exactly from the histogram
+
+        Running float sums depend on the order and chunking of the tickets, so the pandas,
+        --stream and --fast-csv paths would disagree in the last digits; fsum over the cells
+        gives every path the same total.
+        """
+        if self._total_time is None:
+            self._total_time = math.fsum(key[-1] * tickets for key, tickets in self.cells.items())
+        return self._total_time
+
+    def arrays(self):
+        """Return the histogram as (codes int64 [cells × dimensions], hours float64, tickets int64) arrays"""
+        import numpy as np
+
+        if self._arrays is None:
+            keys = list(self.cells)
+            codes = np.array([key[:-1] for key in keys], dtype=np.int64).reshape(len(keys), len(DIMENSIONS))
+            times = np.array([key[-1] for key in keys], dtype=np.float64)
+            tickets = np.array(list(self.cells.values()), dtype=np.int64)
+            self._arrays = (codes, times, tickets)
+        return self._arrays
+
+    def counts(self, dimension):
+        """Tickets per value of one dimension as a Counter, in first-seen order"""
+        import numpy as np
+
+        codes, _, tickets = self.arrays()
+        labels = self.labels[dimension]
+        totals = np.bincount(codes[:, DIMENSIONS.index(dimension)], weights=tickets, minlength=len(labels))
+        return Counter(dict(zip(labels, totals.astype(np.int64).tolist())))
+
+    def rollup(self, dimensions=(), where=None):
+        """Collapse the cube onto some dimensions, keeping only cells whose values match where
+
+        Returns {key: metrics} in first-seen order, where key is a value for one dimension,
+        a tuple of values for several, and None for none. Metrics are count, total_time,
+        mean_time and the p50_time/p90_time percentiles (linear interpolation, as numpy
+        and pandas compute them).
+        """
+        import numpy as np
+
+        dimensions = [dimensions] if isinstance(dimensions, str) else list(dimensions)
+        codes, times, tickets = self.arrays()
+
+        for dimension, value in (where or {}).items():
+            code = self.codes[dimension].get(value, -1)
+            keep = codes[:, DIMENSIONS.index(dimension)] == code
+            codes, times, tickets = codes[keep], times[keep], tickets[keep]
+        if not len(tickets):
+            return {}
+
+        positions = [DIMENSIONS.index(dimension) for dimension in dimensions]
+        radices = [len(self.labels[dimension]) for dimension in dimensions]
+        if not positions:
+            groups = np.zeros((1, 0), dtype=np.int64)
+            inverse = np.zeros(len(tickets), dtype=np.intp)
+        elif math.prod(radices) < 2 ** 62:
+            # One mixed-radix key per cell sorts exactly like the code tuples and is much faster to unique
+            combined = np.zeros(len(tickets), dtype=np.int64)
+            for position, radix in zip(positions, radices):
+                combined = combined * radix + codes[:, position]
+            keys, inverse = np.unique(combined, return_inverse=True)
+            groups = np.empty((len(keys), len(positions)), dtype=np.int64)
+            for column in range(len(positions) - 1, -1, -1):
+                keys, groups[:, column] = np.divmod(keys, radices[column])
+        else:
+            groups, inverse = np.unique(codes[:, positions], axis=0, return_inverse=True)
+            inverse = inverse.reshape(-1)
+
+        count = np.bincount(inverse, weights=tickets, minlength=len(groups)).astype(np.int64)
+        total = np.bincount(inverse, weights=tickets * times, minlength=len(groups))
+        percentiles = {name: weighted_percentile(inverse, times, tickets, count, q) for name, q in PERCENTILES.items()}
+
+        rollup = {}
+        for group, group_codes in enumerate(groups.tolist()):
+            values = tuple(self.labels[dimension][code] for dimension, code in zip(dimensions, group_codes))
+            key = values[0] if len(values) == 1 else (values or None)
+            metrics = {
+                'count': int(count[group]),
+                'total_time': float(total[group]),
+                'mean_time': float(total[group] / count[group])
+            }
+            metrics.update((name, float(values_by_group[group])) for name, values_by_group in percentiles.items())
+            rollup[key] = metrics
+        return rollup
+
+    def to_state(self):
+        """Return the cube as JSON-friendly data for a snapshot"""
+        return {
+            'labels': self.labels,
+            'total_tickets': self.total_tickets,
+            'total_time': self.total_time,
+            'cells': [[*key, tickets] for key, tickets in self.cells.items()]
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a cube saved with to_state"""
+        cube = cls()
+        for dimension in DIMENSIONS:
+            for value in state['labels'][dimension]:
+                cube.encode(dimension, value)
+        cube.total_tickets = state['total_tickets']
+        cube.cells = Counter({tuple(entry[:-1]): entry[-1] for entry in state['cells']})
+        return cube
+
+def weighted_percentile(groups, values, weights, counts, q):
+    """Per-group percentile of values repeated weights times, by linear interpolation between ranks"""
+    import numpy as np
+
+    order = np.lexsort((values, groups))
+    sorted_values = values[order]
+    # Tickets up to and including each entry; groups are contiguous after the sort
+    cumulative = np.cumsum(weights[order])
+    starts = np.cumsum(counts) - counts
+
+    rank = (counts - 1) * q
+    lower = np.floor(rank).astype(np.int64)
+    upper = np.minimum(lower + 1, counts - 1)
+    lower_values = sorted_values[np.searchsorted(cumulative, starts + lower, side='right')]
+    upper_values = sorted_values[np.searchsorted(cumulative, starts + upper, side='right')]
+    return lower_values + (upper_values - lower_values) * (rank - lower)
+
+def dimension_value(dimension, value):
+    """Normalize one raw column value into its cube dimension value"""
+    if dimension == 'period':
+        return ticket_period(value)
+    if value is None or (isinstance(value, float) and value != value):
+        return BLANK_VALUE
+    return str(value)
+
+def ticket_period(value):
+    """Return the 'YYYY-MM' month of a Created On value, or UNKNOWN_PERIOD"""
+    month = None
+    if isinstance(value, date):
+        # NaT is a datetime whose fields are NaN, and it is the only one not equal to itself
+        if value == value:
+            year, month = value.year, value.month
+    elif isinstance(value, str):
+        match = ISO_DATE.match(value)
+        if match:
+            year, month = int(match.group(1)), int(match.group(2))
+        else:
+            match = US_DATE.match(value)
+            if match:
+                year, month = int(match.group(2)), int(match.group(1))
+    if month is None or not 1 <= month <= 12:
+        return UNKNOWN_PERIOD
+    return f"{year:04d}-{month:02d}"
+
+def cube_statistics(cube):
+    """Return the analysis statistics dict as slices of the cube; the cube itself is included"""
+    type_counts = cube.counts('type')
+    specific_types = [t for t in type_counts.keys() if t.startswith('🎯')]
+
+    return {
+        'total_tickets': cube.total_tickets,
+        'total_time': cube.total_time,
+        'average_time': cube.total_time / cube.total_tickets if cube.total_tickets > 0 else 0,
+        'unique_types': len(type_counts),
+        'specific_patterns': len(specific_types),
+        'type_counts': type_counts,
+        'category_counts': cube.counts('category'),
+        'automation_candidates': sum(type_counts[t] for t in specific_types),
+        'cube': cube
+    }
+
+def check_cube(count, chunk_size=None, seed=42):
+    """Build the cube from a synthetic classified export and compare its slices with pandas groupby"""
+    import time
+
+    import numpy as np
+    import pandas as pd
+
+    from comprehensive_analysis import add_full_description, classify_tickets_batch
+    from synthetic_tickets import generate_ticket_rows
+
+    df = add_full_description(pd.DataFrame(generate_ticket_rows(count, seed)))
+    df, _ = classify_tickets_batch(df, detailed=False)
+    chunk_size = chunk_size or max(count // 3, 1)
+
+    start = time.perf_counter()
+    cube = TicketCube()
+    for offset in range(0, len(df), chunk_size):
+        cube.add_frame(df.iloc[offset:offset + chunk_size])
+    build_seconds = time.perf_counter() - start
+
+    plain = TicketCube()
+    plain.add_values({dimension: column.tolist() for dimension, column in
+                      [(d, df[c] if c in df else pd.Series([None] * len(df))) for d, c in DIMENSION_COLUMNS.items()]},
+                     df['time_numeric'].tolist())
+
+    keyed = pd.DataFrame({dimension: [dimension_value(dimension, value) for value in df[column]]
+                          for dimension, column in DIMENSION_COLUMNS.items()})
+    keyed['time'] = df['time_numeric'].to_numpy()
+
+    mismatches = 0
+    slices = [[dimension] for dimension in DIMENSIONS] + [['assignee', 'period'], ['type', 'status']]
+    start = time.perf_counter()
+    rollups = [cube.rollup(dimensions) for dimensions in slices]
+    slice_seconds = time.perf_counter() - start
+
+    for dimensions, rollup in zip(slices, rollups):
+        grouped = keyed.groupby(dimensions, sort=False)['time']
+        expected = pd.DataFrame({
+            'count': grouped.size(), 'total_time': grouped.sum(), 'mean_time': grouped.mean(),
+            'p50_time': grouped.quantile(0.5), 'p90_time': grouped.quantile(0.9)
+        })
+        # One dimension keeps first-seen order, like groupby(sort=False); several are ordered code by code
+        if len(dimensions) == 1 and list(rollup) != list(expected.index):
+            mismatches += 1
+        for built in (rollup, plain.rollup(dimensions)):
+            if sorted(built, key=str) != sorted(expected.index, key=str):
+                mismatches += 1
+                continue
+            for key, metrics in built.items():
+                row = expected.loc[key]
+                if not all(np.isclose(metrics[name], row[name]) for name in metrics):
+                    mismatches += 1
+    if cube.counts('type') != Counter(df['detected_ticket_type']):
+        mismatches += 1
+    # Chunked frames and plain values must agree on total hours to the last digit
+    if cube.total_time != plain.total_time or not np.isclose(cube.total_time, df['time_numeric'].sum()):
+        mismatches += 1
+
+    print(f"📊 {count:,} tickets → {len(cube.cells):,} cube entries")
+    print(f"   • built in {build_seconds:.3f}s ({-(-count // chunk_size)} chunks), {len(slices)} slices in {slice_seconds:.3f}s")
+    if mismatches:
+        print(f"❌ {mismatches:,} slices differ from pandas groupby")
+        return False
+    print("✅ Every slice matches pandas groupby (count, total, mean, p50, p90)")
+    return True
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    sys.exit(0 if check_cube(count) else 1)
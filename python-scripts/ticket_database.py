@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Ticket Database for IT Ticket Analysis
+Stores classified tickets in SQLite (--db) with an FTS5 index on subject and description and
+B-tree indexes on the drill-down columns, and queries it from the command line
+"""
+
+import functools
+import json
+import os
+import sqlite3
+import sys
+import time
+from urllib.parse import quote
+
+from ticket_aggregate import column_values, is_missing, ticket_number_key
+from ticket_cube import BLANK_VALUE, ticket_period
+
+DATABASE_VERSION = 1
+# SQLite's default limit on bound parameters is 999
+LOOKUP_BATCH_SIZE = 900
+DEFAULT_LIMIT = 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tickets (
+    id INTEGER PRIMARY KEY,
+    ticket_number TEXT,
+    detected_type TEXT NOT NULL,
+    ticket_category TEXT NOT NULL,
+    category TEXT,
+    assigned_to TEXT,
+    status TEXT,
+    created_by TEXT,
+    created_on TEXT,
+    period TEXT NOT NULL,
+    time_spent REAL NOT NULL,
+    subject TEXT,
+    description TEXT
+);
+CREATE INDEX IF NOT EXISTS tickets_ticket_number ON tickets (ticket_number);
+CREATE INDEX IF NOT EXISTS tickets_detected_type ON tickets (detected_type);
+CREATE INDEX IF NOT EXISTS tickets_ticket_category ON tickets (ticket_category);
+CREATE INDEX IF NOT EXISTS tickets_assigned_to ON tickets (assigned_to);
+CREATE INDEX IF NOT EXISTS tickets_status ON tickets (status);
+CREATE INDEX IF NOT EXISTS tickets_period ON tickets (period);
+CREATE VIRTUAL TABLE IF NOT EXISTS tickets_fts USING fts5(
+    subject, description, content='tickets', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+# Stored columns in insert order; ticket_row builds values in the same order
+TICKET_COLUMNS = ('ticket_number', 'detected_type', 'ticket_category', 'category', 'assigned_to', 'status',
+                  'created_by', 'created_on', 'period', 'time_spent', 'subject', 'description')
+
+# Export columns kept as text, by their position in ticket_row
+EXPORT_COLUMNS = ['Category', 'Assigned To', 'Status', 'Created By', 'Created On', 'Subject',
+                  'Description, Description Additional Details, Additional Notes']
+
+# Indexes that a load into an empty database builds once at the end instead of row by row
+DEFERRED_INDEXES = ['tickets_detected_type', 'tickets_ticket_category', 'tickets_assigned_to', 'tickets_status',
+                    'tickets_period']
+
+# Query filter and --group-by names -> indexed column
+FILTER_COLUMNS = {
+    'type': 'detected_type',
+    'category': 'ticket_category',
+    'assignee': 'assigned_to',
+    'status': 'status',
+    'month': 'period'
+}
+
+SORT_ORDERS = {
+    'time': 't.time_spent DESC, t.id',
+    'newest': 't.id DESC',
+    'rank': 'f.rank'
+}
+
+def text_value(value):
+    """A stored text value: None for empty cells, otherwise the value as text"""
+    if is_missing(value) or value == '':
+        return None
+    return value if isinstance(value, str) else str(value)
+
+# Created On values repeat across tickets, so each is parsed once
+row_period = functools.lru_cache(maxsize=4096)(ticket_period)
+
+def ticket_row(ticket_number, detected_type, ticket_category, category, assigned_to, status, created_by,
+               created_on, time_spent, subject, description):
+    """Build one stored row from export values; time_spent is hours with blanks as 0"""
+    number = None if is_missing(ticket_number) or ticket_number == '' else ticket_number_key(ticket_number)
+    return (number, detected_type, ticket_category, text_value(category), text_value(assigned_to),
+            text_value(status), text_value(created_by), text_value(created_on), row_period(created_on),
+            float(time_spent), text_value(subject), text_value(description))
+
+class TicketDatabase:
+    """SQLite store of classified tickets with full-text search over subject and description"""
+
+    def __init__(self, path, fingerprint=None, read_only=False):
+        self.path = path
+        self.added = 0
+        self.replaced = 0
+        self.deferred_indexes = False
+        self.read_only = read_only
+        if read_only:
+            # Queries never create, migrate or write the file; quoting keeps '?' or '#' in a path literal
+            self.connection = sqlite3.connect(f"file:{quote(path)}?mode=ro", uri=True)
+        else:
+            self.connection = sqlite3.connect(path)
+            self.connection.execute("PRAGMA journal_mode = WAL")
+            self.connection.execute("PRAGMA synchronous = NORMAL")
+            self.connection.executescript(SCHEMA)
+
+        meta = dict(self.connection.execute("SELECT key, value FROM meta"))
+        if meta.get('version', str(DATABASE_VERSION)) != str(DATABASE_VERSION):
+            raise ValueError(f"{path} is a version {meta['version']} ticket database; this version reads {DATABASE_VERSION}")
+        if read_only:
+            return
+
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (str(DATABASE_VERSION),))
+            if fingerprint is not None and meta.get('fingerprint') != fingerprint:
+                # Labels from an older pattern set would be mixed with new ones, so start over
+                stale = self.total()
+                if stale:
+                    self.connection.execute("DELETE FROM tickets")
+                    self.connection.execute("INSERT INTO tickets_fts (tickets_fts) VALUES ('delete-all')")
+                    print(f"🗑️ Cleared {stale:,} tickets labelled with different patterns from {path}")
+                self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('fingerprint', ?)", (fingerprint,))
+
+            # Sorting once after a full load is much faster than updating the indexes per row; the
+            # ticket number index stays, since replacing tickets looks them up during the load
+            if fingerprint is not None and not self.total():
+                for index in DEFERRED_INDEXES:
+                    self.connection.execute(f"DROP INDEX IF EXISTS {index}")
+                self.deferred_indexes = True
+
+    def close(self):
+        """Build any deferred indexes and close the underlying database"""
+        if self.deferred_indexes:
+            self.connection.executescript(SCHEMA)
+            self.deferred_indexes = False
+        if not self.read_only:
+            # Back to a single self-contained file, so read-only queries need no -wal/-shm files
+            self.connection.execute("PRAGMA journal_mode = DELETE")
+        self.connection.close()
+
+    def total(self):
+        """Number of stored tickets"""
+        return self.connection.execute("SELECT count(*) FROM tickets").fetchone()[0]
+
+    def add_rows(self, rows):
+        """Store ticket_row tuples; a ticket number already stored is replaced by the new ticket"""
+        rows = list(rows)
+        if not rows:
+            return
+
+        numbers = list({row[0] for row in rows if row[0] is not None})
+        with self.connection:
+            for start in range(0, len(numbers), LOOKUP_BATCH_SIZE):
+                batch = numbers[start:start + LOOKUP_BATCH_SIZE]
+                replaced = self.connection.execute(
+                    f"SELECT id, subject, description FROM tickets WHERE ticket_number IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+                if replaced:
+                    # An external-content FTS index needs the old text to remove a row
+                    self.connection.executemany(
+                        "INSERT INTO tickets_fts (tickets_fts, rowid, subject, description) VALUES ('delete', ?, ?, ?)",
+                        replaced
+                    )
+                    self.connection.executemany("DELETE FROM tickets WHERE id = ?", [(row[0],) for row in replaced])
+                    self.replaced += len(replaced)
+
+            last_id = self.connection.execute("SELECT coalesce(max(id), 0) FROM tickets").fetchone()[0]
+            self.connection.executemany(
+                f"INSERT INTO tickets ({', '.join(TICKET_COLUMNS)}) VALUES ({', '.join('?' * len(TICKET_COLUMNS))})",
+                rows
+            )
+            self.connection.execute(
+                "INSERT INTO tickets_fts (rowid, subject, description) SELECT id, subject, description FROM tickets WHERE id > ?",
+                (last_id,)
+            )
+        self.added += len(rows)
+
+    def add_frame(self, df):
+        """Store a classified frame (detected_ticket_type, ticket_category, time_numeric)"""
+        exported = [column_values(df, column, None) for column in EXPORT_COLUMNS]
+        category, assigned_to, status, created_by, created_on, subject, description = exported
+        self.add_rows(
+            ticket_row(*values) for values in zip(
+                column_values(df, 'Help Ticket Number', None), df['detected_ticket_type'], df['ticket_category'],
+                category, assigned_to, status, created_by, created_on, df['time_numeric'], subject, description
+            )
+        )
+
+    def distinct_values(self, column):
+        """Distinct non-empty values of an indexed column, in order"""
+        # Each step is one index seek, so this is fast however many tickets share a value
+        values = []
+        value = self.connection.execute(f"SELECT min({column}) FROM tickets").fetchone()[0]
+        while value is not None:
+            values.append(value)
+            value = self.connection.execute(f"SELECT min({column}) FROM tickets WHERE {column} > ?", (value,)).fetchone()[0]
+        return values
+
+    def matching_values(self, name, text):
+        """Values of a filter column equal to text (ignoring case), or else containing it"""
+        values = self.distinct_values(FILTER_COLUMNS[name])
+        exact = [value for value in values if value.lower() == text.lower()]
+        return exact or [value for value in values if text.lower() in value.lower()]
+
+    def where_clause(self, filters, search=None):
+        """SQL FROM/WHERE for resolved filters {name: [values]} and an FTS5 query; returns (sql, params)"""
+        conditions = []
+        params = []
+        if search:
+            # CROSS JOIN keeps the full-text match as the outer loop; otherwise SQLite may walk a
+            # filter index and probe the FTS index once per row
+            sql = "FROM tickets_fts f CROSS JOIN tickets t ON t.id = f.rowid"
+            conditions.append("tickets_fts MATCH ?")
+            params.append(search)
+        else:
+            sql = "FROM tickets t"
+
+        for name, values in filters.items():
+            conditions.append(f"t.{FILTER_COLUMNS[name]} IN ({','.join('?' * len(values))})")
+            params.extend(values)
+
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        return sql, params
+
+    def count(self, filters, search=None):
+        """Number of matching tickets"""
+        sql, params = self.where_clause(filters, search)
+        return self.connection.execute(f"SELECT count(*) {sql}", params).fetchone()[0]
+
+    def tickets(self, filters, search=None, sort=None, limit=DEFAULT_LIMIT):
+        """Matching tickets as dicts; with a search, each has a snippet of the matched description"""
+        sql, params = self.where_clause(filters, search)
+        sort = sort or ('rank' if search else 'time')
+        if sort == 'rank' and not search:
+            raise ValueError("--sort rank needs --search")
+
+        columns = ', '.join(f"t.{column}" for column in TICKET_COLUMNS)
+        if search:
+            columns += ", snippet(tickets_fts, 1, '[', ']', '…', 12)"
+        query = f"SELECT {columns} {sql} ORDER BY {SORT_ORDERS[sort]}"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+
+        results = []
+        for row in self.connection.execute(query, params):
+            ticket = dict(zip(TICKET_COLUMNS, row))
+            if search:
+                ticket['snippet'] = row[-1]
+            results.append(ticket)
+        return results
+
+    def group(self, name, filters, search=None):
+        """(value, tickets, hours) per value of a filter column, most hours first; empty cells group as BLANK_VALUE"""
+        sql, params = self.where_clause(filters, search)
+        column = f"coalesce(t.{FILTER_COLUMNS[name]}, ?)"
+        return self.connection.execute(
+            f"SELECT {column} AS value, count(*), sum(t.time_spent) {sql} GROUP BY value ORDER BY 3 DESC, 2 DESC, 1",
+            [BLANK_VALUE] + list(params)
+        ).fetchall()
+
+def print_tickets(tickets):
+    """Print tickets as a table, with search snippets underneath"""
+    for ticket in tickets:
+        number = f"#{ticket['ticket_number']}" if ticket['ticket_number'] else '#-'
+        subject = (ticket['subject'] or '')[:60]
+        print(f"   {number:<10} | {ticket['time_spent']:>6.1f}h | {ticket['detected_type'][:36]:<36} | "
+              f"{(ticket['assigned_to'] or '-')[:18]:<18} | {(ticket['status'] or '-')[:12]:<12} | {subject}")
+        if ticket.get('snippet'):
+            print(f"   {'':<10}   {ticket['snippet']}")
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Query tickets stored by comprehensive_analysis.py --db",
+        epilog="Example: python ticket_database.py tickets.db --type vpn --search mac --assignee 'Jane Doe'"
+    )
+    parser.add_argument('database', help="SQLite file written with --db")
+    parser.add_argument('--type', help="detected ticket type (exact, or any type containing the text)")
+    parser.add_argument('--category', help="type category, e.g. 'Infrastructure & Network'")
+    parser.add_argument('--assignee', help="Assigned To value")
+    parser.add_argument('--status', help="Status value")
+    parser.add_argument('--month', help="Created On month as YYYY-MM")
+    parser.add_argument('--search', metavar='QUERY',
+                        help="full-text query over subject and description (FTS5 syntax: words, \"phrases\", prefix*, OR, NOT)")
+    parser.add_argument('--group-by', choices=sorted(FILTER_COLUMNS),
+                        help="print tickets and hours per value instead of listing tickets")
+    parser.add_argument('--count', action='store_true', help="only print the number of matching tickets")
+    parser.add_argument('--sort', choices=sorted(SORT_ORDERS),
+                        help="list order (default: rank with --search, otherwise time)")
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT,
+                        help=f"tickets to list, 0 for all (default: {DEFAULT_LIMIT})")
+    parser.add_argument('--json', action='store_true', help="print matching tickets as JSON lines")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    if not os.path.isfile(args.database):
+        print(f"❌ No ticket database at {args.database} (create one with comprehensive_analysis.py --db)")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    try:
+        database = TicketDatabase(args.database, read_only=True)
+    except (sqlite3.DatabaseError, ValueError) as e:
+        print(f"❌ Cannot read {args.database} as a ticket database: {e}")
+        sys.exit(1)
+
+    filters = {}
+    for name in FILTER_COLUMNS:
+        text = getattr(args, name)
+        if text is None:
+            continue
+        values = database.matching_values(name, text)
+        if not values:
+            print(f"⚠️ No stored {name} matches '{text}'")
+            sys.exit(1)
+        filters[name] = values
+
+    try:
+        if args.group_by:
+            groups = database.group(args.group_by, filters, args.search)
+        else:
+            total = database.count(filters, args.search)
+            tickets = [] if args.count else database.tickets(filters, args.search, args.sort, args.limit)
+    except (sqlite3.OperationalError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if args.json:
+        rows = ([{args.group_by: value, 'tickets': count, 'hours': hours} for value, count, hours in groups]
+                if args.group_by else tickets)
+        for row in rows:
+            print(json.dumps(row, ensure_ascii=False))
+    elif args.group_by:
+        print(f"📊 Tickets by {args.group_by} ({elapsed_ms:.1f} ms):")
+        for value, count, hours in groups:
+            print(f"   {str(value)[:40]:<40} | {count:>8,} tickets | {hours:>10.1f} hours")
+    else:
+        for name, values in filters.items():
+            if len(values) > 1 or values[0].lower() != getattr(args, name).lower():
+                print(f"   • {name}: {', '.join(values[:5])}{' …' if len(values) > 5 else ''}")
+        print(f"🔎 {total:,} matching tickets ({elapsed_ms:.1f} ms)")
+        print_tickets(tickets)
+        if len(tickets) < total and not args.count:
+            print(f"   … {total - len(tickets):,} more (use --limit 0 to list all)")
+
+    database.close()
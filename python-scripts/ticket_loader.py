@@ -0,0 +1,225 @@
+"""
+Ticket Export Loader
+Reads ticket exports whole, in bounded chunks, or from a columnar cache of a previous parse
+"""
+
+import os
+import re
+
+# The only columns the analyzer reads; everything else in the export is dropped from the cache
+ANALYZER_COLUMNS = [
+    'Description, Description Additional Details, Additional Notes',
+    'Subject',
+    'Category',
+    'Total Time Spent (Hours)',
+    'Status',
+    'Assigned To',
+    'Help Ticket Number',
+    'Created By',
+    'Created On'
+]
+COLUMNAR_CACHE_VERSION = '2'
+
+# read_csv's default missing-value markers and number syntax, for the pandas-free reader
+CSV_NA_VALUES = {
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+}
+CSV_TRUE_VALUES = {'True', 'TRUE', 'true'}
+CSV_FALSE_VALUES = {'False', 'FALSE', 'false'}
+INTEGER_TEXT = re.compile(r'[+-]?[0-9]+')
+FLOAT_TEXT = re.compile(r'[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?')
+
+def read_export(file_path):
+    """Read a whole .xlsx/.xls or .csv export into a DataFrame"""
+    import pandas as pd
+    
+    if os.path.splitext(file_path)[1].lower() == '.csv':
+        return pd.read_csv(file_path)
+    return pd.read_excel(file_path)
+
+def usable_cache_dir(cache_dir):
+    """Return cache_dir if the columnar cache can be used here, otherwise None after saying why"""
+    import importlib.util
+
+    if cache_dir is not None and importlib.util.find_spec('pyarrow') is None:
+        print("⚠️ --columnar-cache needs pyarrow (pip install pyarrow); reading exports without the cache")
+        return None
+    return cache_dir
+
+def load_tickets(file_path, cache_dir=None):
+    """Load an export, reusing a columnar Arrow cache when the source file is unchanged"""
+    if cache_dir is None:
+        return read_export(file_path)
+
+    try:
+        import pyarrow as pa
+    except ImportError:
+        print("⚠️ pyarrow is not installed; reading the export without the columnar cache")
+        return read_export(file_path)
+
+    cache_path = columnar_cache_path(file_path, cache_dir)
+    source_key = columnar_source_key(file_path)
+
+    if os.path.exists(cache_path):
+        df = read_columnar_cache(pa, cache_path, source_key)
+        if df is not None:
+            print(f"⚡ Using columnar cache {cache_path}")
+            return df
+
+    df = read_export(file_path)
+    write_columnar_cache(pa, df, cache_path, source_key)
+    return df
+
+def columnar_cache_path(file_path, cache_dir):
+    """Cache file for an export: one per source path, next to the other cached exports"""
+    name = os.path.basename(os.path.abspath(file_path))
+    return os.path.join(cache_dir, f"{name}.arrow")
+
+def columnar_source_key(file_path):
+    """Identify the exact source file contents by modification time and size"""
+    stat = os.stat(file_path)
+    return f"{COLUMNAR_CACHE_VERSION}:{stat.st_mtime_ns}:{stat.st_size}:{os.path.abspath(file_path)}"
+
+def read_columnar_cache(pa, cache_path, source_key):
+    """Memory-map a cache file; returns None if it was built from a different source file"""
+    import numpy as np
+
+    with pa.memory_map(cache_path) as source:
+        table = pa.ipc.open_file(source).read_all()
+        metadata = table.schema.metadata or {}
+        if metadata.get(b'source_key', b'').decode('utf-8') != source_key:
+            return None
+        df = table.to_pandas()
+
+    # Arrow nulls come back as None in object columns; the analyzer expects NaN like read_excel
+    for column in df.columns:
+        if df[column].dtype == object:
+            df[column] = df[column].where(df[column].notna(), np.nan)
+    return df
+
+def write_columnar_cache(pa, df, cache_path, source_key):
+    """Write the analyzer's columns to an uncompressed Arrow IPC file so it can be memory-mapped"""
+    import pandas as pd
+
+    arrays = {}
+    for column in ANALYZER_COLUMNS:
+        if column not in df:
+            continue
+        try:
+            arrays[column] = pa.array(df[column], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Mixed-type columns (e.g. numbers and 'n/a') are stored as text
+            arrays[column] = pa.array(
+                [None if pd.isna(value) else str(value) for value in df[column]], type=pa.string()
+            )
+
+    table = pa.table(arrays).replace_schema_metadata({'source_key': source_key})
+    os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+
+    temporary_path = cache_path + '.tmp'
+    with pa.OSFile(temporary_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(temporary_path, cache_path)
+
+def iter_ticket_chunks(file_path, chunk_size, cache_dir=None):
+    """Yield the export as DataFrames of at most chunk_size rows (one frame if chunk_size is None)"""
+    import pandas as pd
+
+    extension = os.path.splitext(file_path)[1].lower()
+
+    if chunk_size is None:
+        yield load_tickets(file_path, cache_dir)
+    elif extension == '.csv':
+        yield from pd.read_csv(file_path, chunksize=chunk_size)
+    elif extension in ('.xlsx', '.xlsm'):
+        yield from iter_excel_chunks(file_path, chunk_size)
+    else:
+        # Legacy .xls has no row-streaming reader, so it is loaded in one piece
+        yield pd.read_excel(file_path)
+
+def iter_excel_chunks(file_path, chunk_size):
+    """Stream rows of the first worksheet with openpyxl's read-only mode"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+
+        # Match the column names pd.read_excel gives blank header cells
+        columns = [name if name is not None else f"Unnamed: {i}" for i, name in enumerate(header)]
+        batch = []
+
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            batch.append(row)
+            if len(batch) >= chunk_size:
+                yield excel_frame(batch, columns)
+                batch = []
+
+        if batch:
+            yield excel_frame(batch, columns)
+    finally:
+        workbook.close()
+
+def excel_frame(rows, columns):
+    """Build a chunk DataFrame, letting pandas infer column types like read_excel does"""
+    import pandas as pd
+
+    frame = pd.DataFrame(rows, columns=columns)
+    return frame.infer_objects()
+
+def read_csv_columns(file_path, columns=ANALYZER_COLUMNS):
+    """Read the analyzer's columns from a .csv export without pandas; returns ({column: values}, row count)
+
+    Values are typed the way read_csv types them: missing markers become NaN, and a column whose
+    values are all integers, all numbers or all booleans is converted as a whole.
+    """
+    import csv
+
+    with open(file_path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        wanted = [(name, header.index(name)) for name in columns if name in header]
+        raw = {name: [] for name, _ in wanted}
+        row_count = 0
+
+        for row in reader:
+            # read_csv skips blank lines
+            if not row:
+                continue
+            row_count += 1
+            for name, position in wanted:
+                raw[name].append(row[position] if position < len(row) else '')
+
+    return {name: infer_csv_column(values) for name, values in raw.items()}, row_count
+
+def infer_csv_column(values):
+    """Convert one column's raw CSV strings like read_csv's type inference"""
+    nan = float('nan')
+    values = [None if text in CSV_NA_VALUES else text for text in values]
+    present = [text for text in values if text is not None]
+    complete = len(present) == len(values)
+
+    if not present:
+        return [nan] * len(values)
+    if all(INTEGER_TEXT.fullmatch(text) for text in present):
+        # Integer columns with gaps become float columns
+        convert = int if complete else float
+        return [nan if text is None else convert(text) for text in values]
+    if all(FLOAT_TEXT.fullmatch(text) for text in present):
+        return [nan if text is None else float(text) for text in values]
+    if all(text in CSV_TRUE_VALUES or text in CSV_FALSE_VALUES for text in present):
+        return [nan if text is None else text in CSV_TRUE_VALUES for text in values]
+    return [nan if text is None else text for text in values]
+
+def csv_number(value):
+    """pd.to_numeric(errors='coerce') for one value read by read_csv_columns"""
+    if isinstance(value, str):
+        return float(value) if FLOAT_TEXT.fullmatch(value) else float('nan')
+    return float(value)
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Ticket Preview for IT Ticket Analysis
+Estimates the statistics from a growing random sample stratified by Category (--preview), with
+95% confidence intervals that tighten each round until every ticket is classified
+"""
+
+import json
+import sys
+import time
+
+# The first round classifies this many tickets; every later round doubles the sample
+FIRST_ROUND_ROWS = 5000
+# Two-sided 95% normal quantile
+Z_95 = 1.959964
+PREVIEW_CATEGORIES = 5
+PREVIEW_TYPES = 5
+
+def round_sizes(total, first_rows=FIRST_ROUND_ROWS):
+    """Cumulative sample size of each round, doubling up to every ticket"""
+    sizes = []
+    size = min(first_rows, total)
+    while size < total:
+        sizes.append(size)
+        size *= 2
+    return sizes + [total]
+
+def allocation(stratum_sizes, sample_size):
+    """Tickets to sample per stratum: proportional, at least two where the stratum has them"""
+    import numpy as np
+
+    share = np.rint(stratum_sizes * (sample_size / stratum_sizes.sum())).astype(np.int64)
+    return np.minimum(stratum_sizes, np.maximum(share, np.minimum(stratum_sizes, 2)))
+
+def stratified_totals(strata, groups, weights, stratum_sizes, sampled, group_count):
+    """Estimated population total of weights per group, and its 95% margin
+
+    strata and groups hold each sampled ticket's codes and weights its value (1 to count
+    tickets). Each stratum's sample is a simple random sample, so the total is the sum of
+    stratum size times stratum mean, and its variance carries the finite population correction:
+    a stratum sampled in full adds no uncertainty.
+    """
+    import numpy as np
+
+    cells = len(stratum_sizes) * group_count
+    keys = strata * group_count + groups
+    sums = np.bincount(keys, weights=weights, minlength=cells).reshape(-1, group_count)
+    squares = np.bincount(keys, weights=weights * weights, minlength=cells).reshape(-1, group_count)
+
+    n = sampled[:, None].astype(np.float64)
+    sizes = stratum_sizes[:, None].astype(np.float64)
+    means = sums / n
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variances = np.where(n > 1, (squares - n * means * means) / (n - 1), 0.0)
+    variances = np.maximum(variances, 0.0)
+
+    totals = (sizes * means).sum(axis=0)
+    margins = Z_95 * np.sqrt((sizes * sizes * (1 - n / sizes) * variances / n).sum(axis=0))
+    return totals, margins
+
+def named_totals(strata, values, weights, stratum_sizes, sampled):
+    """{value: (estimate, margin)} for each distinct value, largest estimate first"""
+    import pandas as pd
+
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+    totals, margins = stratified_totals(strata, codes, weights, stratum_sizes, sampled, len(uniques))
+    order = sorted(range(len(uniques)), key=lambda code: (-totals[code], code))
+    return {uniques[code]: (float(totals[code]), float(margins[code])) for code in order}
+
+def preview_estimates(strata, classified, stratum_sizes, sampled):
+    """Estimate the analysis statistics from the classified sample; each is (estimate, margin)"""
+    import numpy as np
+
+    total_tickets = int(stratum_sizes.sum())
+    ones = np.ones(len(classified))
+    types = classified['detected_ticket_type'].tolist()
+    hours = classified['time_numeric'].to_numpy(dtype=np.float64)
+
+    total_time = stratified_totals(strata, np.zeros(len(classified), dtype=np.int64), hours, stratum_sizes, sampled, 1)
+    specific = np.array([ticket_type.startswith('🎯') for ticket_type in types], dtype=np.int64)
+    automation = stratified_totals(strata, specific, ones, stratum_sizes, sampled, 2)
+
+    return {
+        'sampled_tickets': int(sampled.sum()),
+        'total_tickets': total_tickets,
+        'confidence': 0.95,
+        'total_time': (float(total_time[0][0]), float(total_time[1][0])),
+        'average_time': (float(total_time[0][0]) / total_tickets, float(total_time[1][0]) / total_tickets),
+        'automation_candidates': (float(automation[0][1]), float(automation[1][1])),
+        'type_counts': named_totals(strata, types, ones, stratum_sizes, sampled),
+        'category_counts': named_totals(strata, classified['ticket_category'].tolist(), ones, stratum_sizes, sampled)
+    }
+
+def iter_preview(df, classify, first_rows=FIRST_ROUND_ROWS, seed=42):
+    """Classify df in rounds of a growing stratified sample; yields (estimates, classified frame or None)
+
+    Rows are shuffled within each Category stratum once, and each round classifies the next
+    rows of every stratum, so samples are nested and no ticket is classified twice. The last
+    round covers every ticket: its estimates are exact and the classified frame, in the
+    original row order, comes with it. classify(frame) returns the frame with labels and
+    time_numeric added, like classify_tickets_batch.
+    """
+    import numpy as np
+    import pandas as pd
+
+    from ticket_aggregate import column_values
+
+    # str() keeps missing categories together as 'nan', as the classifier sees them
+    strata, _ = pd.factorize(pd.Series([str(v) for v in column_values(df, 'Category')], dtype=object))
+    stratum_sizes = np.bincount(strata)
+    rng = np.random.default_rng(seed)
+    order = np.lexsort((rng.random(len(df)), strata))
+    stratum_starts = np.concatenate(([0], np.cumsum(stratum_sizes)[:-1]))
+
+    sampled = np.zeros(len(stratum_sizes), dtype=np.int64)
+    frames = []
+    for size in round_sizes(len(df), first_rows):
+        target = allocation(stratum_sizes, size)
+        positions = np.concatenate([order[start + taken:start + wanted]
+                                    for start, taken, wanted in zip(stratum_starts, sampled, target)])
+        frames.append(classify(df.iloc[np.sort(positions)].copy()))
+        sampled = target
+
+        classified = pd.concat(frames) if len(frames) > 1 else frames[0]
+        classified_strata = strata[df.index.get_indexer(classified.index)]
+        estimates = preview_estimates(classified_strata, classified, stratum_sizes, sampled)
+        yield estimates, classified.loc[df.index] if sampled.sum() == len(df) else None
+
+def interval(estimate, margin, digits=0):
+    """Format an estimate with its 95% margin"""
+    return f"{estimate:,.{digits}f} ± {margin:,.{digits}f}"
+
+def print_estimates(estimates, round_number, seconds):
+    """Print one round of estimates"""
+    total = estimates['total_tickets']
+    share = lambda pair: interval(pair[0] / total * 100, pair[1] / total * 100, 1) + '%'
+    print(f"\n🔬 Preview round {round_number}: {estimates['sampled_tickets']:,} of {total:,} tickets "
+          f"({estimates['sampled_tickets'] / total * 100:.1f}%) classified in {seconds:.1f}s")
+    print(f"   • Total Time: {interval(*estimates['total_time'])} hours "
+          f"({interval(*estimates['average_time'], 2)} hours/ticket)")
+    print(f"   • Automation Candidates: {interval(*estimates['automation_candidates'])} tickets "
+          f"({share(estimates['automation_candidates'])})")
+    for name, key, limit in (('Categories', 'category_counts', PREVIEW_CATEGORIES), ('Types', 'type_counts', PREVIEW_TYPES)):
+        top = list(estimates[key].items())[:limit]
+        print(f"   • Top {name}: " + '; '.join(f"{value} {share(pair)}" for value, pair in top))
+
+def within_margin(estimates, margin_percent):
+    """True once total hours are within ±margin_percent and every category share within ±margin_percent points"""
+    hours, hours_margin = estimates['total_time']
+    if hours and hours_margin / hours * 100 > margin_percent:
+        return False
+    total = estimates['total_tickets']
+    return all(margin / total * 100 <= margin_percent for _, margin in estimates['category_counts'].values())
+
+def preview_tickets(df, classify, margin_percent=None, first_rows=FIRST_ROUND_ROWS, seed=42):
+    """Run preview rounds, printing each, until every ticket is classified, the margin is met or Ctrl+C
+
+    Returns (classified frame, estimates) after the exact last round, or (None, latest
+    estimates) when stopped early; estimates is None if no round finished.
+    """
+    start = time.perf_counter()
+    estimates = None
+    rounds = iter_preview(df, classify, first_rows, seed)
+    try:
+        for round_number, (estimates, classified) in enumerate(rounds, 1):
+            print_estimates(estimates, round_number, time.perf_counter() - start)
+            if classified is not None:
+                print("   ✅ Every ticket classified; the figures above are exact")
+                return classified, estimates
+            if margin_percent is not None and within_margin(estimates, margin_percent):
+                print(f"   ⏹️ Estimates are within ±{margin_percent:g}%; stopping the preview")
+                return None, estimates
+    except KeyboardInterrupt:
+        print("\n   ⏹️ Preview stopped; keeping the last round's estimates")
+    finally:
+        rounds.close()
+    return None, estimates
+
+def write_estimates(estimates, path):
+    """Save preview estimates as JSON: every figure is {estimate, margin} at 95% confidence"""
+    pair = lambda value: {'estimate': value[0], 'margin': value[1]}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            key: ({name: pair(value) for name, value in estimates[key].items()} if isinstance(estimates[key], dict)
+                  else pair(estimates[key]) if isinstance(estimates[key], tuple) else estimates[key])
+            for key in estimates
+        }, f, indent=2, ensure_ascii=False)
+
+def check_preview(count, first_rows=FIRST_ROUND_ROWS, seed=42):
+    """Preview a synthetic export; intervals should cover the exact figures about 95% of the time"""
+    import pandas as pd
+
+    from comprehensive_analysis import add_full_description, classify_tickets_batch
+    from synthetic_tickets import generate_ticket_rows
+    from ticket_aggregate import TicketAggregate
+
+    df = add_full_description(pd.DataFrame(generate_ticket_rows(count, seed)))
+    classify = lambda frame: classify_tickets_batch(frame, detailed=False)[0]
+
+    start = time.perf_counter()
+    exact_frame, _ = classify_tickets_batch(df.copy(), detailed=False)
+    exact_seconds = time.perf_counter() - start
+    aggregate = TicketAggregate()
+    aggregate.add_frame(exact_frame)
+    exact = aggregate.to_statistics()
+
+    covered = checked = 0
+    start = time.perf_counter()
+    for round_number, (estimates, classified) in enumerate(iter_preview(df, classify, first_rows, seed), 1):
+        seconds = time.perf_counter() - start
+        # Every category plus the total hours and automation candidates, against the exact figures
+        pairs = [(estimates['total_time'], exact['total_time']),
+                 (estimates['automation_candidates'], exact['automation_candidates'])]
+        pairs += [(estimates['category_counts'].get(category, (0.0, 0.0)), value)
+                  for category, value in exact['category_counts'].items()]
+        if classified is None:
+            checked += len(pairs)
+            covered += sum(abs(estimate - value) <= margin for (estimate, margin), value in pairs)
+            hours, margin = estimates['total_time']
+            print(f"   round {round_number}: {estimates['sampled_tickets']:>9,} tickets in {seconds:6.2f}s, "
+                  f"hours {hours:,.0f} ± {margin / hours * 100:.2f}% (exact {exact['total_time']:,.0f})")
+        else:
+            final = classified
+
+    exact_again = all(abs(estimate - value) < 1e-6 * max(1.0, abs(value)) and margin == 0
+                      for (estimate, margin), value in pairs)
+    same_labels = final['detected_ticket_type'].tolist() == exact_frame['detected_ticket_type'].tolist()
+    coverage = covered / checked if checked else 1.0
+    print(f"⏱️ {count:,} tickets: exact classification {exact_seconds:.2f}s, every preview round {seconds:.2f}s")
+    print(f"   • 95% intervals covered the exact figure {coverage * 100:.1f}% of the time ({checked:,} estimates)")
+    if not (exact_again and same_labels):
+        print("❌ The last round is not the exact analysis")
+        return False
+    if coverage < 0.9:
+        print("❌ Intervals cover the exact figures too rarely")
+        return False
+    print("✅ Intervals hold and the last round matches the exact analysis")
+    return True
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    sys.exit(0 if check_preview(count) else 1)
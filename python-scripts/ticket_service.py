@@ -0,0 +1,632 @@
+#!/usr/bin/env python3
+"""
+Ticket Classification Service
+Local asyncio HTTP service that keeps the compiled pattern engine warm, labels single tickets and
+NDJSON batches, reloads the patterns when pattern_definitions.py changes, and reports latency
+histograms and throughput
+"""
+
+import asyncio
+import bisect
+import functools
+import importlib
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+from datetime import datetime
+from http import HTTPStatus
+
+from pattern_artifact import DEFINITIONS_PATH, build_artifact
+from pattern_engine import PatternEngine, fallback_match
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_POLL_INTERVAL = 2.0
+
+# Integrations resend the same tickets often; labels are cached per pattern set
+LABEL_CACHE_SIZE = 100_000
+# Largest body the single-ticket endpoint accepts; batches are streamed, so they have no limit
+MAX_TICKET_BYTES = 1 << 20
+READ_SIZE = 64 * 1024
+# Batch results are written as they are labelled, framed in blocks of about this size
+WRITE_SIZE = 16 * 1024
+# Tickets/second is reported over this many recent seconds
+THROUGHPUT_WINDOW = 60
+
+# Histogram bucket upper bounds in milliseconds; one more bucket catches anything slower
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+LATENCY_QUANTILES = (('p50_ms', 0.5), ('p90_ms', 0.9), ('p99_ms', 0.99))
+
+# Each ticket field by its short name or by the export column it comes from
+DESCRIPTION_FIELDS = ('description', 'Description, Description Additional Details, Additional Notes')
+SUBJECT_FIELDS = ('subject', 'Subject')
+CATEGORY_FIELDS = ('category', 'Category')
+
+ENDPOINTS = {
+    '/classify': 'POST',
+    '/classify/batch': 'POST',
+    '/reload': 'POST',
+    '/health': 'GET',
+    '/metrics': 'GET'
+}
+
+class HttpError(Exception):
+    """A request the service rejects with the given status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class Classifier:
+    """The pattern engine and fallback tables of one compiled pattern artifact"""
+
+    def __init__(self, artifact):
+        self.engine = PatternEngine.from_artifact(artifact)
+        self.source_hash = artifact['source_hash']
+        self.rule_count = len(artifact['rules'])
+        self.automation_scores = artifact['automation_scores']
+        self.default_automation_score = artifact['default_automation_score']
+
+        fallback = artifact['fallback']
+        self.fallback_keywords = [(prefix, tuple(terms)) for prefix, terms in fallback['keywords']]
+        self.other_prefix = fallback['other_prefix']
+        self.category_mappings = fallback['category_mappings']
+        self.default_category = fallback['default_category']
+
+        # A reload builds a new classifier, so cached labels never outlive their patterns
+        self.label = functools.lru_cache(maxsize=LABEL_CACHE_SIZE)(self.match)
+
+    def match(self, text, category):
+        """Return (ticket_type, type_category) for lowercased text, like find_pattern_match"""
+        return self.engine.match(text) or fallback_match(text, category, self.fallback_keywords, self.category_mappings,
+                                                         self.default_category, self.other_prefix)
+
+    def classify(self, ticket):
+        """Label one ticket dict and return the response entry"""
+        # Same text and category as the pipeline: description + ' ' + subject, a missing category as 'nan'
+        text = f"{field_value(ticket, DESCRIPTION_FIELDS, '')} {field_value(ticket, SUBJECT_FIELDS, '')}".lower()
+        ticket_type, type_category = self.label(text, field_value(ticket, CATEGORY_FIELDS, 'nan'))
+
+        result = {'id': ticket['id']} if 'id' in ticket else {}
+        result['type'] = ticket_type
+        result['type_category'] = type_category
+        result['automation'] = self.automation_scores.get(ticket_type, self.default_automation_score)
+        return result
+
+def field_value(ticket, names, default):
+    """The first non-blank value among names as text, or default"""
+    for name in names:
+        value = ticket.get(name)
+        if value is not None and value != '':
+            return str(value)
+    return default
+
+class LatencyHistogram:
+    """Fixed-bucket request latency histogram"""
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, milliseconds):
+        """Record one request"""
+        self.counts[bisect.bisect_left(self.bounds, milliseconds)] += 1
+        self.count += 1
+        self.total_ms += milliseconds
+        self.max_ms = max(self.max_ms, milliseconds)
+
+    def quantile(self, q):
+        """Estimate a quantile by interpolating inside its bucket"""
+        if not self.count:
+            return None
+
+        rank = q * self.count
+        seen = 0
+        for position, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.bounds[position - 1] if position else 0.0
+                upper = self.bounds[position] if position < len(self.bounds) else self.max_ms
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max_ms)
+            seen += count
+        return self.max_ms
+
+    def to_dict(self):
+        """Summary and cumulative buckets for /metrics"""
+        cumulative = 0
+        buckets = []
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            buckets.append({'le_ms': bound, 'count': cumulative})
+
+        summary = {
+            'count': self.count,
+            'mean_ms': self.total_ms / self.count if self.count else None,
+            'max_ms': self.max_ms
+        }
+        for name, q in LATENCY_QUANTILES:
+            summary[name] = self.quantile(q)
+        summary['buckets'] = buckets
+        return summary
+
+class ServiceMetrics:
+    """Request counts, latency histograms and ticket throughput since start-up"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.requests = Counter()
+        self.latency = {}
+        self.tickets = 0
+        self.errors = 0
+        # [second, tickets] for the last THROUGHPUT_WINDOW seconds
+        self.window = deque()
+
+    def observe(self, endpoint, status, milliseconds):
+        """Record one finished request"""
+        self.requests[endpoint, status] += 1
+        if endpoint not in self.latency:
+            self.latency[endpoint] = LatencyHistogram()
+        self.latency[endpoint].observe(milliseconds)
+
+    def add_tickets(self, count, errors=0):
+        """Record labelled tickets and rejected ones"""
+        self.tickets += count
+        self.errors += errors
+
+        now = int(time.monotonic())
+        if self.window and self.window[-1][0] == now:
+            self.window[-1][1] += count
+        else:
+            self.window.append([now, count])
+        while self.window[0][0] <= now - THROUGHPUT_WINDOW:
+            self.window.popleft()
+
+    def throughput(self):
+        """Tickets per second since start-up and over the recent window"""
+        uptime = time.monotonic() - self.started
+        now = int(time.monotonic())
+        recent = sum(count for second, count in self.window if second > now - THROUGHPUT_WINDOW)
+        return {
+            'tickets_per_second': self.tickets / uptime if uptime else 0.0,
+            f'tickets_per_second_{THROUGHPUT_WINDOW}s': recent / min(THROUGHPUT_WINDOW, max(uptime, 1.0))
+        }
+
+    def to_dict(self):
+        """All metrics as one JSON document"""
+        requests = {}
+        for (endpoint, status), count in sorted(self.requests.items()):
+            requests.setdefault(endpoint, {})[str(status)] = count
+
+        return {
+            'uptime_seconds': time.monotonic() - self.started,
+            'tickets': self.tickets,
+            'ticket_errors': self.errors,
+            **self.throughput(),
+            'requests': requests,
+            'latency': {endpoint: histogram.to_dict() for endpoint, histogram in sorted(self.latency.items())}
+        }
+
+    def to_prometheus(self, reloads):
+        """All metrics in the Prometheus text exposition format"""
+        lines = [
+            '# TYPE ticket_service_tickets_total counter',
+            f'ticket_service_tickets_total {self.tickets}',
+            '# TYPE ticket_service_ticket_errors_total counter',
+            f'ticket_service_ticket_errors_total {self.errors}',
+            '# TYPE ticket_service_pattern_reloads_total counter',
+            f'ticket_service_pattern_reloads_total {reloads}',
+            '# TYPE ticket_service_requests_total counter'
+        ]
+        for (endpoint, status), count in sorted(self.requests.items()):
+            lines.append(f'ticket_service_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+
+        lines.append('# TYPE ticket_service_request_seconds histogram')
+        for endpoint, histogram in sorted(self.latency.items()):
+            cumulative = 0
+            for bound, count in zip(histogram.bounds, histogram.counts):
+                cumulative += count
+                lines.append(f'ticket_service_request_seconds_bucket{{endpoint="{endpoint}",le="{bound / 1000:g}"}} {cumulative}')
+            lines.append(f'ticket_service_request_seconds_bucket{{endpoint="{endpoint}",le="+Inf"}} {histogram.count}')
+            lines.append(f'ticket_service_request_seconds_sum{{endpoint="{endpoint}"}} {histogram.total_ms / 1000:.6f}')
+            lines.append(f'ticket_service_request_seconds_count{{endpoint="{endpoint}"}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+class TicketService:
+    """HTTP front end for a warm classifier that follows pattern_definitions.py"""
+
+    def __init__(self, poll_interval=DEFAULT_POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self.metrics = ServiceMetrics()
+        self.reloads = 0
+        self.reload_error = None
+        self.definitions_mtime = definitions_mtime()
+        self.classifier = Classifier(build_artifact())
+        self.loaded_at = datetime.now().isoformat(timespec='seconds')
+
+    def build_classifier(self):
+        """Re-import pattern_definitions.py and compile a new classifier from it"""
+        import pattern_definitions
+        importlib.reload(pattern_definitions)
+        return Classifier(build_artifact())
+
+    async def reload(self):
+        """Swap in a classifier built from the current definitions; keeps the old one if they fail to load"""
+        self.definitions_mtime = definitions_mtime()
+        try:
+            # Compiling off the event loop keeps request latency flat during a reload
+            classifier = await asyncio.get_running_loop().run_in_executor(None, self.build_classifier)
+        except Exception as error:
+            self.reload_error = f"{type(error).__name__}: {error}"
+            print(f"⚠️ Could not reload pattern_definitions.py, still serving the previous patterns: {self.reload_error}")
+            return False
+
+        self.classifier = classifier
+        self.reloads += 1
+        self.reload_error = None
+        self.loaded_at = datetime.now().isoformat(timespec='seconds')
+        print(f"🔄 Reloaded {classifier.rule_count} patterns from pattern_definitions.py")
+        return True
+
+    async def watch_definitions(self):
+        """Reload whenever pattern_definitions.py is modified"""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            if definitions_mtime() != self.definitions_mtime:
+                await self.reload()
+
+    def health(self):
+        """Pattern set and reload state"""
+        return {
+            'status': 'ok' if self.reload_error is None else 'stale',
+            'rules': self.classifier.rule_count,
+            'source_hash': self.classifier.source_hash,
+            'loaded_at': self.loaded_at,
+            'reloads': self.reloads,
+            'reload_error': self.reload_error,
+            'uptime_seconds': time.monotonic() - self.metrics.started
+        }
+
+    async def handle_connection(self, reader, writer):
+        """Serve requests on one keep-alive connection"""
+        try:
+            while True:
+                try:
+                    request = await read_request_head(reader)
+                except HttpError as error:
+                    writer.write(json_response(error.status, {'error': str(error)}, keep_alive=False))
+                    break
+                if request is None:
+                    break
+
+                start = time.perf_counter()
+                method, target, version, headers = request
+                path, _, query = target.partition('?')
+                keep_alive = wants_keep_alive(version, headers)
+                try:
+                    status, keep_alive = await self.dispatch(method, path, query, version, headers, reader, writer, keep_alive)
+                except HttpError as error:
+                    # The body may be partly unread, so the connection cannot be reused
+                    status, keep_alive = error.status, False
+                    writer.write(json_response(status, {'error': str(error)}, keep_alive=False))
+
+                await writer.drain()
+                endpoint = path if path in ENDPOINTS else 'other'
+                self.metrics.observe(endpoint, status, (time.perf_counter() - start) * 1000)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, path, query, version, headers, reader, writer, keep_alive):
+        """Run one request; returns (status, keep_alive)"""
+        if path not in ENDPOINTS:
+            raise HttpError(404, f"no endpoint {path}")
+        if method != ENDPOINTS[path]:
+            raise HttpError(405, f"{path} only accepts {ENDPOINTS[path]}")
+
+        if headers.get('expect', '').lower() == '100-continue':
+            writer.write(b'HTTP/1.1 100 Continue\r\n\r\n')
+
+        if path == '/classify/batch':
+            # HTTP/1.0 clients cannot read a chunked response, so theirs ends at connection close
+            chunked = version != 'HTTP/1.0'
+            complete = await self.classify_batch(reader, writer, headers, chunked and keep_alive, chunked)
+            return 200, chunked and keep_alive and complete
+
+        if path == '/classify':
+            body = b''.join([piece async for piece in body_pieces(reader, headers, MAX_TICKET_BYTES)])
+            ticket = parse_ticket(body)
+            self.metrics.add_tickets(1)
+            writer.write(json_response(200, self.classifier.classify(ticket), keep_alive))
+        elif path == '/reload':
+            async for _ in body_pieces(reader, headers):
+                pass
+            reloaded = await self.reload()
+            writer.write(json_response(200 if reloaded else 500, self.health(), keep_alive))
+            return (200 if reloaded else 500), keep_alive
+        elif path == '/health':
+            writer.write(json_response(200, self.health(), keep_alive))
+        elif 'format=prometheus' in query.split('&'):
+            body = self.metrics.to_prometheus(self.reloads).encode('utf-8')
+            writer.write(response_head(200, 'text/plain; version=0.0.4', len(body), keep_alive) + body)
+        else:
+            writer.write(json_response(200, self.metrics.to_dict(), keep_alive))
+        return 200, keep_alive
+
+    async def classify_batch(self, reader, writer, headers, keep_alive, chunked):
+        """Label an NDJSON body line by line, streaming one NDJSON result per ticket in input order
+
+        Returns False if the body framing broke off midway; the results so far end with an error line.
+        """
+        writer.write(response_head(200, 'application/x-ndjson', None, keep_alive, chunked))
+        # One classifier for the whole batch, even if a reload lands midway
+        classifier = self.classifier
+        pending = b''
+        line_number = 0
+
+        output = bytearray()
+
+        def send(result=None):
+            # Results go out in blocks of about WRITE_SIZE bytes, so a chunk frame is not paid per ticket
+            if result is not None:
+                output.extend((json.dumps(result, ensure_ascii=False) + '\n').encode('utf-8'))
+                if len(output) < WRITE_SIZE:
+                    return
+            if output:
+                writer.write(b'%x\r\n%s\r\n' % (len(output), output) if chunked else bytes(output))
+                output.clear()
+
+        def label(lines):
+            nonlocal line_number
+            labelled = errors = 0
+            for line in lines:
+                line_number += 1
+                if not line.strip():
+                    continue
+                try:
+                    result = classifier.classify(parse_ticket(line))
+                    labelled += 1
+                except HttpError as error:
+                    result = {'line': line_number, 'error': str(error)}
+                    errors += 1
+                send(result)
+            self.metrics.add_tickets(labelled, errors)
+
+        try:
+            async for piece in body_pieces(reader, headers):
+                lines = (pending + piece).split(b'\n')
+                pending = lines.pop()
+                label(lines)
+                # Most clients send the whole body before reading the response, so waiting for them
+                # to read results mid-upload would deadlock; the transport holds them until then
+                await asyncio.sleep(0)
+        except HttpError as error:
+            # The response has already started, so the error becomes its last line
+            self.metrics.add_tickets(0, 1)
+            send({'error': str(error)})
+            send()
+            if chunked:
+                writer.write(b'0\r\n\r\n')
+            return False
+
+        label([pending] if pending else [])
+        send()
+        if chunked:
+            writer.write(b'0\r\n\r\n')
+        return True
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, started=None):
+        """Listen until cancelled; started(port) is called once the socket is bound"""
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        bound_port = server.sockets[0].getsockname()[1]
+        watcher = asyncio.create_task(self.watch_definitions())
+        print(f"🚀 Classifying tickets on http://{host}:{bound_port} ({self.classifier.rule_count} patterns, "
+              f"reloading on changes to pattern_definitions.py)")
+        if started is not None:
+            started(bound_port)
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
+
+def definitions_mtime():
+    """Modification time of pattern_definitions.py"""
+    return os.stat(DEFINITIONS_PATH).st_mtime_ns
+
+async def read_request_head(reader):
+    """Read the request line and headers; returns None when the client closed the connection"""
+    try:
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        method, target, version = request_line.decode('latin-1').split()
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+    except ValueError:
+        # A malformed request line, or a line longer than the stream limit
+        raise HttpError(400, "malformed request")
+
+    return method, target, version, headers
+
+async def body_pieces(reader, headers, limit=None):
+    """Yield the request body in pieces, from Content-Length or chunked transfer encoding"""
+    received = 0
+    try:
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    # Skip any trailers
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    return
+                received += size
+                if limit is not None and received > limit:
+                    raise HttpError(413, f"request body is larger than {limit:,} bytes")
+                yield await reader.readexactly(size)
+                await reader.readexactly(2)
+
+        remaining = int(headers.get('content-length', 0))
+    except ValueError:
+        raise HttpError(400, "malformed request body framing")
+
+    if limit is not None and remaining > limit:
+        raise HttpError(413, f"request body is larger than {limit:,} bytes")
+    while remaining:
+        piece = await reader.read(min(READ_SIZE, remaining))
+        if not piece:
+            raise asyncio.IncompleteReadError(b'', remaining)
+        remaining -= len(piece)
+        yield piece
+
+def parse_ticket(body):
+    """Decode one JSON ticket object"""
+    try:
+        ticket = json.loads(body)
+    except ValueError as error:
+        raise HttpError(400, f"invalid JSON: {error}")
+    if not isinstance(ticket, dict):
+        raise HttpError(400, "a ticket must be a JSON object")
+    return ticket
+
+def wants_keep_alive(version, headers):
+    """HTTP/1.1 keeps connections open unless asked not to; HTTP/1.0 only when asked"""
+    connection = headers.get('connection', '').lower()
+    if version == 'HTTP/1.0':
+        return connection == 'keep-alive'
+    return connection != 'close'
+
+def response_head(status, content_type, length, keep_alive=True, chunked=True):
+    """Status line and headers; without a length the body is chunked or, if not, ends at connection close"""
+    lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}", f"Content-Type: {content_type}"]
+    if length is not None:
+        lines.append(f"Content-Length: {length}")
+    elif chunked:
+        lines.append("Transfer-Encoding: chunked")
+    if not keep_alive:
+        lines.append("Connection: close")
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+def json_response(status, payload, keep_alive=True):
+    """A complete JSON response"""
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    return response_head(status, 'application/json', len(body), keep_alive) + body
+
+def run_self_test(count, clients=4, seed=42):
+    """Serve on a free port and check both endpoints label a synthetic corpus like find_pattern_match"""
+    import http.client
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    from pattern_artifact import parity_corpus
+
+    rows, expected = parity_corpus(count, seed)
+    for position, row in enumerate(rows):
+        row['id'] = position
+
+    service = TicketService()
+    ready = threading.Event()
+    state = {}
+
+    def run_server():
+        loop = asyncio.new_event_loop()
+        state['loop'] = loop
+        state['task'] = loop.create_task(service.serve('127.0.0.1', 0, started=lambda port: (state.update(port=port), ready.set())))
+        try:
+            loop.run_until_complete(state['task'])
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=run_server, daemon=True)
+    thread.start()
+    ready.wait()
+    connect = lambda: http.client.HTTPConnection('127.0.0.1', state['port'])
+
+    def post_singles(batch):
+        connection = connect()
+        labels = []
+        for row in batch:
+            connection.request('POST', '/classify', json.dumps(row), {'Content-Type': 'application/json'})
+            result = json.loads(connection.getresponse().read())
+            labels.append((result['id'], [result['type'], result['type_category']]))
+        connection.close()
+        return labels
+
+    ok = True
+    start = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        singles = dict(label for labels in pool.map(post_singles, [rows[i::clients] for i in range(clients)]) for label in labels)
+    single_seconds = time.perf_counter() - start
+    mismatches = sum(singles[position] != want for position, want in enumerate(expected))
+    ok = ok and not mismatches
+    print(f"{'✅' if not mismatches else '❌'} /classify: {count - mismatches:,} of {count:,} tickets labelled like "
+          f"find_pattern_match ({count / single_seconds:,.0f} requests/s over {clients} connections)")
+
+    start = time.perf_counter()
+    connection = connect()
+    body = ''.join(json.dumps(row) + '\n' for row in rows) + '{not json}\n'
+    connection.request('POST', '/classify/batch', body.encode('utf-8'), {'Content-Type': 'application/x-ndjson'})
+    results = [json.loads(line) for line in connection.getresponse().read().splitlines()]
+    batch_seconds = time.perf_counter() - start
+    mismatches = sum([result['type'], result['type_category']] != want for result, want in zip(results, expected))
+    batch_ok = not mismatches and len(results) == count + 1 and results[-1].get('line') == count + 1
+    ok = ok and batch_ok
+    print(f"{'✅' if batch_ok else '❌'} /classify/batch: {count - mismatches:,} of {count:,} tickets labelled like "
+          f"find_pattern_match, bad line reported ({count / batch_seconds:,.0f} tickets/s)")
+
+    connection.request('POST', '/reload')
+    reloaded = json.loads(connection.getresponse().read())
+    connection.request('GET', '/metrics')
+    metrics = json.loads(connection.getresponse().read())
+    connection.close()
+    reload_ok = reloaded['reloads'] == 1 and reloaded['status'] == 'ok'
+    ok = ok and reload_ok
+    print(f"{'✅' if reload_ok else '❌'} /reload rebuilt {reloaded['rules']} patterns")
+
+    latency = metrics['latency']['/classify']
+    print(f"⏱️ /classify latency: p50 {latency['p50_ms']:.2f} ms, p90 {latency['p90_ms']:.2f} ms, "
+          f"p99 {latency['p99_ms']:.2f} ms over {latency['count']:,} requests")
+
+    state['loop'].call_soon_threadsafe(state['task'].cancel)
+    thread.join()
+    return ok
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Serve ticket classification over HTTP with the pattern engine kept loaded",
+        epilog="Example: python ticket_service.py --port 8765  (then POST tickets to /classify or NDJSON to /classify/batch)"
+    )
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f"address to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL,
+                        help=f"seconds between checks for changes to pattern_definitions.py (default: {DEFAULT_POLL_INTERVAL:g})")
+    parser.add_argument('--self-test', type=int, metavar='N',
+                        help="serve on a free port, label N synthetic tickets through both endpoints, compare and exit")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.self_test:
+        sys.exit(0 if run_self_test(args.self_test) else 1)
+
+    try:
+        asyncio.run(TicketService(args.poll_interval).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("👋 Service stopped")
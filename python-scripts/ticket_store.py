@@ -0,0 +1,178 @@
+"""
+Columnar Ticket Store for IT Ticket Analysis
+Per-ticket detail records as categorical codes and typed arrays, with row views on demand
+"""
+
+import sys
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from ticket_aggregate import SAMPLES_PER_TYPE, build_ticket_records, column_values
+
+# Record fields with few distinct values, stored as int32 codes into a list of values
+CATEGORICAL_FIELDS = {
+    'category': 'Category',
+    'detected_type': 'detected_ticket_type',
+    'type_category': 'ticket_category',
+    'assigned_to': 'Assigned To',
+    'status': 'Status',
+    'created_by': 'Created By'
+}
+# Record fields read straight from the frame's own column arrays, so their strings are not copied
+TEXT_FIELDS = {
+    'subject': 'Subject',
+    'description': 'full_description',
+    'ticket_number': 'Help Ticket Number'
+}
+RECORD_FIELDS = ['category', 'detected_type', 'type_category', 'subject', 'description', 'time_spent',
+                 'assigned_to', 'status', 'ticket_number', 'created_by']
+
+class TicketView:
+    """One ticket of a TicketStore, read on demand; record['field'] works as with the old dict records"""
+
+    __slots__ = ('store', 'position')
+
+    def __init__(self, store, position):
+        self.store = store
+        self.position = position
+
+    def __getitem__(self, field):
+        return self.store.value(field, self.position)
+
+    def get(self, field, default=None):
+        """Like dict.get for record fields"""
+        return self[field] if field in RECORD_FIELDS else default
+
+    def to_dict(self):
+        """Materialize the record as a plain dict"""
+        return {field: self[field] for field in RECORD_FIELDS}
+
+class TicketStore:
+    """Per-ticket detail records of a classified frame, stored column by column
+
+    Repeated values (category, type, assignee, status, requester) are int32 codes into a
+    list of distinct values and time_spent is a float64 array. Subject, description and
+    ticket number stay in the frame's column arrays. It offers the same top_tickets and
+    type_category methods as TicketAggregate, so the report can use it as its type index.
+    """
+
+    def __init__(self, df):
+        self.size = len(df)
+        self.codes = {}
+        self.values = {}
+        for field, column in CATEGORICAL_FIELDS.items():
+            data = column_values(df, column)
+            if field == 'category':
+                # str() per value keeps missing categories as 'nan', like the classifier sees them
+                data = [str(v) for v in data]
+            codes, uniques = pd.factorize(pd.Series(data, dtype=object), use_na_sentinel=False)
+            self.codes[field] = codes.astype(np.int32)
+            self.values[field] = list(uniques)
+
+        self.columns = {field: df[column].array if column in df else None for field, column in TEXT_FIELDS.items()}
+        # Raw hours like the dict records: a blank or unparsable time stays NaN, not 0
+        time_spent = pd.to_numeric(df.get('Total Time Spent (Hours)', 0), errors='coerce')
+        if not isinstance(time_spent, pd.Series):
+            time_spent = pd.Series(time_spent, index=df.index)
+        self.time_spent = np.asarray(time_spent, dtype=np.float64)
+        self.type_codes = {ticket_type: code for code, ticket_type in enumerate(self.values['detected_type'])}
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, position):
+        if not 0 <= position < self.size:
+            raise IndexError(position)
+        return TicketView(self, position)
+
+    def __iter__(self):
+        return (TicketView(self, position) for position in range(self.size))
+
+    def value(self, field, position):
+        """Return one field of one ticket"""
+        if field in self.codes:
+            return self.values[field][self.codes[field][position]]
+        if field == 'time_spent':
+            return float(self.time_spent[position])
+        if field in self.columns:
+            column = self.columns[field]
+            if column is None:
+                return ''
+            value = column[position]
+            return str(value) if field == 'description' else value
+        raise KeyError(field)
+
+    def type_counts(self):
+        """Tickets per detected type, in first-seen order"""
+        counts = np.bincount(self.codes['detected_type'], minlength=len(self.values['detected_type']))
+        return Counter(dict(zip(self.values['detected_type'], counts.tolist())))
+
+    def positions(self, ticket_type):
+        """Row positions of one type's tickets, in frame order"""
+        code = self.type_codes.get(ticket_type)
+        if code is None:
+            return np.empty(0, dtype=np.intp)
+        return np.flatnonzero(self.codes['detected_type'] == code)
+
+    def top_tickets(self, ticket_type, count=SAMPLES_PER_TYPE):
+        """Return a type's most time-consuming tickets as row views; ties keep frame order, NaN times go last"""
+        positions = self.positions(ticket_type)
+        hours = self.time_spent[positions]
+        order = np.argsort(-np.where(np.isnan(hours), -np.inf, hours), kind='stable')[:count]
+        return [TicketView(self, int(position)) for position in positions[order]]
+
+    def type_category(self, ticket_type, default='General IT Support'):
+        """Return the category of a type's first ticket"""
+        positions = self.positions(ticket_type)
+        return self.value('type_category', int(positions[0])) if len(positions) else default
+
+def compare_memory(count, seed=42):
+    """Measure the frame plus dict-of-dicts records against the frame plus a TicketStore
+
+    The store reads subject, description and ticket number from the frame's own columns,
+    so it only saves memory next to a frame that stays alive; both totals include it.
+    """
+    import tracemalloc
+
+    from comprehensive_analysis import add_full_description, classify_tickets_batch
+    from synthetic_tickets import generate_ticket_rows
+
+    df = add_full_description(pd.DataFrame(generate_ticket_rows(count, seed)))
+    df, _ = classify_tickets_batch(df, detailed=False)
+    frame_size = int(df.memory_usage(deep=True).sum())
+
+    results = {}
+    for name, build in [('dict records', lambda: build_ticket_records(df)), ('TicketStore', lambda: TicketStore(df))]:
+        tracemalloc.start()
+        built = build()
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[name] = (frame_size + size, built)
+
+    records = results['dict records'][1]
+    store = results['TicketStore'][1]
+    mismatches = sum(
+        1 for position, record in enumerate(records.values())
+        for field in RECORD_FIELDS
+        if not same_value(record[field], store[position][field])
+    )
+
+    print(f"📊 {count:,} tickets, classified frame {frame_size / 1e6:.1f} MB")
+    for name, (size, _) in results.items():
+        print(f"   • frame + {name:<13} {size / 1e6:>8.1f} MB")
+    print(f"   • {results['dict records'][0] / results['TicketStore'][0]:.1f}x less memory in total")
+    if mismatches:
+        print(f"❌ {mismatches:,} fields differ from the dict records")
+        return False
+    print("✅ Every field matches the dict records")
+    return True
+
+def same_value(a, b):
+    """Equality that treats NaN as equal to NaN"""
+    return a == b or (a != a and b != b)
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    sys.exit(0 if compare_memory(count) else 1)